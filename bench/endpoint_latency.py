@@ -0,0 +1,106 @@
+"""
+Per-call latency of the S3 agent client variants on the configured host.
+
+Compares, for the same agents and requirements:
+
+- generate/context: CachedOllamaClient shipping the prefilled `context`
+- generate/system:  CachedOllamaClient sending the system prompt text
+- chat:             ChatOllamaClient with the system prompt as first message
+
+Calls are interleaved per requirement so that all variants see the same
+server conditions. The response cache is bypassed. Reported per variant:
+client setup time (the system prompt prefill for generate/context), per-call
+latency, prompt tokens Ollama evaluated per call and request body size.
+
+    python -m bench.endpoint_latency --scope syntatic/single_2.csv --limit 20
+"""
+
+import argparse
+import copy
+import statistics
+import time
+
+from common.client_factory import build_cached_ollama_client, configure_clients
+from common.config import load_config
+from common.prompt_loader import load_prompt
+from common.warmup import preload_models
+from utils.dataset_loader import load_dataset
+
+VARIANTS = {
+    "generate/context": {"endpoint": "generate", "context_mode": "context"},
+    "generate/system": {"endpoint": "generate", "context_mode": "system"},
+    "chat": {"endpoint": "chat"},
+}
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, round(pct / 100 * len(ordered)) - 1)] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare S3 client variants by per-call latency")
+    parser.add_argument("--scope", default="syntatic/single_2.csv", help="Dataset under data/")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--agents", default="atomicity,clarity,completion_single")
+    parser.add_argument("--variants", default=",".join(VARIANTS))
+    parser.add_argument("--stream", action="store_true", help="Use streaming requests")
+    parser.add_argument("--no-warmup", action="store_true")
+    args = parser.parse_args()
+
+    cfg = load_config()
+    cfg["model"]["stream"] = args.stream
+    configure_clients(cfg)
+    if not args.no_warmup:
+        preload_models(cfg)
+
+    agents = args.agents.split(",")
+    variants = args.variants.split(",")
+    task = load_prompt("shared_task", "s3/task_prompts")
+    requirements = load_dataset(args.scope, args.limit).requirements
+
+    clients, setup_ms = {}, {v: 0.0 for v in variants}
+    for variant in variants:
+        variant_cfg = copy.deepcopy(cfg)
+        variant_cfg["model"].update(VARIANTS[variant])
+        for agent in agents:
+            start = time.perf_counter()
+            clients[variant, agent] = build_cached_ollama_client(
+                variant_cfg, load_prompt(agent, "s3/system_prompts"), name=f"{variant}:{agent}", use_cache=False,
+            )
+            setup_ms[variant] += (time.perf_counter() - start) * 1000
+
+    latencies = {v: [] for v in variants}
+    prompt_tokens = {v: [] for v in variants}
+    body_bytes = {v: [] for v in variants}
+    failures = {v: 0 for v in variants}
+    for requirement in requirements:
+        prompt = task.replace("{{REQUIREMENT}}", requirement.text)
+        for agent in agents:
+            for variant in variants:
+                client = clients[variant, agent]
+                body_bytes[variant].append(len(client._encoded_body(prompt, stream=args.stream)))
+                start = time.perf_counter()
+                result = client.generate(prompt)
+                if result["execution_status"] != "SUCCESS":
+                    failures[variant] += 1
+                    continue
+                latencies[variant].append((time.perf_counter() - start) * 1000)
+                if "prompt_eval_count" in result.get("usage", {}):
+                    prompt_tokens[variant].append(result["usage"]["prompt_eval_count"])
+
+    print(f"{len(requirements)} requirements x {len(agents)} agents, stream={args.stream}")
+    print(f"{'variant':<18}{'setup ms':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'prompt tok':>12}{'body bytes':>12}{'failed':>8}")
+    for variant in variants:
+        lat = latencies[variant]
+        print(
+            f"{variant:<18}{setup_ms[variant]:>10.0f}{statistics.fmean(lat) if lat else 0:>10.0f}"
+            f"{_percentile(lat, 50):>10.0f}{_percentile(lat, 95):>10.0f}"
+            f"{statistics.fmean(prompt_tokens[variant]) if prompt_tokens[variant] else 0:>12.0f}"
+            f"{statistics.fmean(body_bytes[variant]):>12,.0f}{failures[variant]:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
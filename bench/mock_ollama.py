@@ -0,0 +1,471 @@
+"""
+Stdlib-only mock of the Ollama HTTP API for offline benchmarking.
+
+Serves enough of the API for S1, S2 and S3 to run end to end without a model:
+
+- POST /api/generate  prompt, context round-trip, streaming (NDJSON), preload
+- POST /api/chat      the same for a system + user message list (no context)
+- GET  /api/tags      installed models with a stable digest (context store keys)
+- GET  /api/version   health checks (load balancer)
+
+Responses are canned JSON verdicts chosen from the prompt template the request
+was built from (every file under prompts/ is recognized by its text before the
+first {{PLACEHOLDER}}). S3 task prompts carry no agent-specific text, so the
+`context` returned by a system prompt prefill encodes which prompt produced it
+and later calls are answered for that agent. Contexts contain no server state,
+so contexts persisted by the context store stay valid across mock restarts.
+Requests that send the `system` prompt text instead of a context are classified
+by that text; its tokens are prefilled only the first time, mirroring the
+server's prompt prefix cache.
+
+Latency is simulated as: sampled base latency + prompt tokens / prefill rate
++ response tokens / decode rate. Tokens cached in `context` are not prefilled
+again, as with the real server. Failures (HTTP 500) and hangs (no response
+for --hang-seconds) can be injected at a configurable rate, and --parallel
+emulates OLLAMA_NUM_PARALLEL.
+
+Run it in place of Ollama:
+
+    python -m bench.mock_ollama --port 11434 --latency-ms 300 --jitter-ms 100
+
+or in-process from a benchmark:
+
+    server, thread = start_server(MockConfig(latency_ms=0), port=0)
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from common.prompt_loader import PROMPT_DIR
+
+logger = logging.getLogger("marva.bench.mock_ollama")
+
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+# Batched prompts (S2 --batch-size) tag requirements [R1]..[RN] and ask for a JSON array
+_BATCH_IDS_RE = re.compile(r"tagged with an ID in square brackets: ([^\n]+?)\.?\n")
+_BATCH_ITEM_RE = re.compile(r"^\[(R\d+)\] (.*)$", re.MULTILINE)
+
+# First token of every mock context; the second is the index of the prompt kind
+_CONTEXT_MAGIC = 151_643
+_VOCAB = 151_000
+
+
+@dataclass
+class MockConfig:
+    models: List[str] = field(default_factory=lambda: ["qwen3:1.7b"])
+    latency_ms: float = 200.0           # mean base latency per call
+    jitter_ms: float = 50.0             # spread (uniform half-width, or std dev)
+    distribution: str = "normal"
+    prefill_tps: float = 2000.0         # prompt tokens per second (0 = free)
+    tokens_per_second: float = 60.0     # decode rate (0 = instant)
+    load_ms: float = 0.0                # one-off model load on first use
+    flag_rate: float = 0.3              # share of prompts answered with FLAG/FAIL
+    failure_rate: float = 0.0           # share of requests answered with HTTP 500
+    timeout_rate: float = 0.0           # share of requests that hang
+    hang_seconds: float = 3600.0
+    parallel: int = 0                   # concurrent requests served (0 = unlimited)
+    seed: int = 42
+    verdicts: Dict[str, dict] = field(default_factory=dict)  # fixed responses per kind
+
+
+def _tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+def _token_ids(count: int, salt: int) -> List[int]:
+    return [(salt * 7919 + i * 104_729) % _VOCAB for i in range(count)]
+
+
+def _load_prompt_kinds() -> List[Tuple[str, str]]:
+    """(kind, static prefix) for every prompt file, longest prefix first."""
+    kinds = []
+    for path in sorted(PROMPT_DIR.rglob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        prefix = text.split("{{", 1)[0].strip()
+        kind = path.relative_to(PROMPT_DIR).with_suffix("").as_posix()
+        kinds.append((kind, prefix))
+    return sorted(kinds, key=lambda k: len(k[1]), reverse=True)
+
+
+class _Verdicts:
+    """Canned responses per prompt kind, FLAG/FAIL for a stable share of prompts."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+
+    def _failing(self, kind: str, prompt: str) -> bool:
+        digest = hashlib.sha256(f"{kind}\0{prompt}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:4], "big") / 2**32 < self.config.flag_rate
+
+    def response(self, kind: Optional[str], prompt: str) -> dict:
+        name = kind.rsplit("/", 1)[-1] if kind else "unknown"
+        if name in self.config.verdicts:
+            return self.config.verdicts[name]
+        failing = self._failing(name, prompt)
+        negative = "FAIL" if name == "atomicity" else "FLAG"
+
+        if name == "decision":
+            return {"recommendations": ["Split the requirement into independently verifiable statements."]}
+        if name in ("s1_single", "s1_group"):
+            dimensions = ["atomicity", "clarity", "completion"] if name == "s1_single" else ["redundancy", "completion", "consistency"]
+            agents = [
+                {"dimension": d, "status": "FLAG" if failing and i == 0 else "PASS",
+                 "issues": "Mock issue." if failing and i == 0 else ""}
+                for i, d in enumerate(dimensions)
+            ]
+            return {
+                "agent": "S1 Validation Agent",
+                "status": "FLAG" if failing else "PASS",
+                "agents": agents,
+                "recommendations": ["Clarify the expected outcome."] if failing else [],
+            }
+        if name == "s2_vdp":
+            return {
+                "agent": "S2 validation processor",
+                "final_status": "FLAG" if failing else "PASS",
+                "recommendations": ["Clarify the expected outcome."] if failing else [],
+            }
+        return {
+            "decision": negative if failing else "PASS",
+            "issues": "Mock issue detected by the mock server." if failing else "",
+        }
+
+    def batch_response(self, kind: Optional[str], prompt: str) -> Optional[list]:
+        """Array of per-ID responses for a batched prompt, or None for a regular prompt."""
+        match = _BATCH_IDS_RE.search(prompt)
+        if not match:
+            return None
+        items = {}
+        for tag, text in _BATCH_ITEM_RE.findall(prompt):
+            items.setdefault(tag, text)
+        ids = [i.strip() for i in match.group(1).split(",")]
+        return [{"id": i, **self.response(kind, items.get(i, i))} for i in ids]
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.kinds = _load_prompt_kinds()
+        self.kind_index = {kind: i for i, (kind, _) in enumerate(sorted(self.kinds))}
+        self.kind_names = sorted(k for k, _ in self.kinds)
+        self.verdicts = _Verdicts(config)
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(config.parallel) if config.parallel > 0 else None
+        self._loaded: set = set()
+        self._cached_prefixes: set = set()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {"requests": 0, "failures": 0, "hangs": 0, "prefills": 0}
+
+    def handle_error(self, request, client_address):
+        # Streaming clients close the connection as soon as the verdict is complete
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            logger.debug("Connection from %s closed by client", client_address)
+            return
+        super().handle_error(request, client_address)
+
+    # -------------------------------------------------
+    # Simulation helpers
+    # -------------------------------------------------
+    def count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def roll(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def base_latency_s(self) -> float:
+        c = self.config
+        with self._rng_lock:
+            if c.distribution == "fixed" or c.jitter_ms <= 0:
+                ms = c.latency_ms
+            elif c.distribution == "uniform":
+                ms = self._rng.uniform(c.latency_ms - c.jitter_ms, c.latency_ms + c.jitter_ms)
+            elif c.distribution == "normal":
+                ms = self._rng.gauss(c.latency_ms, c.jitter_ms)
+            else:
+                # lognormal with the configured mean and standard deviation
+                sigma2 = math.log(1 + (c.jitter_ms / max(c.latency_ms, 1e-9)) ** 2)
+                mu = math.log(max(c.latency_ms, 1e-9)) - sigma2 / 2
+                ms = self._rng.lognormvariate(mu, math.sqrt(sigma2))
+        return max(0.0, ms) / 1000
+
+    def prefix_cached(self, model: str, system: str) -> bool:
+        """True if this system prompt was already prefilled (prompt prefix cache)."""
+        key = (model, system)
+        with self._stats_lock:
+            if key in self._cached_prefixes:
+                return True
+            self._cached_prefixes.add(key)
+        return False
+
+    def load_model(self, model: str) -> float:
+        """Seconds spent loading the model (only on first use)."""
+        with self._stats_lock:
+            if model in self._loaded:
+                return 0.0
+            self._loaded.add(model)
+        load_s = self.config.load_ms / 1000
+        time.sleep(load_s)
+        return load_s
+
+    def classify(self, prompt: str, context: Optional[List[int]]) -> Optional[str]:
+        if context and len(context) > 1 and context[0] == _CONTEXT_MAGIC and 0 <= context[1] < len(self.kind_names):
+            return self.kind_names[context[1]]
+        for kind, prefix in self.kinds:
+            if prefix and prompt.startswith(prefix):
+                return kind
+        return None
+
+    def context_for(self, kind: Optional[str], previous: Optional[List[int]], new_tokens: int) -> List[int]:
+        if previous:
+            return previous + _token_ids(new_tokens, len(previous))
+        head = [_CONTEXT_MAGIC, self.kind_index.get(kind, len(self.kind_names))]
+        return head + _token_ids(new_tokens, head[1])
+
+    def digest(self, model: str) -> str:
+        return hashlib.sha256(f"mock:{model}".encode("utf-8")).hexdigest()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: MockOllamaServer
+
+    def log_message(self, fmt, *args):
+        logger.debug("%s - %s", self.address_string(), fmt % args)
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-mock"})
+        elif self.path == "/api/tags":
+            models = [
+                {"name": m, "model": m, "digest": self.server.digest(m), "size": 0}
+                for m in self.server.config.models
+            ]
+            self._send_json(200, {"models": models})
+        else:
+            self._send_json(404, {"error": f"not found: {self.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": f"invalid JSON: {e}"})
+            return
+        if self.path == "/api/generate":
+            self._generate(body)
+        elif self.path == "/api/chat":
+            self._generate(_chat_as_generate(body), chat=True)
+        else:
+            self._send_json(404, {"error": f"not found: {self.path}"})
+
+    # -------------------------------------------------
+    # /api/generate
+    # -------------------------------------------------
+    def _generate(self, body: dict, chat: bool = False) -> None:
+        server = self.server
+        server.count("requests")
+        model = body.get("model", "")
+        if model not in server.config.models:
+            self._send_json(404, {"error": f"model '{model}' not found"})
+            return
+
+        if server.roll() < server.config.failure_rate:
+            server.count("failures")
+            self._send_json(500, {"error": "injected failure"})
+            return
+        if server.roll() < server.config.timeout_rate:
+            server.count("hangs")
+            time.sleep(server.config.hang_seconds)
+            return
+
+        if server._slots is not None:
+            server._slots.acquire()
+        try:
+            self._serve_generate(body, model, chat)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client closed the stream early (e.g. JSON verdict complete)
+            logger.debug("Client closed the connection early")
+        finally:
+            if server._slots is not None:
+                server._slots.release()
+
+    def _serve_generate(self, body: dict, model: str, chat: bool = False) -> None:
+        """Answer a generate request, or a chat request translated by _chat_as_generate."""
+        server = self.server
+        config = server.config
+        start = time.perf_counter()
+        load_s = server.load_model(model)
+
+        prompt = body.get("prompt", "")
+        def reply(piece: str) -> dict:
+            return {"message": {"role": "assistant", "content": piece}} if chat else {"response": piece}
+
+        if not prompt:
+            # Preload request: load the model and return immediately
+            self._send_json(200, {
+                "model": model, **reply(""), "done": True, "done_reason": "load",
+                "load_duration": int(load_s * 1e9),
+                "total_duration": int((time.perf_counter() - start) * 1e9),
+            })
+            return
+
+        previous = body.get("context") or None
+        system = body.get("system") or ""
+        kind = server.classify(system or prompt, previous)
+        prompt_tokens = _tokens(prompt)
+        if system and not server.prefix_cached(model, system):
+            prompt_tokens += _tokens(system)
+        prefill_s = prompt_tokens / config.prefill_tps if config.prefill_tps > 0 else 0.0
+
+        options = body.get("options") or {}
+        if previous is None and options.get("num_predict") == 1:
+            # System prompt prefill: only the context is of interest
+            server.count("prefills")
+            text = ""
+        else:
+            text = json.dumps(server.verdicts.batch_response(kind, prompt) or server.verdicts.response(kind, prompt))
+        response_tokens = _tokens(text)
+        context = {} if chat else {"context": server.context_for(kind, previous, prompt_tokens + response_tokens)}
+        time.sleep(server.base_latency_s() + prefill_s)
+
+        stats = {
+            "load_duration": int(load_s * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prefill_s * 1e9),
+            "eval_count": response_tokens,
+        }
+        decode_s = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+        logger.debug("generate kind=%s prompt_tokens=%d response_tokens=%d", kind, prompt_tokens, response_tokens)
+
+        if body.get("stream", True) is False:
+            time.sleep(decode_s * response_tokens)
+            self._send_json(200, {
+                "model": model, **reply(text), "done": True, "done_reason": "stop",
+                **context,
+                "eval_duration": int(decode_s * response_tokens * 1e9),
+                "total_duration": int((time.perf_counter() - start) * 1e9),
+                **stats,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pieces = [text[i:i + 4] for i in range(0, len(text), 4)]
+        for piece in pieces:
+            time.sleep(decode_s)
+            self._write_chunk({"model": model, **reply(piece), "done": False})
+        self._write_chunk({
+            "model": model, **reply(""), "done": True, "done_reason": "stop",
+            **context,
+            "eval_duration": int(decode_s * len(pieces) * 1e9),
+            "total_duration": int((time.perf_counter() - start) * 1e9),
+            **stats,
+        })
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, obj: dict) -> None:
+        line = json.dumps(obj).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+
+def _chat_as_generate(body: dict) -> dict:
+    """Map a /api/chat body onto the generate fields: system messages -> system, the rest -> prompt."""
+    messages = body.get("messages") or []
+    system = "\n".join(m.get("content", "") for m in messages if m.get("role") == "system")
+    prompt = "\n".join(m.get("content", "") for m in messages if m.get("role") != "system")
+    fields = {k: v for k, v in body.items() if k not in ("messages", "context")}
+    return {**fields, "system": system, "prompt": prompt}
+
+
+def start_server(config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0) -> Tuple[MockOllamaServer, threading.Thread]:
+    """Start the mock in a background thread. Port 0 picks a free port (see server.server_address)."""
+    server = MockOllamaServer((host, port), config or MockConfig())
+    thread = threading.Thread(target=server.serve_forever, name="mock-ollama", daemon=True)
+    thread.start()
+    logger.info("Mock Ollama listening on http://%s:%d", *server.server_address[:2])
+    return server, thread
+
+
+def main():
+    defaults = MockConfig()
+    parser = argparse.ArgumentParser(description="Mock Ollama server for offline benchmarking")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--model", action="append", dest="models", help="Model name to serve (repeatable)")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Mean base latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms, help="Latency spread")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default=defaults.distribution)
+    parser.add_argument("--prefill-tps", type=float, default=defaults.prefill_tps, help="Prompt tokens per second")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second, help="Decode rate")
+    parser.add_argument("--load-ms", type=float, default=defaults.load_ms, help="Model load time on first use")
+    parser.add_argument("--flag-rate", type=float, default=defaults.flag_rate, help="Share of prompts answered FLAG/FAIL")
+    parser.add_argument("--failure-rate", type=float, default=defaults.failure_rate, help="Share of requests failing with HTTP 500")
+    parser.add_argument("--timeout-rate", type=float, default=defaults.timeout_rate, help="Share of requests that hang")
+    parser.add_argument("--hang-seconds", type=float, default=defaults.hang_seconds)
+    parser.add_argument("--parallel", type=int, default=defaults.parallel, help="Requests served concurrently (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--verdicts", type=Path, default=None, help="JSON file of fixed responses keyed by prompt name")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s")
+    config = MockConfig(
+        models=args.models or defaults.models,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        distribution=args.distribution,
+        prefill_tps=args.prefill_tps,
+        tokens_per_second=args.tokens_per_second,
+        load_ms=args.load_ms,
+        flag_rate=args.flag_rate,
+        failure_rate=args.failure_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        parallel=args.parallel,
+        seed=args.seed,
+        verdicts=json.loads(args.verdicts.read_text(encoding="utf-8")) if args.verdicts else {},
+    )
+    server = MockOllamaServer((args.host, args.port), config)
+    logger.info("Mock Ollama listening on http://%s:%d (models=%s)", args.host, args.port, config.models)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info("Served %s", server.stats)
+
+
+if __name__ == "__main__":
+    main()
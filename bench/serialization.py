@@ -0,0 +1,89 @@
+"""
+Request serialization benchmark for CachedOllamaClient.
+
+Compares, per generate call:
+
+- legacy:  the full payload dict (model, options, context, prompt) rebuilt and
+           JSON-encoded on every call, as requests does for `json=payload`
+- encoded: the static part of the body encoded once per client and the prompt
+           spliced onto it (CachedOllamaClient._encoded_body)
+
+for both context modes: "context" sends the prefilled token context with every
+call, "system" sends the system prompt text instead. No server is needed; the
+context is synthetic and sized with --context-tokens.
+
+    python -m bench.serialization --agent clarity --context-tokens 1500
+"""
+
+import argparse
+import json
+import random
+import time
+
+from common.cached_ollama_client import CONTEXT_MODES, CachedOllamaClient
+from common.prompt_loader import load_prompt
+
+REQUIREMENT = "The system shall export the monthly usage report as a PDF within 5 seconds of the user's request."
+
+
+def _legacy_body(client: CachedOllamaClient, prompt: str) -> bytes:
+    payload = {
+        "model": client.model,
+        "prompt": prompt,
+        **({"context": client.system_context} if client.system_context else {"system": client.system_prompt}),
+        "stream": False,
+        "options": client._options(client.num_predict),
+        **client._keep_alive(),
+    }
+    if client.output_schema is not None:
+        payload["format"] = client.output_schema
+    return json.dumps(payload, allow_nan=False).encode("utf-8")
+
+
+def _time_per_call_us(fn, prompts: list, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(prompts[i % len(prompts)])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def _make_client(agent: str, context_mode: str, context_tokens: int, seed: int) -> CachedOllamaClient:
+    client = CachedOllamaClient(
+        model="qwen3:1.7b",
+        base_url="http://localhost:11434",
+        system_prompt=load_prompt(agent, "s3/system_prompts"),
+        lazy_context=True,
+        keep_alive="30m",
+        context_mode=context_mode,
+    )
+    if context_mode == "context":
+        rng = random.Random(seed)
+        client.system_context = [rng.randrange(151_000) for _ in range(context_tokens)]
+    client._context_ready = True
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generate request serialization")
+    parser.add_argument("--agent", default="clarity", help="S3 system prompt to use")
+    parser.add_argument("--context-tokens", type=int, default=1500, help="Synthetic context length (context mode)")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    task = load_prompt("shared_task", "s3/task_prompts")
+    prompts = [task.replace("{{REQUIREMENT}}", f"{REQUIREMENT} (#{i})") for i in range(64)]
+
+    print(f"{'context_mode':<14}{'method':<10}{'us/call':>10}{'bytes/request':>15}")
+    for mode in CONTEXT_MODES:
+        client = _make_client(args.agent, mode, args.context_tokens, args.seed)
+        # Both methods must produce the same request
+        assert json.loads(_legacy_body(client, prompts[0])) == json.loads(client._encoded_body(prompts[0]))
+        for method, fn in (("legacy", lambda p: _legacy_body(client, p)), ("encoded", client._encoded_body)):
+            us = _time_per_call_us(fn, prompts, args.iterations)
+            size = len(fn(prompts[0]))
+            print(f"{mode:<14}{method:<10}{us:>10.1f}{size:>15,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Cold-start time of every `python -m marva` subcommand.
+
+Each subcommand is started in a fresh interpreter with `--help`, which returns
+as soon as the subsystem is imported and its arguments are parsed. Reported
+per subcommand: best and median wall time over --repeat runs, the number of
+modules imported (from `python -X importtime`) and which heavy dependencies
+were loaded.
+
+    python -m bench.startup --repeat 5
+    python -m bench.startup --commands "run s1,run s3" --output bench/results/startup.jsonl
+
+With --output, one JSON line per invocation (time, git revision, Python
+version, results) is appended to the file so cold start can be tracked over
+time.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from marva import subcommands
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Dependencies whose presence in a subcommand's imports is worth reporting
+HEAVY_MODULES = ("langgraph", "langchain_core", "pandas", "sklearn", "scipy", "matplotlib", "httpx", "requests")
+
+
+def _command(args: list, importtime: bool = False) -> list:
+    return [sys.executable, *(["-X", "importtime"] if importtime else []), "-m", "marva", *args, "--help"]
+
+
+def _time_once(args: list) -> tuple:
+    start = time.perf_counter()
+    proc = subprocess.run(_command(args), cwd=PROJECT_ROOT, capture_output=True)
+    return (time.perf_counter() - start) * 1000, proc.returncode
+
+
+def _imports(args: list) -> tuple:
+    """(number of modules imported, heavy top-level packages among them)."""
+    proc = subprocess.run(_command(args, importtime=True), cwd=PROJECT_ROOT, capture_output=True, text=True)
+    names = [
+        line.rsplit("|", 1)[-1].strip()
+        for line in proc.stderr.splitlines()
+        if line.startswith("import time:") and not line.rstrip().endswith("| imported package")
+    ]
+    top_level = {name.split(".")[0] for name in names}
+    return len(names), [m for m in HEAVY_MODULES if m in top_level]
+
+
+def _git_revision() -> str:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    return proc.stdout.strip() or "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the marva subcommands")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters started per subcommand")
+    parser.add_argument("--commands", default=None,
+                        help='Comma-separated subset, e.g. "run s1,eval" (default: all, plus the bare dispatcher)')
+    parser.add_argument("--output", default=None, help="Append the results as one JSON line to this file")
+    args = parser.parse_args()
+
+    if args.commands:
+        commands = [c.split() for c in args.commands.split(",")]
+    else:
+        commands = [[]] + subcommands()
+
+    results = []
+    for command in commands:
+        timings, failed = [], 0
+        for _ in range(args.repeat):
+            ms, returncode = _time_once(command)
+            timings.append(ms)
+            failed += returncode != 0
+        modules, heavy = _imports(command)
+        results.append({
+            "command": " ".join(command) or "(dispatcher)",
+            "best_ms": round(min(timings), 1),
+            "median_ms": round(statistics.median(timings), 1),
+            "modules": modules,
+            "heavy": heavy,
+            "failed": failed,
+        })
+
+    print(f"{'command':<26}{'best ms':>9}{'median ms':>11}{'modules':>9}{'failed':>8}  heavy imports")
+    for r in results:
+        print(
+            f"{r['command']:<26}{r['best_ms']:>9.0f}{r['median_ms']:>11.0f}{r['modules']:>9}{r['failed']:>8}"
+            f"  {', '.join(r['heavy']) or '-'}"
+        )
+
+    if args.output:
+        record = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"Appended to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Adaptive per-call timeouts derived from observed latencies.
+
+A single `timeout_seconds` is either far too long for a short single-mode
+check or too short for a group-mode prompt over a whole dataset. Clients ask
+this module for the timeout of a key (agent or prompt name plus mode, e.g.
+"clarity:single"). The timeout is the rolling percentile of recent successful
+latencies for that key times a safety margin, bounded by a floor and a ceiling.
+Until enough samples exist, the static `timeout_seconds` is used.
+
+A call that times out raises the timeout of its key right away: the next
+attempt gets the timeout it hit times `backoff` (capped at the ceiling). Each
+successful call under the key then shrinks that raise by `decay` until the
+percentile-based timeout takes over again. The timed-out call is also recorded
+as a latency sample at the timeout it hit.
+
+Clients record the timeout applied to every attempt as `timeout_s` in the
+metrics registry (common/llm_metrics.py), next to its latency.
+
+Configured in config/global.yaml:
+
+    adaptive_timeout:
+      enabled: true
+      percentile: 99
+      margin: 1.5
+      window: 200
+      min_samples: 10
+      floor_seconds: 10
+      ceiling_seconds: 600
+      backoff: 2.0
+      decay: 0.9
+"""
+
+import logging
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger("marva.adaptive_timeout")
+
+
+class AdaptiveTimeouts:
+    """Thread-safe rolling latency windows and the timeouts derived from them."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = 99.0,
+        margin: float = 1.5,
+        window: int = 200,
+        min_samples: int = 10,
+        floor_seconds: float = 10.0,
+        ceiling_seconds: float = 600.0,
+        backoff: float = 2.0,
+        decay: float = 0.9,
+    ):
+        self._lock = threading.Lock()
+        self._windows: Dict[str, Deque[float]] = {}
+        self._timeouts_hit: Dict[str, int] = {}
+        # Raised timeout in seconds per key after a timeout, decaying with each success
+        self._raised: Dict[str, float] = {}
+        self.configure(enabled, percentile, margin, window, min_samples, floor_seconds, ceiling_seconds, backoff, decay)
+
+    def configure(
+        self,
+        enabled: bool = False,
+        percentile: float = 99.0,
+        margin: float = 1.5,
+        window: int = 200,
+        min_samples: int = 10,
+        floor_seconds: float = 10.0,
+        ceiling_seconds: float = 600.0,
+        backoff: float = 2.0,
+        decay: float = 0.9,
+    ) -> None:
+        if floor_seconds > ceiling_seconds:
+            raise ValueError(f"adaptive_timeout: floor_seconds ({floor_seconds}) exceeds ceiling_seconds ({ceiling_seconds})")
+        if backoff < 1 or not 0 < decay < 1:
+            raise ValueError(f"adaptive_timeout: backoff ({backoff}) must be at least 1 and decay ({decay}) between 0 and 1")
+        with self._lock:
+            self.enabled = enabled
+            self.percentile = percentile
+            self.margin = margin
+            self.window = window
+            self.min_samples = min_samples
+            self.floor_seconds = floor_seconds
+            self.ceiling_seconds = ceiling_seconds
+            self.backoff = backoff
+            self.decay = decay
+            self._windows = {k: deque(v, maxlen=window) for k, v in self._windows.items()}
+        logger.debug(
+            "Adaptive timeouts configured (enabled=%s, p%g x %.2f, window=%d, min_samples=%d, bounds=[%gs, %gs], "
+            "backoff x%g, decay %g)",
+            enabled, percentile, margin, window, min_samples, floor_seconds, ceiling_seconds, backoff, decay,
+        )
+
+    def _percentile_ms(self, values: Deque[float]) -> float:
+        ordered = sorted(values)
+        idx = max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+        return ordered[idx]
+
+    def timeout(self, key: Optional[str], default: float) -> float:
+        """Timeout in seconds for the next call under `key`."""
+        if not self.enabled or key is None:
+            return default
+        with self._lock:
+            raised = self._raised.get(key, 0.0)
+            values = self._windows.get(key)
+            if values is None or len(values) < self.min_samples:
+                return max(default, raised)
+            observed_ms = self._percentile_ms(values)
+        adaptive = min(self.ceiling_seconds, max(self.floor_seconds, observed_ms / 1000 * self.margin))
+        return max(adaptive, raised)
+
+    def observe(self, key: Optional[str], latency_ms: float) -> None:
+        """Record the latency of a successful call."""
+        if not self.enabled or key is None:
+            return
+        with self._lock:
+            self._append(key, latency_ms)
+            raised = self._raised.get(key)
+            if raised is not None:
+                raised *= self.decay
+                if raised <= self.floor_seconds:
+                    del self._raised[key]
+                else:
+                    self._raised[key] = raised
+
+    def _append(self, key: str, latency_ms: float) -> None:
+        values = self._windows.get(key)
+        if values is None:
+            values = self._windows[key] = deque(maxlen=self.window)
+        values.append(float(latency_ms))
+
+    def observe_timeout(self, key: Optional[str], timeout_seconds: float) -> None:
+        """Record a timed-out call and raise the timeout of `key` for the next attempt."""
+        if not self.enabled or key is None:
+            return
+        raised = min(self.ceiling_seconds, timeout_seconds * self.backoff)
+        with self._lock:
+            self._timeouts_hit[key] = self._timeouts_hit.get(key, 0) + 1
+            self._append(key, timeout_seconds * 1000)
+            self._raised[key] = max(self._raised.get(key, 0.0), raised)
+        logger.info("Timeout [%s] hit at %.1fs; raised to %.1fs", key, timeout_seconds, raised)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._windows.items()}
+            timeouts_hit = dict(self._timeouts_hit)
+        out = {}
+        for key, values in snapshot.items():
+            out[key] = {
+                "samples": len(values),
+                "percentile_ms": self._percentile_ms(values) if values else 0.0,
+                "timeouts": timeouts_hit.get(key, 0),
+            }
+        return out
+
+    def log_stats(self, log: Optional[logging.Logger] = None, default: float = 60.0) -> None:
+        log = log or logger
+        if not self.enabled:
+            return
+        for key, s in sorted(self.stats().items()):
+            log.info(
+                "Timeout [%s]: p%g=%.0fms over %d samples, %d timeouts, next timeout=%.1fs",
+                key, self.percentile, s["percentile_ms"], s["samples"], s["timeouts"], self.timeout(key, default),
+            )
+
+
+_TIMEOUTS = AdaptiveTimeouts()
+_DEFAULT_SECONDS = 60.0
+
+
+def get_adaptive_timeouts() -> AdaptiveTimeouts:
+    return _TIMEOUTS
+
+
+def configure_timeouts(global_cfg: dict) -> None:
+    """Apply the 'adaptive_timeout' block of the 'global' config section."""
+    global _DEFAULT_SECONDS
+    _DEFAULT_SECONDS = float(global_cfg.get("timeout_seconds", _DEFAULT_SECONDS))
+    timeout_cfg = global_cfg.get("adaptive_timeout") or {}
+    _TIMEOUTS.configure(
+        enabled=timeout_cfg.get("enabled", False),
+        percentile=float(timeout_cfg.get("percentile", 99)),
+        margin=float(timeout_cfg.get("margin", 1.5)),
+        window=int(timeout_cfg.get("window", 200)),
+        min_samples=int(timeout_cfg.get("min_samples", 10)),
+        floor_seconds=float(timeout_cfg.get("floor_seconds", 10)),
+        ceiling_seconds=float(timeout_cfg.get("ceiling_seconds", 600)),
+        backoff=float(timeout_cfg.get("backoff", 2.0)),
+        decay=float(timeout_cfg.get("decay", 0.9)),
+    )
+
+
+def log_timeout_stats(log: Optional[logging.Logger] = None) -> None:
+    _TIMEOUTS.log_stats(log, default=_DEFAULT_SECONDS)
@@ -0,0 +1,246 @@
+"""
+Global admission control for LLM requests.
+
+Caps the number of requests in flight against each Ollama host, across every
+client and thread in the process. Excess callers wait in a FIFO queue and are
+admitted in arrival order as slots free up, so a server running with a small
+OLLAMA_NUM_PARALLEL is never handed more work than it can schedule. Threads
+queue with admit(), coroutines with aadmit(); both share the same slots. A
+caller given a CancelEvent (common/cancellation.py) leaves the queue as soon
+as it is set, with AdmissionCancelled.
+
+Configured in config/model.yaml:
+
+    max_inflight_per_host: 4     # null disables the limit
+    host_max_inflight:           # optional per-host overrides
+      http://gpu-box:11434: 8
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+from common.cancellation import on_cancel
+
+logger = logging.getLogger("marva.admission")
+
+
+def _normalize_host(base_url: str) -> str:
+    return base_url.rstrip("/")
+
+
+class AdmissionCancelled(Exception):
+    """The caller's cancel_event was set while it was queued for a slot."""
+
+
+class Ticket:
+    """Handed to the caller on admission; wait_ms is the time spent queued."""
+
+    __slots__ = ("host", "wait_ms")
+
+    def __init__(self, host: str, wait_ms: float):
+        self.host = host
+        self.wait_ms = wait_ms
+
+
+class _LoopWaiter:
+    """Queue entry of a coroutine: set() wakes it on its event loop, from any thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def set(self) -> None:
+        self.loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class _HostGate:
+    """FIFO counting semaphore: a released slot is handed to the oldest waiter."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.inflight = 0
+        self.queue: deque = deque()
+        self.lock = threading.Lock()
+        self.admitted = 0
+        self.queued = 0
+        self.max_queue = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def _enter(self, waiter) -> bool:
+        """Take a free slot (True) or queue `waiter`, whose set() is called with the slot."""
+        with self.lock:
+            if self.inflight < self.limit and not self.queue:
+                self.inflight += 1
+                self.admitted += 1
+                return True
+            self.queue.append(waiter)
+            self.queued += 1
+            self.max_queue = max(self.max_queue, len(self.queue))
+            return False
+
+    def _leave(self, waiter) -> None:
+        """Withdraw a queued waiter, passing on the slot if it was already handed over."""
+        with self.lock:
+            try:
+                self.queue.remove(waiter)
+                handed_over = False
+            except ValueError:
+                handed_over = True
+        if handed_over:
+            self.release()
+
+    def acquire(self, cancel_event: Optional[threading.Event] = None) -> float:
+        start = time.perf_counter()
+        event = threading.Event()
+        if self._enter(event):
+            return 0.0
+        # The slot is transferred by release(); inflight is not decremented in between
+        with on_cancel(cancel_event, event.set):
+            event.wait()
+        if cancel_event is not None and cancel_event.is_set():
+            self._leave(event)
+            raise AdmissionCancelled()
+        return self._admitted(start)
+
+    async def aacquire(self, cancel_event: Optional[threading.Event] = None) -> float:
+        start = time.perf_counter()
+        waiter = _LoopWaiter(asyncio.get_running_loop())
+        if self._enter(waiter):
+            return 0.0
+        try:
+            with on_cancel(cancel_event, waiter.set):
+                await waiter.future
+        except asyncio.CancelledError:
+            self._leave(waiter)
+            raise
+        if cancel_event is not None and cancel_event.is_set():
+            self._leave(waiter)
+            raise AdmissionCancelled()
+        return self._admitted(start)
+
+    def _admitted(self, start: float) -> float:
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.admitted += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        return wait_ms
+
+    def release(self) -> None:
+        with self.lock:
+            if self.queue:
+                self.queue.popleft().set()
+            else:
+                self.inflight -= 1
+
+
+class AdmissionController:
+    """Per-host in-flight limits shared by all LLM clients in the process."""
+
+    def __init__(self, max_inflight_per_host: Optional[int] = None, host_limits: Optional[Dict[str, int]] = None):
+        self._lock = threading.Lock()
+        self._gates: Dict[str, _HostGate] = {}
+        self.max_inflight_per_host = max_inflight_per_host
+        self.host_limits = {_normalize_host(h): int(n) for h, n in (host_limits or {}).items()}
+
+    def configure(self, max_inflight_per_host: Optional[int] = None, host_limits: Optional[Dict[str, int]] = None) -> None:
+        """Update limits. Only affects hosts first seen after the call."""
+        with self._lock:
+            self.max_inflight_per_host = max_inflight_per_host
+            self.host_limits = {_normalize_host(h): int(n) for h, n in (host_limits or {}).items()}
+        logger.debug("Admission configured (max_inflight_per_host=%s, host_limits=%s)", max_inflight_per_host, self.host_limits)
+
+    def _gate(self, host: str) -> Optional[_HostGate]:
+        with self._lock:
+            gate = self._gates.get(host)
+            if gate is None:
+                limit = self.host_limits.get(host, self.max_inflight_per_host)
+                if not limit:
+                    return None
+                gate = _HostGate(int(limit))
+                self._gates[host] = gate
+            return gate
+
+    @contextmanager
+    def admit(self, base_url: str, cancel_event: Optional[threading.Event] = None) -> Iterator[Ticket]:
+        """Block until a slot for the host is free; release it on exit."""
+        host = _normalize_host(base_url)
+        gate = self._gate(host)
+        if gate is None:
+            yield Ticket(host, 0.0)
+            return
+        wait_ms = gate.acquire(cancel_event)
+        if wait_ms >= 1:
+            logger.debug("Admitted to %s after %.0fms in queue", host, wait_ms)
+        try:
+            yield Ticket(host, wait_ms)
+        finally:
+            gate.release()
+
+    @asynccontextmanager
+    async def aadmit(self, base_url: str, cancel_event: Optional[threading.Event] = None) -> AsyncIterator[Ticket]:
+        """Await a slot for the host without blocking the event loop; release it on exit."""
+        host = _normalize_host(base_url)
+        gate = self._gate(host)
+        if gate is None:
+            yield Ticket(host, 0.0)
+            return
+        wait_ms = await gate.aacquire(cancel_event)
+        if wait_ms >= 1:
+            logger.debug("Admitted to %s after %.0fms in queue", host, wait_ms)
+        try:
+            yield Ticket(host, wait_ms)
+        finally:
+            gate.release()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            gates = dict(self._gates)
+        return {
+            host: {
+                "limit": g.limit,
+                "admitted": g.admitted,
+                "queued": g.queued,
+                "max_queue": g.max_queue,
+                "mean_wait_ms": g.total_wait_ms / g.queued if g.queued else 0.0,
+                "max_wait_ms": g.max_wait_ms,
+            }
+            for host, g in gates.items()
+        }
+
+    def log_stats(self, log: Optional[logging.Logger] = None) -> None:
+        log = log or logger
+        for host, s in self.stats().items():
+            log.info(
+                "Admission %s (limit=%d): %d admitted, %d queued (max depth %d), wait mean=%.0fms max=%.0fms",
+                host, s["limit"], s["admitted"], s["queued"], s["max_queue"], s["mean_wait_ms"], s["max_wait_ms"],
+            )
+
+
+_CONTROLLER = AdmissionController()
+
+
+def get_admission_controller() -> AdmissionController:
+    return _CONTROLLER
+
+
+def configure_admission(model_cfg: dict) -> None:
+    """Apply admission limits from the 'model' config section."""
+    _CONTROLLER.configure(
+        max_inflight_per_host=model_cfg.get("max_inflight_per_host"),
+        host_limits=model_cfg.get("host_max_inflight"),
+    )
+
+
+def log_admission_stats(log: Optional[logging.Logger] = None) -> None:
+    _CONTROLLER.log_stats(log)
@@ -0,0 +1,199 @@
+"""
+Asyncio-native variant of CachedOllamaClient.
+
+Same system prompt context caching, retry policy and result dict shape as
+CachedOllamaClient, but requests are awaited on the event loop instead of
+blocking an OS thread. One loop can keep hundreds of agent calls in flight:
+
+    client = await AsyncCachedOllamaClient.create(
+        model="qwen3:1.7b",
+        base_url="http://localhost:11434",
+        system_prompt="You are an expert validator...",
+    )
+    results = await asyncio.gather(*(client.agenerate(p) for p in prompts))
+
+Requests pass the same admission control, adaptive timeouts, streaming early
+stop and cancellation as the blocking client: the retry bookkeeping and the
+stream parsing are CachedOllamaClient's own helpers, only the I/O differs.
+They are sent with httpx, so they bypass the requests-based record/replay
+transport; the client refuses to be built unless transport.mode is "live".
+
+Built for the S3 agents by common/client_factory.py with model.async_agents;
+s3/graph.py then awaits each fan-out on the shared loop (common/event_loop.py).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+import httpx
+
+from common.admission import AdmissionCancelled, get_admission_controller
+from common.cached_ollama_client import _JSON_HEADERS, CachedOllamaClient, StreamReader
+from common.chat_ollama_client import ChatOllamaClient
+from common.http_pool import get_async_client
+from common.transport import transport_mode
+
+logger = logging.getLogger("marva.cached_ollama.async")
+
+
+class AsyncCachedOllamaClient(CachedOllamaClient):
+    """
+    Ollama client with system prompt context caching and an async API.
+
+    Architecture:
+    - __init__: Stores settings only (no blocking I/O)
+    - initialize: Sends system prompt once, stores returned context
+    - agenerate: Sends only user prompt + cached context
+    - generate: Inherited blocking variant (prefills synchronously if needed)
+
+    The system context is initialized lazily on the first agenerate() call if
+    initialize() was not awaited explicitly; concurrent first calls share a
+    single initialization request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if transport_mode() != "live":
+            raise ValueError(
+                f"AsyncCachedOllamaClient does not support transport mode '{transport_mode()}' "
+                "(its httpx requests bypass the record/replay transport)"
+            )
+        # The blocking prefill in CachedOllamaClient.__init__ is replaced by
+        # initialize() unless the caller asks for it up front
+        kwargs.setdefault("lazy_context", True)
+        super().__init__(*args, **kwargs)
+        self._init_lock = None
+
+    @classmethod
+    async def create(cls, *args, **kwargs) -> "AsyncCachedOllamaClient":
+        """Build a client and await its system context initialization."""
+        client = cls(*args, **kwargs)
+        await client.initialize()
+        return client
+
+    async def initialize(self) -> None:
+        """Send the system prompt once and cache the returned context."""
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        async with self._init_lock:
+            if self._context_ready:
+                return
+            if self.context_mode == "context":
+                self.system_context = await self._ainitialize_system_context()
+            self._body_prefixes = {}
+            self._context_ready = True
+
+    async def _ainitialize_system_context(self) -> List[int]:
+        store_key, context = await asyncio.to_thread(self._load_stored_context)
+        if context:
+            return context
+
+        url = f"{self.base_url}/api/generate"
+        payload = self._system_payload()
+
+        logger.debug("Caching system prompt (model=%s, prompt_len=%d)", self.model, len(self.system_prompt))
+        start = time.perf_counter()
+
+        try:
+            async with get_admission_controller().aadmit(self.base_url):
+                response = await get_async_client(self.base_url).post(url, json=payload, timeout=self.timeout)
+                response.raise_for_status()
+                result = response.json()
+            context = self._context_from_result(result, (time.perf_counter() - start) * 1000)
+            await asyncio.to_thread(self._save_context, store_key, context)
+            return context
+
+        except Exception as e:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logger.error("Failed to cache system prompt (model=%s, %.0fms): %s", self.model, elapsed_ms, e)
+            return []
+
+    async def _apost_streaming(
+        self, url: str, prompt: str, timeout: float, cancel_event: Optional[Union[threading.Event, asyncio.Event]] = None
+    ) -> Dict:
+        """Async counterpart of CachedOllamaClient._post_streaming (same result dict)."""
+        reader = StreamReader(self, cancel_event)
+        body = self._encoded_body(prompt, stream=True)
+        async with get_async_client(self.base_url).stream(
+            "POST", url, content=body, headers=_JSON_HEADERS, timeout=timeout
+        ) as response:
+            # Leaving the block closes the connection, which makes Ollama stop generating
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if reader.feed(line):
+                    break
+        return reader.result()
+
+    async def _apost(
+        self, url: str, prompt: str, timeout: float, cancel_event: Optional[Union[threading.Event, asyncio.Event]] = None
+    ) -> Dict:
+        """Send one generate request (streaming or not) and return the parsed result."""
+        if self.stream:
+            return await self._apost_streaming(url, prompt, timeout, cancel_event)
+        response = await get_async_client(self.base_url).post(
+            url, content=self._encoded_body(prompt), headers=_JSON_HEADERS, timeout=timeout
+        )
+        response.raise_for_status()
+        result = response.json()
+        return {**result, "response": self._response_text(result)}
+
+    async def agenerate(
+        self,
+        prompt: str,
+        timeout_key: Optional[str] = None,
+        cancel_event: Optional[Union[threading.Event, asyncio.Event]] = None,
+    ) -> Dict:
+        """
+        Generate response using cached system context without blocking the loop.
+
+        Args:
+            prompt: User prompt to send
+            timeout_key: Overrides the client's adaptive timeout key for this call
+            cancel_event: Set (from a thread or the loop) to abort a stream and skip retries
+
+        Returns:
+            Dict with the same keys as CachedOllamaClient.generate, including
+            'queue_wait_ms' and 'timeout_s'
+        """
+        if not self._context_ready:
+            await self.initialize()
+
+        url = f"{self.base_url}/api/{self.ENDPOINT}"
+
+        logger.debug("Async cached generate called (prompt_len=%d, cached_context=%d tokens)", len(prompt), len(self.system_context))
+
+        timeout_key = timeout_key or self.timeout_key
+        queue_wait_ms = 0.0
+        for attempt in range(1, self.max_retries + 1):
+            if cancel_event is not None and cancel_event.is_set():
+                return self._cancelled_result(attempt - 1, queue_wait_ms)
+            timeout = self._attempt_timeout(timeout_key, attempt)
+            try:
+                # Queue wait for a host slot is reported separately from model latency
+                async with get_admission_controller().aadmit(self.base_url, cancel_event) as ticket:
+                    queue_wait_ms += ticket.wait_ms
+                    start_time = time.time()
+                    result = await self._apost(url, prompt, timeout, cancel_event)
+                    latency_ms = int((time.time() - start_time) * 1000)
+                return self._attempt_succeeded(result, latency_ms, attempt, queue_wait_ms, timeout, timeout_key)
+
+            except AdmissionCancelled:
+                logger.debug("[%s] Cancelled while queued for a host slot", self.name)
+                return self._cancelled_result(attempt - 1, queue_wait_ms)
+
+            except httpx.TimeoutException:
+                output = self._attempt_timed_out(attempt, queue_wait_ms, timeout, timeout_key)
+
+            except Exception as e:
+                output = self._attempt_failed(e, attempt, queue_wait_ms)
+
+            if output is not None:
+                return output
+
+        return self._error_result("Max retries exceeded", self.max_retries, queue_wait_ms)
+
+
+class AsyncChatOllamaClient(AsyncCachedOllamaClient, ChatOllamaClient):
+    """AsyncCachedOllamaClient speaking /api/chat (see ChatOllamaClient)."""
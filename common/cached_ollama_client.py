@@ -9,14 +9,76 @@ Compatible with the agent architecture and can be used as a drop-in replacement
 for ChatOllama or LLMClient in agent initialization.
 """
 
+import hashlib
+import json
 import re
 import requests
+import threading
 import time
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
+
+from common.adaptive_timeout import get_adaptive_timeouts
+from common.admission import AdmissionCancelled, get_admission_controller
+from common.http_pool import get_session
+from common.json_scanner import IncrementalJSONScanner
+from common.llm_metrics import ollama_usage, record_metrics, record_usage
 
 logger = logging.getLogger("marva.cached_ollama")
 
+CONTEXT_MODES = ("context", "system")
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class StreamReader:
+    """
+    Accumulates one streamed generate response, line by line.
+
+    Holds no I/O of its own so the blocking and async clients feed it from
+    their own transports and build the same result dict.
+    """
+
+    def __init__(self, client: "CachedOllamaClient", cancel_event: Optional[threading.Event] = None):
+        self.client = client
+        self.cancel_event = cancel_event
+        self.scanner = IncrementalJSONScanner()
+        self.start = time.perf_counter()
+        self.ttft_ms = None
+        self.early_stop = False
+        self.cancelled = False
+        self.final = {}
+
+    def feed(self, line: Union[str, bytes]) -> bool:
+        """Consume one NDJSON line. Returns True once reading should stop."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            self.cancelled = True
+            return True
+        if not line:
+            return False
+        chunk = json.loads(line)
+        token = self.client._response_text(chunk)
+        if token and self.ttft_ms is None:
+            self.ttft_ms = int((time.perf_counter() - self.start) * 1000)
+        if chunk.get("done"):
+            self.final = chunk
+            self.scanner.feed(token)
+            return True
+        if self.scanner.feed(token):
+            self.early_stop = True
+            return True
+        return False
+
+    def result(self) -> Dict:
+        text = self.scanner.object_text if self.early_stop else self.scanner.buffer
+        return {
+            **self.final,
+            "response": text,
+            "ttft_ms": self.ttft_ms,
+            "verdict_ms": int((time.perf_counter() - self.start) * 1000),
+            "early_stop": self.early_stop,
+            "cancelled": self.cancelled,
+        }
+
 
 class CachedOllamaClient:
     """
@@ -41,6 +103,7 @@ class CachedOllamaClient:
     """
 
     _THINK_RE = re.compile(r"<think>.*?</think>\s*", re.DOTALL)
+    ENDPOINT = "generate"
 
     def __init__(
         self,
@@ -52,6 +115,14 @@ class CachedOllamaClient:
         timeout: int = 60,
         max_retries: int = 3,
         disable_think: bool = True,
+        stream: bool = False,
+        name: Optional[str] = None,
+        context_store=None,
+        lazy_context: bool = False,
+        timeout_key: Optional[str] = None,
+        output_schema: Optional[Dict] = None,
+        keep_alive: Optional[Union[str, int]] = None,
+        context_mode: str = "context",
     ):
         """
         Initialize client and cache system prompt context.
@@ -68,6 +139,22 @@ class CachedOllamaClient:
                            chain-of-thought blocks that would otherwise consume the
                            token budget and truncate the JSON response). Safe to set
                            on models that don't support this option — Ollama ignores it.
+            stream: If True, reads the NDJSON token stream and closes the connection
+                    as soon as the first top-level JSON object is complete
+            name: Label used in logs and run metrics (e.g. the S3 agent name)
+            context_store: Optional ContextStore; a stored context for the same
+                           host, model and system prompt skips the prefill call
+            lazy_context: If True, defer the system prompt prefill to the first
+                          generate() call instead of blocking in __init__
+            timeout_key: Latency key for adaptive timeouts (e.g. "clarity:single");
+                         None keeps the static timeout
+            output_schema: JSON schema sent as the request 'format' so Ollama
+                           constrains decoding to valid JSON of that shape
+            keep_alive: Sent with every request so Ollama keeps the model loaded
+                        (e.g. "30m", -1 for never); None uses the server default
+            context_mode: "context" sends the cached token context with every call;
+                          "system" skips the prefill and sends the system prompt
+                          text instead, relying on Ollama's prompt prefix cache
         """
         self.model = model
         self.base_url = base_url
@@ -77,9 +164,224 @@ class CachedOllamaClient:
         self.max_retries = max_retries
         self.system_prompt = system_prompt
         self.disable_think = disable_think
+        self.stream = stream
+        self.name = name or model
+        self.context_store = context_store
+        self.timeout_key = timeout_key
+        self.output_schema = output_schema
+        self.keep_alive = keep_alive
+        if context_mode not in CONTEXT_MODES:
+            raise ValueError(f"Unknown context_mode '{context_mode}', expected one of {CONTEXT_MODES}")
+        self.context_mode = context_mode
+        # Encoded request body up to the prompt, per stream flag (see _encoded_body)
+        self._body_prefixes: Dict[bool, bytes] = {}
 
         # Initialize system context (send system prompt once)
-        self.system_context = self._initialize_system_context()
+        self._context_lock = threading.Lock()
+        self._context_ready = False
+        self.system_context: List[int] = []
+        if not lazy_context:
+            self.ensure_context()
+
+    def ensure_context(self) -> None:
+        """Prefill the system prompt if that has not happened yet (thread-safe)."""
+        if self._context_ready:
+            return
+        with self._context_lock:
+            if not self._context_ready:
+                if self.context_mode == "context":
+                    self.system_context = self._initialize_system_context()
+                self._body_prefixes = {}
+                self._context_ready = True
+
+    # -------------------------------------------------
+    # Request / response helpers (shared with AsyncCachedOllamaClient)
+    # -------------------------------------------------
+    def _options(self, num_predict: int) -> Dict:
+        return {
+            "temperature": self.temperature,
+            "num_predict": num_predict,
+            **({"think": False} if self.disable_think else {}),
+        }
+
+    def _keep_alive(self) -> Dict:
+        return {} if self.keep_alive is None else {"keep_alive": self.keep_alive}
+
+    def _system_payload(self) -> Dict:
+        return {
+            "model": self.model,
+            "prompt": self.system_prompt,
+            "stream": False,
+            "options": self._options(1),  # minimize wasted generation, we only need the context
+            **self._keep_alive(),
+        }
+
+    def _static_fields(self, stream: bool = False) -> Dict:
+        """Request fields that are the same for every generate call."""
+        fields = {"model": self.model}
+        if self.system_context:
+            fields["context"] = self.system_context  # Reuse cached context
+        else:
+            # context_mode "system", or the prefill failed
+            fields["system"] = self.system_prompt
+        fields.update(stream=stream, options=self._options(self.num_predict), **self._keep_alive())
+        if self.output_schema is not None:
+            fields["format"] = self.output_schema
+        return fields
+
+    def _response_text(self, chunk: Dict) -> str:
+        """Generated text of a response (or of one streamed chunk)."""
+        return chunk.get("response", "")
+
+    def _generate_payload(self, prompt: str) -> Dict:
+        return {**self._static_fields(), "prompt": prompt}
+
+    def _encoded_body(self, prompt: str, stream: bool = False) -> bytes:
+        """
+        JSON request body for a generate call.
+
+        The static fields (including a context of possibly thousands of token
+        IDs) are encoded once per client; each call only serializes the prompt
+        and splices it onto the cached prefix.
+        """
+        prefix = self._body_prefixes.get(stream)
+        if prefix is None:
+            static = json.dumps(self._static_fields(stream)).encode("utf-8")
+            prefix = static[:-1] + b', "prompt": '
+            self._body_prefixes[stream] = prefix
+        return prefix + json.dumps(prompt).encode("utf-8") + b"}"
+
+    def _context_from_result(self, result: Dict, elapsed_ms: float) -> List[int]:
+        context = result.get("context", [])
+        if not context:
+            logger.warning("No context returned from system prompt init (model=%s, %.0fms)", self.model, elapsed_ms)
+        else:
+            logger.info("System prompt cached (model=%s, context_tokens=%d, %.0fms)", self.model, len(context), elapsed_ms)
+        return context
+
+    def _success_result(self, result: Dict, latency_ms: int, attempt: int, queue_wait_ms: float = 0.0) -> Dict:
+        text = result.get("response", "")
+        logger.debug("Raw Ollama response (len=%d): %r", len(text), text[:300])
+        # Strip thinking blocks (e.g. qwen3 <think>...</think>)
+        text = self._THINK_RE.sub("", text).strip()
+        logger.debug("Cached generate response (latency=%dms, response_len=%d, attempt=%d)", latency_ms, len(text), attempt)
+        usage = ollama_usage(result)
+        record_usage(self.name, usage, cached_tokens=len(self.system_context))
+        return {
+            "execution_status": "SUCCESS",
+            "text": text,
+            "latency_ms": latency_ms,
+            "error": None,
+            "attempts": attempt,
+            "queue_wait_ms": int(queue_wait_ms),
+            "usage": usage,
+        }
+
+    def _timeout_result(self, attempt: int, queue_wait_ms: float = 0.0, timeout: Optional[float] = None) -> Dict:
+        return {
+            "execution_status": "TIMEOUT",
+            "text": "",
+            "latency_ms": int((timeout or self.timeout) * 1000),
+            "error": "Request timeout",
+            "attempts": attempt,
+            "queue_wait_ms": int(queue_wait_ms),
+        }
+
+    def _cancelled_result(self, attempt: int, queue_wait_ms: float = 0.0) -> Dict:
+        return {
+            "execution_status": "CANCELLED",
+            "text": "",
+            "latency_ms": 0,
+            "error": "Request cancelled",
+            "attempts": attempt,
+            "queue_wait_ms": int(queue_wait_ms),
+        }
+
+    def _error_result(self, error: str, attempt: int, queue_wait_ms: float = 0.0) -> Dict:
+        return {
+            "execution_status": "ERROR",
+            "text": "",
+            "latency_ms": 0,
+            "error": error,
+            "attempts": attempt,
+            "queue_wait_ms": int(queue_wait_ms),
+        }
+
+    def _attempt_succeeded(
+        self, result: Dict, latency_ms: int, attempt: int, queue_wait_ms: float, timeout: float, timeout_key: str
+    ) -> Dict:
+        """Record a completed attempt and build the caller's result dict."""
+        if result.get("cancelled"):
+            logger.debug("[%s] Stream cancelled after %dms", self.name, latency_ms)
+            return self._cancelled_result(attempt, queue_wait_ms)
+
+        get_adaptive_timeouts().observe(timeout_key, latency_ms)
+        record_metrics(self.name, latency_ms=latency_ms, timeout_s=timeout)
+        output = self._success_result(result, latency_ms, attempt, queue_wait_ms)
+        output["timeout_s"] = round(timeout, 1)
+        if self.stream:
+            output.update(ttft_ms=result["ttft_ms"], verdict_ms=result["verdict_ms"], early_stop=result["early_stop"])
+            record_metrics(self.name, ttft_ms=result["ttft_ms"], verdict_ms=result["verdict_ms"])
+            logger.debug(
+                "[%s] Stream ttft=%sms verdict=%dms early_stop=%s",
+                self.name, result["ttft_ms"], result["verdict_ms"], result["early_stop"],
+            )
+        return output
+
+    def _attempt_timed_out(self, attempt: int, queue_wait_ms: float, timeout: float, timeout_key: str) -> Optional[Dict]:
+        """Record a timed-out attempt. Returns the final result, or None to retry."""
+        logger.warning("Cached generate timed out (attempt %d/%d, timeout=%.1fs)", attempt, self.max_retries, timeout)
+        get_adaptive_timeouts().observe_timeout(timeout_key, timeout)
+        record_metrics(self.name, timeout_s=timeout)
+        if attempt == self.max_retries:
+            return {**self._timeout_result(attempt, queue_wait_ms, timeout), "timeout_s": round(timeout, 1)}
+        return None
+
+    def _attempt_failed(self, error: Exception, attempt: int, queue_wait_ms: float) -> Optional[Dict]:
+        """Log a failed attempt. Returns the final result, or None to retry."""
+        logger.error("Cached generate failed (attempt %d/%d): %s", attempt, self.max_retries, error)
+        if attempt == self.max_retries:
+            return self._error_result(str(error), attempt, queue_wait_ms)
+        return None
+
+    def _attempt_timeout(self, timeout_key: str, attempt: int) -> float:
+        timeout = get_adaptive_timeouts().timeout(timeout_key, self.timeout)
+        logger.debug("[%s] Applying timeout %.1fs (key=%s, attempt %d)", self.name, timeout, timeout_key, attempt)
+        return timeout
+
+    def cache_identity(self) -> Dict:
+        """
+        Request settings that determine the response (used for cache keys).
+
+        Keys on a hash of the system prompt rather than on the prefilled
+        context (which is derived from it), so a lookup never forces the
+        prefill of a lazily initialized client.
+        """
+        identity = {
+            "endpoint": self.ENDPOINT,
+            "model": self.model,
+            "options": self._options(self.num_predict),
+            "system": "prompt:" + hashlib.sha256(self.system_prompt.encode("utf-8")).hexdigest(),
+            "context_mode": self.context_mode,
+            "stream": self.stream,
+        }
+        if self.output_schema is not None:
+            identity["format"] = self.output_schema
+        return identity
+
+    def _load_stored_context(self) -> Tuple[Optional[str], List[int]]:
+        """Return (store key, stored context); (None, []) when no store is configured."""
+        if self.context_store is None:
+            return None, []
+        key = self.context_store.key(self.base_url, self.model, self._options(1), self.system_prompt)
+        context = self.context_store.load(key) or []
+        if context:
+            logger.info("System prompt context loaded from store (model=%s, name=%s, context_tokens=%d)", self.model, self.name, len(context))
+        return key, context
+
+    def _save_context(self, key: Optional[str], context: List[int]) -> None:
+        if key is not None and context:
+            self.context_store.save(key, context, name=self.name, base_url=self.base_url, model=self.model)
 
     def _initialize_system_context(self) -> List[int]:
         """
@@ -92,35 +394,23 @@ class CachedOllamaClient:
         Returns:
             List of token IDs representing the cached system prompt
         """
+        store_key, context = self._load_stored_context()
+        if context:
+            return context
+
         url = f"{self.base_url}/api/generate"
-        payload = {
-            "model": self.model,
-            "prompt": self.system_prompt,
-            "stream": False,
-            "options": {
-                "temperature": self.temperature,
-                "num_predict": 1,  # minimize wasted generation, we only need the context
-                **({"think": False} if self.disable_think else {}),
-            }
-        }
+        payload = self._system_payload()
 
         logger.debug("Caching system prompt (model=%s, prompt_len=%d)", self.model, len(self.system_prompt))
         start = time.perf_counter()
 
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
-            response.raise_for_status()
-            result = response.json()
-
-            # Extract and return context
-            context = result.get("context", [])
-            elapsed_ms = (time.perf_counter() - start) * 1000
-
-            if not context:
-                logger.warning("No context returned from system prompt init (model=%s, %.0fms)", self.model, elapsed_ms)
-            else:
-                logger.info("System prompt cached (model=%s, context_tokens=%d, %.0fms)", self.model, len(context), elapsed_ms)
-
+            with get_admission_controller().admit(self.base_url):
+                response = get_session(self.base_url).post(url, json=payload, timeout=self.timeout)
+                response.raise_for_status()
+                result = response.json()
+            context = self._context_from_result(result, (time.perf_counter() - start) * 1000)
+            self._save_context(store_key, context)
             return context
 
         except Exception as e:
@@ -128,86 +418,99 @@ class CachedOllamaClient:
             logger.error("Failed to cache system prompt (model=%s, %.0fms): %s", self.model, elapsed_ms, e)
             return []
 
-    def generate(self, prompt: str) -> Dict:
+    def _post_streaming(self, url: str, prompt: str, timeout: float, cancel_event: Optional[threading.Event] = None) -> Dict:
+        """
+        POST a streaming request and stop reading once the JSON verdict closes.
+
+        Closing the connection early also makes Ollama stop generating, which is
+        how a set `cancel_event` aborts the request ('cancelled' in the result).
+
+        Returns:
+            Dict with the accumulated 'response' text, 'ttft_ms' (first non-empty
+            token), 'verdict_ms' (JSON object complete, or stream end) and
+            'early_stop' (True if the connection was closed before 'done')
+        """
+        reader = StreamReader(self, cancel_event)
+        response = get_session(self.base_url).post(
+            url, data=self._encoded_body(prompt, stream=True), headers=_JSON_HEADERS, timeout=timeout, stream=True
+        )
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if reader.feed(line):
+                    break
+        finally:
+            response.close()
+        return reader.result()
+
+    def _post(self, url: str, prompt: str, timeout: float, cancel_event: Optional[threading.Event] = None) -> Dict:
+        """Send one generate request (streaming or not) and return the parsed result."""
+        if self.stream:
+            return self._post_streaming(url, prompt, timeout, cancel_event)
+        response = get_session(self.base_url).post(url, data=self._encoded_body(prompt), headers=_JSON_HEADERS, timeout=timeout)
+        response.raise_for_status()
+        result = response.json()
+        return {**result, "response": self._response_text(result)}
+
+    def generate(
+        self,
+        prompt: str,
+        timeout_key: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Dict:
         """
         Generate response using cached system context.
 
         Only sends the user prompt + cached context. System prompt tokens
-        are NOT re-sent, achieving true token-level caching.
+        are NOT re-sent, achieving true token-level caching. With
+        context_mode "system" the system prompt text is sent instead and
+        the server reuses its KV cache for the shared prefix.
 
         Args:
             prompt: User prompt to send
+            timeout_key: Overrides the client's adaptive timeout key for this call
+            cancel_event: Set by another thread (e.g. a hedged duplicate that
+                          answered first) to abort a stream and skip retries
 
         Returns:
-            Dict with 'execution_status', 'text', 'latency_ms', and 'error' keys
-            (compatible with LLMClient format for backward compatibility)
+            Dict with 'execution_status', 'text', 'latency_ms', 'queue_wait_ms',
+            'timeout_s' and 'error' keys (compatible with LLMClient format for backward
+            compatibility). latency_ms excludes time queued for admission.
+            Successful calls also carry Ollama's token and timing counters as
+            'usage' (see llm_metrics.ollama_usage).
+            execution_status is 'CANCELLED' when cancel_event stopped the call.
         """
-        url = f"{self.base_url}/api/generate"
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "context": self.system_context,  # Reuse cached context
-            "stream": False,
-            "options": {
-                "temperature": self.temperature,
-                "num_predict": self.num_predict,
-                **({"think": False} if self.disable_think else {}),
-            }
-        }
+        self.ensure_context()
+        url = f"{self.base_url}/api/{self.ENDPOINT}"
 
         logger.debug("Cached generate called (prompt_len=%d, cached_context=%d tokens)", len(prompt), len(self.system_context))
 
+        timeout_key = timeout_key or self.timeout_key
+        queue_wait_ms = 0.0
         for attempt in range(1, self.max_retries + 1):
+            if cancel_event is not None and cancel_event.is_set():
+                return self._cancelled_result(attempt - 1, queue_wait_ms)
+            timeout = self._attempt_timeout(timeout_key, attempt)
             try:
-                start_time = time.time()
-
-                response = requests.post(url, json=payload, timeout=self.timeout)
-                response.raise_for_status()
-                result = response.json()
-
-                latency_ms = int((time.time() - start_time) * 1000)
-                text = result.get("response", "")
-                logger.debug("Raw Ollama response (len=%d): %r", len(text), text[:300])
-                # Strip thinking blocks (e.g. qwen3 <think>...</think>)
-                text = self._THINK_RE.sub("", text).strip()
-                logger.debug("Cached generate response (latency=%dms, response_len=%d, attempt=%d)", latency_ms, len(text), attempt)
-
-                return {
-                    "execution_status": "SUCCESS",
-                    "text": text,
-                    "latency_ms": latency_ms,
-                    "error": None,
-                    "attempts": attempt
-                }
+                # Queue wait for a host slot is reported separately from model latency
+                with get_admission_controller().admit(self.base_url, cancel_event) as ticket:
+                    queue_wait_ms += ticket.wait_ms
+                    start_time = time.time()
+                    result = self._post(url, prompt, timeout, cancel_event)
+                    latency_ms = int((time.time() - start_time) * 1000)
+                return self._attempt_succeeded(result, latency_ms, attempt, queue_wait_ms, timeout, timeout_key)
+
+            except AdmissionCancelled:
+                logger.debug("[%s] Cancelled while queued for a host slot", self.name)
+                return self._cancelled_result(attempt - 1, queue_wait_ms)
 
             except requests.Timeout:
-                logger.warning("Cached generate timed out (attempt %d/%d, timeout=%ds)", attempt, self.max_retries, self.timeout)
-                if attempt == self.max_retries:
-                    return {
-                        "execution_status": "TIMEOUT",
-                        "text": "",
-                        "latency_ms": self.timeout * 1000,
-                        "error": "Request timeout",
-                        "attempts": attempt
-                    }
-                continue
+                output = self._attempt_timed_out(attempt, queue_wait_ms, timeout, timeout_key)
 
             except Exception as e:
-                logger.error("Cached generate failed (attempt %d/%d): %s", attempt, self.max_retries, e)
-                if attempt == self.max_retries:
-                    return {
-                        "execution_status": "ERROR",
-                        "text": "",
-                        "latency_ms": 0,
-                        "error": str(e),
-                        "attempts": attempt
-                    }
-                continue
+                output = self._attempt_failed(e, attempt, queue_wait_ms)
 
-        return {
-            "execution_status": "ERROR",
-            "text": "",
-            "latency_ms": 0,
-            "error": "Max retries exceeded",
-            "attempts": self.max_retries
-        }
+            if output is not None:
+                return output
+
+        return self._error_result("Max retries exceeded", self.max_retries, queue_wait_ms)
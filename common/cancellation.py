@@ -0,0 +1,71 @@
+"""
+Cancellation signal for LLM calls that can wake blocked waiters.
+
+Clients accept a `cancel_event` and check it between stream chunks and
+retries. A plain threading.Event cannot interrupt a call that is blocked
+somewhere else, e.g. queued for a host slot in common/admission.py.
+CancelEvent runs callbacks when it is set, which such waits register with
+on_cancel() to wake up at once.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger("marva.cancellation")
+
+
+class CancelEvent(threading.Event):
+    """threading.Event whose set() also runs the callbacks registered with add_callback()."""
+
+    def __init__(self):
+        super().__init__()
+        self._callbacks_lock = threading.Lock()
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_id = 0
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run `callback` when the event is set (right away if it already is).
+
+        Returns:
+            Function that unregisters the callback
+        """
+        with self._callbacks_lock:
+            if not self.is_set():
+                callback_id = self._next_id
+                self._next_id += 1
+                self._callbacks[callback_id] = callback
+                return lambda: self._remove(callback_id)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback_id: int) -> None:
+        with self._callbacks_lock:
+            self._callbacks.pop(callback_id, None)
+
+    def set(self) -> None:
+        with self._callbacks_lock:
+            super().set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Cancel callback failed")
+
+
+@contextmanager
+def on_cancel(cancel_event: Optional[threading.Event], callback: Callable[[], None]) -> Iterator[None]:
+    """Run `callback` if `cancel_event` is set while the block runs (a no-op for a plain Event)."""
+    add_callback = getattr(cancel_event, "add_callback", None)
+    if add_callback is None:
+        yield
+        return
+    remove = add_callback(callback)
+    try:
+        yield
+    finally:
+        remove()
@@ -0,0 +1,75 @@
+"""
+Ollama /api/chat client with server-side prompt prefix caching.
+
+CachedOllamaClient prefills the system prompt once and ships the returned
+`context` token array with every /api/generate call. `context` is deprecated
+and grows the request body with the prompt length. ChatOllamaClient instead
+sends the system prompt as a fixed first message. Every request for an agent
+starts with the same tokens, so Ollama's KV-cache reuses the evaluated prefix
+and only the user message is prefilled again.
+
+Selected for the S3 agents with `endpoint: chat` in config/model.yaml. Results
+have the same shape as CachedOllamaClient (LLMClientProtocol); streaming,
+structured output, admission, adaptive timeouts, cancellation and usage
+counters behave the same.
+"""
+
+import json
+import logging
+from typing import Dict
+
+from common.cached_ollama_client import CachedOllamaClient
+
+logger = logging.getLogger("marva.chat_ollama")
+
+
+class ChatOllamaClient(CachedOllamaClient):
+    """
+    CachedOllamaClient variant on /api/chat (see module docstring).
+
+    Accepts the same arguments as CachedOllamaClient. There is no system
+    prompt prefill, so `context_store`, `lazy_context` and `context_mode` are
+    ignored.
+
+    Example:
+        client = ChatOllamaClient(
+            model="qwen3:1.7b",
+            base_url="http://localhost:11434",
+            system_prompt="You are an expert validator...",
+        )
+
+        response = client.generate("Validate this requirement: ...")
+    """
+
+    ENDPOINT = "chat"
+
+    def __init__(self, *args, **kwargs):
+        kwargs.update(context_store=None, lazy_context=True, context_mode="system")
+        super().__init__(*args, **kwargs)
+        self._system_message = {"role": "system", "content": self.system_prompt}
+
+    def _static_fields(self, stream: bool = False) -> Dict:
+        """Request fields that are the same for every chat call; 'messages' comes last."""
+        fields = {"model": self.model, "stream": stream, "options": self._options(self.num_predict), **self._keep_alive()}
+        if self.output_schema is not None:
+            fields["format"] = self.output_schema
+        fields["messages"] = [self._system_message]
+        return fields
+
+    def _generate_payload(self, prompt: str) -> Dict:
+        fields = self._static_fields()
+        fields["messages"] = [self._system_message, {"role": "user", "content": prompt}]
+        return fields
+
+    def _encoded_body(self, prompt: str, stream: bool = False) -> bytes:
+        """JSON request body: the encoded static fields with the user message appended to 'messages'."""
+        prefix = self._body_prefixes.get(stream)
+        if prefix is None:
+            static = json.dumps(self._static_fields(stream)).encode("utf-8")
+            # Strip the closing ']}' of the messages list and the object
+            prefix = static[:-2] + b', {"role": "user", "content": '
+            self._body_prefixes[stream] = prefix
+        return prefix + json.dumps(prompt).encode("utf-8") + b"}]}"
+
+    def _response_text(self, chunk: Dict) -> str:
+        return (chunk.get("message") or {}).get("content", "")
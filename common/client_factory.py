@@ -0,0 +1,157 @@
+"""
+Construction of LLM clients from the loaded config.
+
+Runners and build_agents() go through these helpers so that every client
+gets the same settings and the same optional layers, stacked as:
+
+    response cache -> single-flight -> hedging -> load balancer -> client per host
+
+The load balancer layer is only added when model.host lists several hosts.
+With model.async_agents the S3 clients also have an awaitable agenerate()
+(AsyncLLMClientProtocol), which the response cache, single-flight and load
+balancer layers pass through; hedging has no async path and is refused.
+"""
+
+import logging
+
+from common.adaptive_timeout import configure_timeouts, log_timeout_stats
+from common.async_cached_ollama_client import AsyncCachedOllamaClient, AsyncChatOllamaClient
+from common.cached_ollama_client import CachedOllamaClient
+from common.chat_ollama_client import ChatOllamaClient
+from common.llm_client import LLMClient
+from common.admission import configure_admission, log_admission_stats
+from common.context_store import open_context_store
+from common.hedging import HedgedClient, configure_hedging, hedging_enabled, log_hedging_stats
+from common.http_pool import configure_pool, log_pool_stats
+from common.llm_client_protocol import LLMClientProtocol
+from common.llm_metrics import log_metrics_summary
+from common.load_balancer import BalancedClient, get_balancer, hosts_from_config, log_balancer_stats
+from common.response_cache import CachedResponseClient, log_cache_stats, open_response_cache
+from common.single_flight import SingleFlightClient, log_single_flight_stats
+from common.transport import configure_transport, log_transport_stats, transport_mode
+
+logger = logging.getLogger("marva.client_factory")
+
+# model.endpoint -> client class used for the S3 agents
+_AGENT_CLIENTS = {"generate": CachedOllamaClient, "chat": ChatOllamaClient}
+# ... and with model.async_agents
+_ASYNC_AGENT_CLIENTS = {"generate": AsyncCachedOllamaClient, "chat": AsyncChatOllamaClient}
+
+
+def configure_clients(cfg: dict) -> None:
+    """Apply process-wide connection pool, transport, admission, timeout and hedging settings from config."""
+    configure_pool(cfg["model"])
+    configure_transport(cfg["global"])
+    configure_admission(cfg["model"])
+    configure_timeouts(cfg["global"])
+    if hedging_enabled(cfg["global"]) and not cfg["model"].get("stream", False):
+        raise ValueError("hedging.enabled requires model.stream: true (a non-streaming request cannot be cancelled)")
+    if cfg["model"].get("async_agents", False):
+        if hedging_enabled(cfg["global"]):
+            raise ValueError("model.async_agents cannot be combined with hedging.enabled (no async path)")
+        if transport_mode() != "live":
+            raise ValueError(f"model.async_agents requires transport.mode: live (got '{transport_mode()}')")
+    configure_hedging(cfg["global"])
+
+
+def _wrap(client: LLMClientProtocol, cfg: dict, use_cache: bool) -> LLMClientProtocol:
+    """Apply the optional client layers enabled in config."""
+    # Only streaming clients can cancel the losing request (see common/hedging.py)
+    if hedging_enabled(cfg["global"]) and getattr(client, "stream", False):
+        client = HedgedClient(client)
+    if cfg["global"].get("single_flight", False):
+        client = SingleFlightClient(client)
+    # Recorded and replayed runs must send every call through the transport
+    cache = open_response_cache(cfg["global"], enabled=use_cache and transport_mode() == "live")
+    if cache is not None:
+        client = CachedResponseClient(client, cache)
+    return client
+
+
+def _per_host(cfg: dict, make) -> LLMClientProtocol:
+    """Build one client per configured host, balanced when there is more than one."""
+    hosts = hosts_from_config(cfg["model"])
+    if len(hosts) == 1:
+        return make(hosts[0])
+    clients = {host: make(host) for host in hosts}
+    return BalancedClient(clients, get_balancer(hosts, cfg["model"].get("load_balancing")))
+
+
+def build_llm_client(cfg: dict, use_cache: bool = True) -> LLMClientProtocol:
+    """
+    Build the plain LLMClient used by the S1 and S2 runners.
+
+    Args:
+        cfg: Config dict from load_config()
+        use_cache: False to bypass the persistent response cache
+    """
+    llm = _per_host(cfg, lambda host: LLMClient(
+        host=host,
+        model=cfg["model"]["model_name"],
+        temperature=cfg["model"]["temperature"],
+        timeout=cfg["global"]["timeout_seconds"],
+        max_retries=cfg["global"]["max_retries"],
+        keep_alive=cfg["model"].get("keep_alive"),
+    ))
+    return _wrap(llm, cfg, use_cache)
+
+
+def build_cached_ollama_client(
+    cfg: dict,
+    system_prompt: str,
+    name: str | None = None,
+    use_cache: bool = True,
+    lazy_context: bool = False,
+    timeout_key: str | None = None,
+    output_schema: dict | None = None,
+) -> LLMClientProtocol:
+    """
+    Build the client for one S3 agent: a CachedOllamaClient (system prompt
+    context caching), or a ChatOllamaClient with `endpoint: chat`; their
+    Async* variants with `async_agents: true`.
+
+    Args:
+        cfg: Config dict from load_config()
+        system_prompt: System prompt to prefill once
+        name: Agent/client name used in logs and run metrics
+        use_cache: False to bypass the persistent response cache
+        lazy_context: Defer the system prompt prefill to the first call
+        timeout_key: Adaptive timeout key, e.g. "clarity:single"
+        output_schema: JSON schema for structured output (Ollama 'format'), or None
+    """
+    endpoint = cfg["model"].get("endpoint", "generate")
+    if endpoint not in _AGENT_CLIENTS:
+        raise ValueError(f"model.endpoint: expected one of {tuple(_AGENT_CLIENTS)}, got '{endpoint}'")
+    client_cls = (_ASYNC_AGENT_CLIENTS if cfg["model"].get("async_agents", False) else _AGENT_CLIENTS)[endpoint]
+    llm = _per_host(cfg, lambda host: client_cls(
+        model=cfg["model"]["model_name"],
+        base_url=host,
+        system_prompt=system_prompt,
+        temperature=cfg["model"]["temperature"],
+        num_predict=cfg["model"].get("max_tokens", 1024),
+        timeout=cfg["global"]["timeout_seconds"],
+        max_retries=cfg["global"]["max_retries"],
+        disable_think=cfg["model"].get("disable_think", True),
+        stream=cfg["model"].get("stream", False),
+        name=name,
+        context_store=open_context_store(cfg["global"]),
+        lazy_context=lazy_context,
+        timeout_key=timeout_key,
+        output_schema=output_schema,
+        keep_alive=cfg["model"].get("keep_alive"),
+        context_mode=cfg["model"].get("context_mode", "context"),
+    ))
+    return _wrap(llm, cfg, use_cache)
+
+
+def log_client_stats(log: logging.Logger) -> None:
+    """Log connection, transport, admission, balancing, timeout, hedging, cache, deduplication and per-client call metrics at the end of a run."""
+    log_pool_stats(log)
+    log_transport_stats(log)
+    log_admission_stats(log)
+    log_balancer_stats(log)
+    log_timeout_stats(log)
+    log_hedging_stats(log)
+    log_cache_stats(log)
+    log_single_flight_stats(log)
+    log_metrics_summary(log)
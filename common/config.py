@@ -33,6 +33,13 @@ def load_config() -> dict:
     if missing:
         raise ValueError(f"Missing required config keys: {', '.join(missing)}")
 
+    host = config["model"]["host"]
+    if isinstance(host, list):
+        if not host or not all(isinstance(h, str) for h in host):
+            raise ValueError("model.host: expected a URL or a non-empty list of URLs")
+    elif not isinstance(host, str):
+        raise ValueError(f"model.host: expected a URL or a list of URLs, got {type(host).__name__}")
+
     # Validate agents config structure
     agents_cfg = config.get("agents", {})
     if "decision" in agents_cfg:
@@ -0,0 +1,144 @@
+"""
+On-disk store for cached system prompt contexts.
+
+CachedOllamaClient prefills its system prompt once per process and keeps the
+returned `context` token array. ContextStore persists those arrays between
+CLI invocations so warm starts skip the prefill entirely.
+
+Entries are keyed by host, model name, model digest, prefill options and the
+SHA-256 of the system prompt, so editing a prompt file or re-pulling a model
+produces a new key. Saving a new entry deletes older entries for the same
+client name and host.
+
+Configured in config/global.yaml:
+
+    context_store:
+      enabled: true
+      path: cache/contexts
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from common.http_pool import get_session
+
+logger = logging.getLogger("marva.context_store")
+
+
+class ContextStore:
+    """Directory of JSON files, one per (host, model, options, system prompt)."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._digests: Dict[tuple, str] = {}
+
+    def model_digest(self, base_url: str, model: str, timeout: int = 10) -> str:
+        """
+        Digest of the installed model as reported by /api/tags.
+
+        Looked up once per (host, model) and process. Returns an empty string if
+        the host cannot be queried, which still keys entries by model name.
+        """
+        cache_key = (base_url, model)
+        with self._lock:
+            if cache_key in self._digests:
+                return self._digests[cache_key]
+        digest = ""
+        try:
+            response = get_session(base_url).get(f"{base_url}/api/tags", timeout=timeout)
+            response.raise_for_status()
+            for entry in response.json().get("models", []):
+                if entry.get("name") == model or entry.get("model") == model:
+                    digest = entry.get("digest", "")
+                    break
+        except Exception as e:
+            logger.debug("Could not fetch model digest from %s: %s", base_url, e)
+        with self._lock:
+            self._digests[cache_key] = digest
+        return digest
+
+    def key(self, base_url: str, model: str, options: Dict, system_prompt: str) -> str:
+        raw = json.dumps(
+            {
+                "base_url": base_url.rstrip("/"),
+                "model": model,
+                "model_digest": self.model_digest(base_url, model),
+                "options": options,
+                "prompt_sha256": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[List[int]]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ignoring unreadable context entry %s: %s", path, e)
+            return None
+        return entry.get("context") or None
+
+    def save(self, key: str, context: List[int], name: str, base_url: str, model: str) -> None:
+        entry = {
+            "key": key,
+            "name": name,
+            "base_url": base_url.rstrip("/"),
+            "model": model,
+            "created": time.time(),
+            "context": context,
+        }
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+            self._invalidate_stale(key, name, entry["base_url"])
+        logger.debug("Stored system context for '%s' (%d tokens, key=%s)", name, len(context), key[:12])
+
+    def _invalidate_stale(self, key: str, name: str, base_url: str) -> None:
+        """Remove older entries for the same client name and host."""
+        for path in self.directory.glob("*.json"):
+            if path.stem == key:
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if entry.get("name") == name and entry.get("base_url") == base_url:
+                path.unlink(missing_ok=True)
+                logger.info("Invalidated stale system context for '%s' (key=%s)", name, path.stem[:12])
+
+
+_STORES: Dict[str, ContextStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def open_context_store(global_cfg: dict) -> Optional[ContextStore]:
+    """Return the process-wide ContextStore from the 'global' config section, or None."""
+    store_cfg = global_cfg.get("context_store") or {}
+    if not store_cfg.get("enabled", False):
+        return None
+    path = str(Path(store_cfg.get("path", "cache/contexts")).resolve())
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = ContextStore(Path(path))
+            _STORES[path] = store
+    return store
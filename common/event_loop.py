@@ -0,0 +1,37 @@
+"""
+Process-wide event loop for running coroutines from synchronous code.
+
+The S3 graph runs in ordinary threads (one per requirement with --concurrency),
+but the agent fan-out can await AsyncCachedOllamaClient calls instead of
+holding a thread per agent. run_coroutine() submits a coroutine to a single
+loop running in a daemon thread and blocks the calling thread until it is
+done. Every caller shares the loop, so its pooled async HTTP clients
+(common/http_pool.py) and admission waits are shared too.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Coroutine, Optional
+
+logger = logging.getLogger("marva.event_loop")
+
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared loop, starting its thread on first use."""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="marva-event-loop", daemon=True).start()
+            logger.debug("Started shared event loop")
+            _LOOP = loop
+        return _LOOP
+
+
+def run_coroutine(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run `coro` on the shared loop and return its result (blocks the caller)."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
@@ -0,0 +1,278 @@
+"""
+Hedged requests for tail-latency reduction.
+
+Ollama occasionally stalls one request while others complete normally, and a
+single stalled agent holds up the whole requirement. HedgedClient sends a
+duplicate of a call that has not returned by the rolling p<percentile> latency
+of its key (agent and mode, e.g. "clarity:single") and returns whichever
+answer succeeds first. With several hosts configured the duplicate goes to a
+different host than the original.
+
+Once a key has a hedge delay, the original call runs on a thread of its own
+(so the bounded hedge executor, which only runs duplicates, never caps how
+many calls run at once) and the caller returns the first successful answer,
+without waiting for the other request. The loser is cancelled through a
+CancelEvent (common/cancellation.py): queued for a host slot, it leaves the
+queue at once; streaming, it closes its connection at the next token, which
+makes Ollama stop generating. A non-streaming request cannot be interrupted,
+so hedging requires `stream: true` in config/model.yaml and only wraps
+clients that stream (the S3 agents).
+
+Hedging is capped by a budget: every call earns `budget` hedge credits (up to
+`burst`) and every duplicate spends one, so at most roughly budget x calls
+extra requests are sent.
+
+Configured in config/global.yaml:
+
+    hedging:
+      enabled: false
+      percentile: 95
+      window: 200
+      min_samples: 20
+      min_delay_ms: 100
+      budget: 0.05
+      burst: 5
+      workers: 32
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Deque, Dict, Optional
+
+from common.cancellation import CancelEvent
+from common.llm_client_protocol import LLMClientProtocol
+from common.load_balancer import BalancedClient
+
+logger = logging.getLogger("marva.hedging")
+
+
+class HedgePolicy:
+    """Thread-safe hedge delays per key, the hedge budget and outcome counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows: Dict[str, Deque[float]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.configure()
+
+    def configure(
+        self,
+        percentile: float = 95.0,
+        window: int = 200,
+        min_samples: int = 20,
+        min_delay_ms: float = 100.0,
+        budget: float = 0.05,
+        burst: float = 5.0,
+        workers: int = 32,
+    ) -> None:
+        if not 0.0 <= budget <= 1.0:
+            raise ValueError(f"hedging.budget: expected a share between 0 and 1, got {budget}")
+        with self._lock:
+            self.percentile = percentile
+            self.window = window
+            self.min_samples = min_samples
+            self.min_delay_ms = min_delay_ms
+            self.budget = budget
+            self.burst = burst
+            self._tokens = burst
+            self._windows = {k: deque(v, maxlen=window) for k, v in self._windows.items()}
+            if self._executor is not None and self.workers != workers:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.workers = workers
+            self.calls = 0
+            self.hedged = 0
+            self.hedge_wins = 0
+            self.over_budget = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hedge")
+            return self._executor
+
+    def delay_s(self, key: Optional[str]) -> Optional[float]:
+        """Seconds to wait before hedging a call under `key`; None until enough samples exist."""
+        with self._lock:
+            values = self._windows.get(key)
+            if values is None or len(values) < self.min_samples:
+                return None
+            ordered = sorted(values)
+            observed_ms = ordered[max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1)]
+        return max(self.min_delay_ms, observed_ms) / 1000
+
+    def observe(self, key: Optional[str], latency_ms: float) -> None:
+        """Record the latency a caller saw for a successful call."""
+        with self._lock:
+            values = self._windows.get(key)
+            if values is None:
+                values = self._windows[key] = deque(maxlen=self.window)
+            values.append(float(latency_ms))
+
+    def start_call(self) -> None:
+        """Count a call and credit the hedge budget."""
+        with self._lock:
+            self.calls += 1
+            self._tokens = min(self.burst, self._tokens + self.budget)
+
+    def take_budget(self) -> bool:
+        """Spend one hedge credit; False when the budget is exhausted."""
+        with self._lock:
+            if self._tokens < 1.0:
+                self.over_budget += 1
+                return False
+            self._tokens -= 1.0
+            self.hedged += 1
+            return True
+
+    def record_outcome(self, hedge_won: bool) -> None:
+        with self._lock:
+            self.hedge_wins += hedge_won
+
+    def log_stats(self, log: Optional[logging.Logger] = None) -> None:
+        log = log or logger
+        with self._lock:
+            calls, hedged, wins, over_budget = self.calls, self.hedged, self.hedge_wins, self.over_budget
+        if not calls:
+            return
+        log.info(
+            "Hedging: %d calls, %d hedged (%.1f%%), %d won by the duplicate, %d not hedged (budget exhausted)",
+            calls, hedged, 100.0 * hedged / calls, wins, over_budget,
+        )
+
+
+class HedgedClient:
+    """
+    LLMClientProtocol wrapper that duplicates slow calls (see module docstring).
+
+    Results of hedged calls carry 'hedged': True and 'hedge_won' (the duplicate
+    answered first). Attributes not defined here are delegated to the inner client.
+    """
+
+    def __init__(self, inner: LLMClientProtocol, policy: Optional[HedgePolicy] = None):
+        if not getattr(inner, "stream", False):
+            raise ValueError("Hedging requires a streaming client (model.stream: true); a non-streaming loser cannot be cancelled")
+        self.inner = inner
+        self.policy = policy or get_hedge_policy()
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def _key(self, kwargs: dict) -> Optional[str]:
+        return kwargs.get("timeout_key") or getattr(self.inner, "timeout_key", None) or getattr(self.inner, "name", None)
+
+    def generate(self, prompt: str, **kwargs) -> Dict:
+        policy = self.policy
+        key = self._key(kwargs)
+        delay = policy.delay_s(key)
+        policy.start_call()
+        start = time.perf_counter()
+
+        balanced = isinstance(self.inner, BalancedClient)
+        primary_hosts = []
+        primary_cancel = CancelEvent()
+        primary_kwargs = {**kwargs, "cancel_event": primary_cancel}
+        if balanced:
+            primary_kwargs["on_host"] = primary_hosts.append
+
+        if delay is None:
+            # Not enough samples to know what "slow" is yet
+            result = self.inner.generate(prompt, **primary_kwargs)
+            self._observe(key, result, start)
+            return result
+
+        primary = self._start_thread(prompt, primary_kwargs)
+        try:
+            result = primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+        else:
+            self._observe(key, result, start)
+            return result
+
+        if not policy.take_budget():
+            result = primary.result()
+            self._observe(key, result, start)
+            return result
+
+        hedge_cancel = CancelEvent()
+        hedge_kwargs = {**kwargs, "cancel_event": hedge_cancel}
+        if balanced:
+            hedge_kwargs["exclude"] = set(primary_hosts)
+        logger.debug("[%s] No answer after %.0fms, sending a hedged request", key, delay * 1000)
+        hedge = policy.executor.submit(self.inner.generate, prompt, **hedge_kwargs)
+
+        cancels = {primary: primary_cancel, hedge: hedge_cancel}
+        winner = None
+        pending = set(cancels)
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Prefer the original when both finish together
+            for future in sorted(done, key=lambda f: f is hedge):
+                if future.exception() is None and future.result().get("execution_status") == "SUCCESS":
+                    winner = future
+                    break
+        winner = winner or primary
+        # The loser is left to stop on its own thread; the caller does not wait for it
+        for future, cancel in cancels.items():
+            if future is not winner:
+                cancel.set()
+
+        hedge_won = winner is hedge
+        policy.record_outcome(hedge_won)
+        result = {**winner.result(), "hedged": True, "hedge_won": hedge_won}
+        self._observe(key, result, start)
+        logger.debug("[%s] Hedged call answered by the %s request", key, "duplicate" if hedge_won else "original")
+        return result
+
+    def _start_thread(self, prompt: str, kwargs: dict) -> Future:
+        """Run inner.generate on a new thread (not the bounded hedge executor)."""
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def run():
+            try:
+                future.set_result(self.inner.generate(prompt, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="hedge-original", daemon=True).start()
+        return future
+
+    def _observe(self, key: Optional[str], result: Dict, start: float) -> None:
+        if result.get("execution_status") == "SUCCESS":
+            self.policy.observe(key, (time.perf_counter() - start) * 1000)
+
+
+_POLICY = HedgePolicy()
+
+
+def get_hedge_policy() -> HedgePolicy:
+    return _POLICY
+
+
+def hedging_enabled(global_cfg: dict) -> bool:
+    return bool((global_cfg.get("hedging") or {}).get("enabled", False))
+
+
+def configure_hedging(global_cfg: dict) -> None:
+    """Apply the 'hedging' block of the 'global' config section."""
+    hedge_cfg = global_cfg.get("hedging") or {}
+    _POLICY.configure(
+        percentile=float(hedge_cfg.get("percentile", 95)),
+        window=int(hedge_cfg.get("window", 200)),
+        min_samples=int(hedge_cfg.get("min_samples", 20)),
+        min_delay_ms=float(hedge_cfg.get("min_delay_ms", 100)),
+        budget=float(hedge_cfg.get("budget", 0.05)),
+        burst=float(hedge_cfg.get("burst", 5)),
+        workers=int(hedge_cfg.get("workers", 32)),
+    )
+
+
+def log_hedging_stats(log: Optional[logging.Logger] = None) -> None:
+    _POLICY.log_stats(log)
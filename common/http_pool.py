@@ -0,0 +1,216 @@
+"""
+Process-wide HTTP connection pooling for LLM clients.
+
+Every client (LLMClient, CachedOllamaClient, ...) obtains its requests.Session
+from this module instead of calling the module-level requests.post. Sessions are
+created once per host and keep their TCP connections alive between calls, so
+S3's parallel fan-out reuses a small set of sockets instead of opening a new
+connection for every agent call.
+
+Pool sizes are configured from config/model.yaml:
+
+    pool_maxsize: 8              # default connections kept per host
+    host_pool_sizes:             # optional per-host overrides
+      http://gpu-box:11434: 16
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("marva.http_pool")
+
+DEFAULT_POOL_MAXSIZE = 8
+
+
+def _normalize_host(base_url: str) -> str:
+    return base_url.rstrip("/")
+
+
+class HTTPPoolManager:
+    """
+    Thread-safe registry of keep-alive sessions, one per host.
+
+    Sessions are shared by all threads. urllib3's connection pool is thread-safe;
+    the pool is sized so that concurrent agent calls against the same host do
+    not have to open throw-away connections when the pool is exhausted.
+    """
+
+    def __init__(self, pool_maxsize: int = DEFAULT_POOL_MAXSIZE, host_pool_sizes: Optional[Dict[str, int]] = None):
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        # httpx.AsyncClient instances are bound to the loop that first used them
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = weakref.WeakKeyDictionary()
+        self.pool_maxsize = pool_maxsize
+        self.host_pool_sizes = {_normalize_host(h): int(s) for h, s in (host_pool_sizes or {}).items()}
+        self.adapter_factory: Optional[Callable[[int], HTTPAdapter]] = None
+
+    def configure(self, pool_maxsize: Optional[int] = None, host_pool_sizes: Optional[Dict[str, int]] = None) -> None:
+        """
+        Update pool sizing. Only affects sessions created after the call.
+
+        Args:
+            pool_maxsize: Default number of connections kept per host
+            host_pool_sizes: Per-host overrides keyed by base URL
+        """
+        with self._lock:
+            if pool_maxsize is not None:
+                self.pool_maxsize = int(pool_maxsize)
+            if host_pool_sizes:
+                self.host_pool_sizes.update({_normalize_host(h): int(s) for h, s in host_pool_sizes.items()})
+        logger.debug("HTTP pool configured (pool_maxsize=%d, host_overrides=%s)", self.pool_maxsize, self.host_pool_sizes)
+
+    def set_adapter_factory(self, factory: Optional[Callable[[int], HTTPAdapter]]) -> None:
+        """
+        Build session adapters with `factory(pool_maxsize)` instead of a plain
+        HTTPAdapter (used by the record/replay transport). Existing sessions
+        are closed so the next call picks up the new adapter.
+        """
+        with self._lock:
+            self.adapter_factory = factory
+        self.close()
+
+    def pool_size_for(self, base_url: str) -> int:
+        return self.host_pool_sizes.get(_normalize_host(base_url), self.pool_maxsize)
+
+    def session_for(self, base_url: str) -> requests.Session:
+        """Return the shared keep-alive session for a host, creating it on first use."""
+        host = _normalize_host(base_url)
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                size = self.pool_size_for(host)
+                if self.adapter_factory is not None:
+                    adapter = self.adapter_factory(size)
+                else:
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, pool_block=False)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"Connection": "keep-alive"})
+                self._sessions[host] = session
+                logger.debug("Created pooled session for %s (pool_maxsize=%d)", host, size)
+        return session
+
+    def async_client_for(self, base_url: str):
+        """
+        Return the shared httpx.AsyncClient for a host on the running event loop.
+
+        Keep-alive connections are capped at the host's pool size; additional
+        in-flight requests open extra connections instead of queueing, so a
+        single loop can drive many concurrent calls.
+        """
+        import httpx
+
+        host = _normalize_host(base_url)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(host)
+            if client is None:
+                size = self.pool_size_for(host)
+                client = httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=None, max_keepalive_connections=size),
+                    headers={"Connection": "keep-alive"},
+                )
+                clients[host] = client
+                logger.debug("Created pooled async client for %s (keepalive=%d)", host, size)
+        return client
+
+    async def aclose(self) -> None:
+        """Close the async clients bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.pop(loop, {})
+        for client in clients.values():
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Connection reuse counters per host.
+
+        Returns:
+            Dict keyed by host with 'requests', 'connections' (new TCP connections
+            opened) and 'reused' (requests served over an existing connection)
+        """
+        with self._lock:
+            sessions = dict(self._sessions)
+
+        stats = {}
+        for host, session in sessions.items():
+            num_requests = 0
+            num_connections = 0
+            seen = set()
+            for adapter in session.adapters.values():
+                if id(adapter) in seen:
+                    continue
+                seen.add(id(adapter))
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    num_requests += pool.num_requests
+                    num_connections += pool.num_connections
+            stats[host] = {
+                "requests": num_requests,
+                "connections": num_connections,
+                "reused": max(num_requests - num_connections, 0),
+            }
+        return stats
+
+    def log_stats(self, log: Optional[logging.Logger] = None) -> None:
+        log = log or logger
+        stats = self.stats()
+        if not stats:
+            log.info("HTTP pool: no requests sent")
+            return
+        for host, s in stats.items():
+            ratio = (s["reused"] / s["requests"] * 100) if s["requests"] else 0.0
+            log.info(
+                "HTTP pool %s: %d requests over %d connections (%d reused, %.1f%%)",
+                host, s["requests"], s["connections"], s["reused"], ratio,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+_POOL = HTTPPoolManager()
+
+
+def get_pool() -> HTTPPoolManager:
+    return _POOL
+
+
+def get_session(base_url: str) -> requests.Session:
+    return _POOL.session_for(base_url)
+
+
+def get_async_client(base_url: str):
+    return _POOL.async_client_for(base_url)
+
+
+def configure_pool(model_cfg: dict) -> None:
+    """Apply pool settings from the 'model' config section."""
+    _POOL.configure(
+        pool_maxsize=model_cfg.get("pool_maxsize"),
+        host_pool_sizes=model_cfg.get("host_pool_sizes"),
+    )
+
+
+def log_pool_stats(log: Optional[logging.Logger] = None) -> None:
+    _POOL.log_stats(log)
@@ -0,0 +1,100 @@
+"""
+Incremental scanner that detects when the first top-level JSON object closes.
+
+Used by streaming generation to stop reading tokens as soon as the agent's
+JSON verdict is complete, instead of paying decode time for any trailing prose.
+"""
+
+_THINK_OPEN = "<think>"
+_THINK_CLOSE = "</think>"
+
+
+def _partial_tag(text: str, tag: str) -> int:
+    """Length of the longest end of `text` that is the beginning of `tag` (but not all of it)."""
+    for n in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:n]):
+            return n
+    return 0
+
+
+class IncrementalJSONScanner:
+    """
+    Feed text chunks; feed() returns True once a complete top-level object is seen.
+
+    Brace depth is tracked outside of string literals (with escape handling), so
+    braces inside string values do not confuse the scanner. Text inside a
+    leading <think>...</think> block is skipped, also when a tag is split
+    across chunks.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._in_think = False
+        self.complete = False
+        self._end = -1
+
+    def feed(self, chunk: str) -> bool:
+        if self.complete:
+            return True
+        self.buffer += chunk
+
+        buf = self.buffer
+        if self._start < 0:
+            if not self._in_think:
+                think = buf.find(_THINK_OPEN, self._pos)
+                brace = buf.find("{", self._pos)
+                if think >= 0 and (brace < 0 or think < brace):
+                    self._in_think = True
+                    self._pos = think + len(_THINK_OPEN)
+            if self._in_think:
+                close = buf.find(_THINK_CLOSE, self._pos)
+                if close < 0:
+                    # "</think>" may be split across chunks: rescan its possible start next time
+                    self._pos = max(self._pos, len(buf) - _partial_tag(buf, _THINK_CLOSE))
+                    return False
+                self._in_think = False
+                self._pos = close + len(_THINK_CLOSE)
+
+        for i in range(self._pos, len(buf)):
+            ch = buf[i]
+            if self._start < 0:
+                if ch == "{":
+                    self._start = i
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end = i + 1
+                    self.complete = True
+                    self._pos = i + 1
+                    return True
+        self._pos = len(buf)
+        if self._start < 0:
+            # Same for a "<think>" split across chunks before the object starts
+            self._pos -= _partial_tag(buf, _THINK_OPEN)
+        return False
+
+    @property
+    def object_text(self) -> str:
+        """Text of the completed object, or an empty string if not complete yet."""
+        if not self.complete:
+            return ""
+        return self.buffer[self._start:self._end]
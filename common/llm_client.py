@@ -1,7 +1,13 @@
 import requests
+import threading
 import time
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
+
+from common.adaptive_timeout import get_adaptive_timeouts
+from common.admission import AdmissionCancelled, get_admission_controller
+from common.http_pool import get_session
+from common.llm_metrics import ollama_usage, record_metrics, record_usage
 
 logger = logging.getLogger("marva.llm_client")
 
@@ -14,7 +20,8 @@ class LLMClient:
         timeout: int = 60,
         temperature: float = 0.0,
         max_retries: int = 1,
-        retry_backoff: float = 1.5
+        retry_backoff: float = 1.5,
+        keep_alive: Optional[Union[str, int]] = None
     ):
         self.host = host.rstrip("/")
         self.model = model
@@ -22,18 +29,41 @@ class LLMClient:
         self.temperature = temperature
         self.max_retries = max_retries
         self.retry_backoff = retry_backoff
+        self.keep_alive = keep_alive
         logger.debug("LLMClient initialized (model=%s, host=%s, timeout=%ds)", model, self.host, timeout)
 
-    def generate(self, prompt: str, reset_session: bool = False) -> Dict:
+    def cache_identity(self) -> Dict:
+        """Request settings that determine the response (used for cache keys)."""
+        return {
+            "endpoint": "generate",
+            "model": self.model,
+            "options": {"temperature": self.temperature},
+        }
+
+    def generate(
+        self,
+        prompt: str,
+        reset_session: bool = False,
+        timeout_key: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Dict:
         """
         Generate text using the LLM.
 
         Args:
             prompt: The input prompt text
             reset_session: If True, reset conversation context. Default False for session reuse.
+            timeout_key: Latency key (prompt name and mode, e.g. "clarity:single")
+                         used to pick an adaptive timeout; None uses the static timeout
+            cancel_event: Set by another thread (e.g. a hedged duplicate that
+                          answered first) to skip any remaining retries
 
         Returns:
-            Dict with execution_status, attempts, text, latency_ms, and error
+            Dict with execution_status, attempts, text, latency_ms, queue_wait_ms,
+            timeout_s and error, plus Ollama's token and timing counters as usage
+            on success. latency_ms excludes time queued for admission; on success
+            it is the latency of the successful attempt, and elapsed_ms covers all
+            attempts including retry backoff.
         """
         url = f"{self.host}/api/generate"
         payload = {
@@ -43,57 +73,99 @@ class LLMClient:
             "stream": False,
             "reset_session": reset_session
         }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
 
         attempts = 0
+        queue_wait_ms = 0.0
+        timeouts = get_adaptive_timeouts()
+        timeout = self.timeout
         start = time.time()
         logger.debug("LLM generate called (prompt_len=%d, model=%s)", len(prompt), self.model)
 
         while attempts <= self.max_retries:
+            if cancel_event is not None and cancel_event.is_set():
+                return {
+                    "execution_status": "CANCELLED",
+                    "attempts": attempts,
+                    "text": None,
+                    "latency_ms": int((time.time() - start) * 1000 - queue_wait_ms),
+                    "queue_wait_ms": int(queue_wait_ms),
+                    "timeout_s": round(timeout, 1),
+                    "error": "Request cancelled"
+                }
             try:
                 attempts += 1
+                timeout = timeouts.timeout(timeout_key, self.timeout)
+                logger.debug("Applying timeout %.1fs (key=%s, attempt %d)", timeout, timeout_key, attempts)
 
-                response = requests.post(
-                    url,
-                    json=payload,
-                    timeout=self.timeout
-                )
+                # Queue wait for a host slot is reported separately from model latency
+                with get_admission_controller().admit(self.host, cancel_event) as ticket:
+                    queue_wait_ms += ticket.wait_ms
+                    attempt_start = time.time()
+                    response = get_session(self.host).post(
+                        url,
+                        json=payload,
+                        timeout=timeout
+                    )
                 response.raise_for_status()
 
-                elapsed = int((time.time() - start) * 1000)
+                # Only this attempt: a timed-out earlier one was already recorded by observe_timeout
+                latency_ms = int((time.time() - attempt_start) * 1000)
+                elapsed = int((time.time() - start) * 1000 - queue_wait_ms)
+                timeouts.observe(timeout_key, latency_ms)
+                record_metrics(timeout_key or "llm", latency_ms=latency_ms, timeout_s=timeout)
                 data = response.json()
                 text = data.get("response", "").strip()
-                logger.debug("LLM response received (latency=%dms, response_len=%d, attempts=%d)", elapsed, len(text), attempts)
+                usage = ollama_usage(data)
+                record_usage(timeout_key or "llm", usage)
+                logger.debug("LLM response received (latency=%dms, total=%dms, response_len=%d, attempts=%d)", latency_ms, elapsed, len(text), attempts)
                 return {
                     "execution_status": "SUCCESS",
                     "attempts": attempts,
                     "text": text,
-                    "latency_ms": elapsed,
-                    "error": None
+                    "latency_ms": latency_ms,
+                    "elapsed_ms": elapsed,
+                    "queue_wait_ms": int(queue_wait_ms),
+                    "timeout_s": round(timeout, 1),
+                    "error": None,
+                    "usage": usage
                 }
 
+            except AdmissionCancelled:
+                # Not sent: the check at the top of the loop returns the cancelled result
+                attempts -= 1
+                continue
+
             except requests.exceptions.Timeout:
-                logger.warning("LLM request timed out (attempt %d/%d, timeout=%ds)", attempts, self.max_retries + 1, self.timeout)
+                logger.warning("LLM request timed out (attempt %d/%d, timeout=%.1fs)", attempts, self.max_retries + 1, timeout)
+                timeouts.observe_timeout(timeout_key, timeout)
+                record_metrics(timeout_key or "llm", timeout_s=timeout)
                 if attempts > self.max_retries:
                     break
                 time.sleep(self.retry_backoff)
 
             except requests.exceptions.RequestException as e:
-                elapsed = int((time.time() - start) * 1000)
+                elapsed = int((time.time() - start) * 1000 - queue_wait_ms)
                 logger.error("LLM request failed after %dms: %s", elapsed, e)
                 return {
                     "execution_status": "ERROR",
                     "attempts": attempts,
                     "text": None,
                     "latency_ms": elapsed,
+                    "queue_wait_ms": int(queue_wait_ms),
+                    "timeout_s": round(timeout, 1),
                     "error": str(e)
                 }
 
-        elapsed = int((time.time() - start) * 1000)
+        elapsed = int((time.time() - start) * 1000 - queue_wait_ms)
         logger.error("LLM max retries exceeded (%d attempts, %dms total)", attempts, elapsed)
         return {
             "execution_status": "TIMEOUT",
             "attempts": attempts,
             "text": None,
             "latency_ms": elapsed,
+            "queue_wait_ms": int(queue_wait_ms),
+            "timeout_s": round(timeout, 1),
             "error": "Max retries exceeded due to timeout."
         }
@@ -1,6 +1,26 @@
+import inspect
 from typing import Dict, Protocol, runtime_checkable
 
 
 @runtime_checkable
 class LLMClientProtocol(Protocol):
     def generate(self, prompt: str) -> Dict: ...
+
+
+@runtime_checkable
+class AsyncLLMClientProtocol(Protocol):
+    async def agenerate(self, prompt: str) -> Dict: ...
+
+
+def supports_async(client) -> bool:
+    """
+    True if client.agenerate() is awaitable down to the innermost client.
+
+    Wrapper layers delegate unknown attributes to `.inner`, so only an
+    agenerate defined on each layer's own class counts.
+    """
+    while client is not None:
+        if not inspect.iscoroutinefunction(getattr(type(client), "agenerate", None)):
+            return False
+        client = getattr(client, "inner", None)
+    return True
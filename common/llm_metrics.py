@@ -0,0 +1,188 @@
+"""
+Per-client call metrics aggregated over a run.
+
+Clients record numeric observations under their label (the S3 agent name, or
+the runner name for S1/S2), e.g. streaming time-to-first-token. The registry
+is process-wide and summarized in the run log by log_client_stats().
+
+Ollama's own token and timing counters (prompt_eval_count, eval_count and the
+matching durations) are summed separately per label by UsageTotals, which
+separates prefill from decode cost and shows how many prompt tokens the
+cached system context saved.
+"""
+
+import logging
+import math
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("marva.llm_metrics")
+
+
+# Usage fields kept from an Ollama response; durations are converted from ns to ms
+_COUNTERS = {"prompt_eval_count": "prompt_eval_count", "eval_count": "eval_count"}
+_DURATIONS = {
+    "prompt_eval_duration": "prompt_eval_ms",
+    "eval_duration": "eval_ms",
+    "load_duration": "load_ms",
+    "total_duration": "total_ms",
+}
+USAGE_FIELDS = tuple(_COUNTERS.values()) + tuple(_DURATIONS.values())
+
+
+def ollama_usage(response: Dict) -> Dict:
+    """
+    Token and timing counters of an Ollama generate response.
+
+    Ollama only reports them with the final ('done') response, so a stream
+    closed early yields an empty dict.
+    """
+    usage = {out: int(response[key]) for key, out in _COUNTERS.items() if response.get(key) is not None}
+    usage.update({out: round(response[key] / 1e6, 1) for key, out in _DURATIONS.items() if response.get(key) is not None})
+    return usage
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[idx]
+
+
+class MetricsRegistry:
+    """Thread-safe store of observations keyed by label and field name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+
+    def record(self, label: str, **values) -> None:
+        with self._lock:
+            fields = self._values[label]
+            for field, value in values.items():
+                if value is not None:
+                    fields[field].append(float(value))
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Count, mean, p50, p95 and max per label and field."""
+        with self._lock:
+            snapshot = {label: {f: sorted(v) for f, v in fields.items()} for label, fields in self._values.items()}
+        out = {}
+        for label, fields in snapshot.items():
+            out[label] = {}
+            for field, values in fields.items():
+                out[label][field] = {
+                    "count": len(values),
+                    "mean": sum(values) / len(values) if values else 0.0,
+                    "p50": _percentile(values, 50),
+                    "p95": _percentile(values, 95),
+                    "max": values[-1] if values else 0.0,
+                }
+        return out
+
+    def log_summary(self, log: Optional[logging.Logger] = None) -> None:
+        log = log or logger
+        for label, fields in sorted(self.summary().items()):
+            for field, s in sorted(fields.items()):
+                log.info(
+                    "[%s] %s: n=%d mean=%.1f p50=%.1f p95=%.1f max=%.1f",
+                    label, field, s["count"], s["mean"], s["p50"], s["p95"], s["max"],
+                )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class UsageTotals:
+    """Thread-safe sums of Ollama usage counters per label."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def record(self, label: str, usage: Dict, cached_tokens: int = 0) -> None:
+        """
+        Add one call's counters.
+
+        Args:
+            usage: Output of ollama_usage()
+            cached_tokens: Context tokens sent with the call that Ollama did not
+                           have to evaluate again (CachedOllamaClient system context)
+        """
+        with self._lock:
+            totals = self._totals[label]
+            totals["calls"] += 1
+            if usage:
+                totals["reported"] += 1
+                totals["cached_tokens"] += cached_tokens
+            for field, value in usage.items():
+                totals[field] += value
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Totals per label, plus a 'run' entry summed over all labels."""
+        with self._lock:
+            out = {label: dict(totals) for label, totals in self._totals.items()}
+        run = defaultdict(float)
+        for totals in out.values():
+            for field, value in totals.items():
+                run[field] += value
+        if out:
+            out["run"] = dict(run)
+        return out
+
+    def log_summary(self, log: Optional[logging.Logger] = None) -> None:
+        log = log or logger
+        for label, t in sorted(self.summary().items(), key=lambda item: (item[0] == "run", item[0])):
+            reported = int(t.get("reported", 0))
+            if not reported:
+                log.info("[%s] usage: %d calls, no Ollama counters reported", label, t["calls"])
+                continue
+            prompt_tokens = t.get("prompt_eval_count", 0)
+            cached = t.get("cached_tokens", 0)
+            caching = (
+                f" | cached context {cached:.0f} tokens ({100.0 * cached / (cached + prompt_tokens):.1f}% of prompt tokens not re-evaluated)"
+                if cached else ""
+            )
+            log.info(
+                "[%s] usage: %d calls (%d with counters) | prefill %d tokens in %.0fms (%.0f tok/s) | "
+                "decode %d tokens in %.0fms (%.0f tok/s) | load %.0fms%s",
+                label, t["calls"], reported,
+                prompt_tokens, t.get("prompt_eval_ms", 0), _rate(prompt_tokens, t.get("prompt_eval_ms", 0)),
+                t.get("eval_count", 0), t.get("eval_ms", 0), _rate(t.get("eval_count", 0), t.get("eval_ms", 0)),
+                t.get("load_ms", 0), caching,
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+def _rate(tokens: float, ms: float) -> float:
+    return tokens / ms * 1000 if ms else 0.0
+
+
+_REGISTRY = MetricsRegistry()
+_USAGE = UsageTotals()
+
+
+def get_metrics() -> MetricsRegistry:
+    return _REGISTRY
+
+
+def record_metrics(label: str, **values) -> None:
+    _REGISTRY.record(label, **values)
+
+
+def get_usage() -> UsageTotals:
+    return _USAGE
+
+
+def record_usage(label: str, usage: Dict, cached_tokens: int = 0) -> None:
+    _USAGE.record(label, usage, cached_tokens)
+
+
+def log_metrics_summary(log: Optional[logging.Logger] = None) -> None:
+    _REGISTRY.log_summary(log)
+    _USAGE.log_summary(log)
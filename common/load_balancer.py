@@ -0,0 +1,296 @@
+"""
+Load balancing across several Ollama hosts.
+
+config/model.yaml may list several endpoints:
+
+    host:
+      - http://gpu-a:11434
+      - http://gpu-b:11434
+    load_balancing:
+      strategy: least_outstanding   # or: latency
+      eject_after_failures: 3       # consecutive failures before ejection
+      eject_seconds: 30             # cool-down before a health-checked retry
+
+BalancedClient holds one inner client per host and routes each call through
+a process-wide EndpointBalancer. A CachedOllamaClient `context` array is only
+valid on the host that produced it, so every host gets its own client with its
+own cached system context.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from common.http_pool import get_session
+from common.llm_client_protocol import LLMClientProtocol
+
+logger = logging.getLogger("marva.load_balancer")
+
+STRATEGIES = ("least_outstanding", "latency")
+
+# Weight of the newest observation in the latency moving average
+_EWMA_ALPHA = 0.2
+
+
+def hosts_from_config(model_cfg: dict) -> List[str]:
+    """Normalize model.host (a URL or a list of URLs) to a list of base URLs."""
+    host = model_cfg["host"]
+    hosts = [host] if isinstance(host, str) else list(host)
+    return [h.rstrip("/") for h in hosts]
+
+
+class _Endpoint:
+    def __init__(self, host: str):
+        self.host = host
+        self.outstanding = 0
+        self.ewma_latency_ms: Optional[float] = None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+class EndpointBalancer:
+    """
+    Chooses a host per request and tracks its health.
+
+    - least_outstanding: fewest in-flight requests, ties broken by latency
+    - latency: lowest (outstanding + 1) * moving-average latency
+
+    A host is ejected after `eject_after_failures` consecutive failed calls.
+    Once its cool-down has passed it must answer a health check (GET
+    /api/version) before it receives traffic again.
+    """
+
+    def __init__(
+        self,
+        hosts: List[str],
+        strategy: str = "least_outstanding",
+        eject_after_failures: int = 3,
+        eject_seconds: float = 30.0,
+        health_timeout: float = 5.0,
+    ):
+        if not hosts:
+            raise ValueError("EndpointBalancer needs at least one host")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown load balancing strategy '{strategy}', expected one of {STRATEGIES}")
+        self.endpoints = {h: _Endpoint(h) for h in hosts}
+        self.strategy = strategy
+        self.eject_after_failures = eject_after_failures
+        self.eject_seconds = eject_seconds
+        self.health_timeout = health_timeout
+        self._lock = threading.Lock()
+
+    def _score(self, ep: _Endpoint) -> tuple:
+        latency = ep.ewma_latency_ms if ep.ewma_latency_ms is not None else 0.0
+        if self.strategy == "latency":
+            return ((ep.outstanding + 1) * latency, ep.outstanding, ep.requests)
+        return (ep.outstanding, latency, ep.requests)
+
+    def _health_check(self, host: str) -> bool:
+        try:
+            response = get_session(host).get(f"{host}/api/version", timeout=self.health_timeout)
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.debug("Health check failed for %s: %s", host, e)
+            return False
+
+    def _recover_expired(self) -> None:
+        """Health-check ejected hosts whose cool-down has expired."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [ep for ep in self.endpoints.values() if ep.ejected_until and now >= ep.ejected_until]
+            for ep in expired:
+                # Push the deadline out so concurrent callers do not probe the same host
+                ep.ejected_until = now + self.eject_seconds
+        for ep in expired:
+            healthy = self._health_check(ep.host)
+            with self._lock:
+                if healthy:
+                    ep.ejected_until = 0.0
+                    ep.consecutive_failures = 0
+                    logger.info("Endpoint %s passed health check, re-admitted", ep.host)
+                else:
+                    logger.warning("Endpoint %s still unhealthy, ejected for another %.0fs", ep.host, self.eject_seconds)
+
+    def acquire(self, exclude: Optional[set] = None) -> str:
+        """Pick a host and count the request as outstanding on it."""
+        exclude = exclude or set()
+        self._recover_expired()
+        with self._lock:
+            now = time.monotonic()
+            candidates = [ep for ep in self.endpoints.values() if ep.healthy(now) and ep.host not in exclude]
+            if not candidates:
+                # Everything is ejected: fall back to the host that recovers first
+                pool = [ep for ep in self.endpoints.values() if ep.host not in exclude] or list(self.endpoints.values())
+                candidates = [min(pool, key=lambda ep: ep.ejected_until)]
+            ep = min(candidates, key=self._score)
+            ep.outstanding += 1
+            ep.requests += 1
+            return ep.host
+
+    def release(self, host: str, ok: Optional[bool], latency_ms: Optional[float] = None) -> None:
+        """Finish a request on `host`; ok=None (e.g. a cancelled call) says nothing about its health."""
+        with self._lock:
+            ep = self.endpoints[host]
+            ep.outstanding -= 1
+            if ok is None:
+                return
+            if ok:
+                ep.consecutive_failures = 0
+                if latency_ms is not None:
+                    ep.ewma_latency_ms = (
+                        latency_ms if ep.ewma_latency_ms is None
+                        else _EWMA_ALPHA * latency_ms + (1 - _EWMA_ALPHA) * ep.ewma_latency_ms
+                    )
+                return
+            ep.failures += 1
+            ep.consecutive_failures += 1
+            if ep.consecutive_failures >= self.eject_after_failures and ep.healthy(time.monotonic()):
+                ep.ejected_until = time.monotonic() + self.eject_seconds
+                ep.ejections += 1
+                logger.warning(
+                    "Ejecting endpoint %s for %.0fs after %d consecutive failures",
+                    host, self.eject_seconds, ep.consecutive_failures,
+                )
+
+    def healthy_hosts(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            return [ep.host for ep in self.endpoints.values() if ep.healthy(now)]
+
+    def log_stats(self, log: Optional[logging.Logger] = None) -> None:
+        log = log or logger
+        with self._lock:
+            endpoints = list(self.endpoints.values())
+        for ep in endpoints:
+            log.info(
+                "Endpoint %s: %d requests, %d failures, %d ejections, ewma latency=%s",
+                ep.host, ep.requests, ep.failures, ep.ejections,
+                f"{ep.ewma_latency_ms:.0f}ms" if ep.ewma_latency_ms is not None else "n/a",
+            )
+
+
+class BalancedClient:
+    """
+    LLMClientProtocol wrapper that routes each call to one of several per-host clients.
+
+    A call that does not succeed is retried once on a different healthy host.
+    The chosen host is reported as 'host' in the result dict. Attributes not
+    defined here are delegated to the first host's client.
+
+    generate() also accepts `exclude` (hosts not to use, e.g. for a hedged
+    duplicate) and `on_host` (called with each host as it is picked).
+    agenerate() routes the same way for per-host clients with an async API.
+    """
+
+    def __init__(self, clients: Dict[str, LLMClientProtocol], balancer: EndpointBalancer):
+        self.clients = clients
+        self.balancer = balancer
+        self.inner = next(iter(clients.values()))
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def _abandon(self, host: str, error: BaseException) -> None:
+        """Release the host of a call whose client raised."""
+        # A client that raises counts as a failure towards ejection, like an ERROR
+        # result; an interrupt (e.g. KeyboardInterrupt) says nothing about the host
+        self.balancer.release(host, False if isinstance(error, Exception) else None)
+
+    def _finish(self, host: str, result: Dict) -> Dict:
+        status = result.get("execution_status")
+        self.balancer.release(host, None if status == "CANCELLED" else status == "SUCCESS", result.get("latency_ms"))
+        result["host"] = host
+        return result
+
+    def _retry_host(self, host: str, result: Dict, exclude: set) -> Optional[str]:
+        """Pick another healthy host for a call that did not succeed, or None."""
+        if result.get("execution_status") in ("SUCCESS", "CANCELLED") or len(self.clients) == 1:
+            return None
+        alternatives = set(self.balancer.healthy_hosts()) - exclude - {host}
+        if not alternatives:
+            return None
+        retry_host = self.balancer.acquire(exclude=exclude | {host})
+        logger.warning("Call on %s returned %s, retrying on %s", host, result.get("execution_status"), retry_host)
+        return retry_host
+
+    def _call(self, host: str, prompt: str, **kwargs) -> Dict:
+        try:
+            result = self.clients[host].generate(prompt, **kwargs)
+        except BaseException as e:
+            self._abandon(host, e)
+            raise
+        return self._finish(host, result)
+
+    async def _acall(self, host: str, prompt: str, **kwargs) -> Dict:
+        try:
+            result = await self.clients[host].agenerate(prompt, **kwargs)
+        except BaseException as e:
+            self._abandon(host, e)
+            raise
+        return self._finish(host, result)
+
+    def generate(
+        self,
+        prompt: str,
+        exclude: Optional[set] = None,
+        on_host: Optional[Callable[[str], None]] = None,
+        **kwargs,
+    ) -> Dict:
+        exclude = set(exclude or ())
+        host = self.balancer.acquire(exclude=exclude)
+        if on_host is not None:
+            on_host(host)
+        result = self._call(host, prompt, **kwargs)
+        retry_host = self._retry_host(host, result, exclude)
+        if retry_host is not None:
+            if on_host is not None:
+                on_host(retry_host)
+            result = self._call(retry_host, prompt, **kwargs)
+        return result
+
+    async def agenerate(self, prompt: str, exclude: Optional[set] = None, **kwargs) -> Dict:
+        exclude = set(exclude or ())
+        # acquire() may health-check an ejected host over HTTP
+        host = await asyncio.to_thread(self.balancer.acquire, exclude=exclude)
+        result = await self._acall(host, prompt, **kwargs)
+        retry_host = await asyncio.to_thread(self._retry_host, host, result, exclude)
+        if retry_host is not None:
+            result = await self._acall(retry_host, prompt, **kwargs)
+        return result
+
+
+_BALANCERS: Dict[tuple, EndpointBalancer] = {}
+_BALANCERS_LOCK = threading.Lock()
+
+
+def get_balancer(hosts: List[str], lb_cfg: Optional[dict] = None) -> EndpointBalancer:
+    """Process-wide balancer for a set of hosts, so outstanding counts span all clients."""
+    key = tuple(hosts)
+    lb_cfg = lb_cfg or {}
+    with _BALANCERS_LOCK:
+        balancer = _BALANCERS.get(key)
+        if balancer is None:
+            balancer = EndpointBalancer(
+                hosts,
+                strategy=lb_cfg.get("strategy", "least_outstanding"),
+                eject_after_failures=lb_cfg.get("eject_after_failures", 3),
+                eject_seconds=lb_cfg.get("eject_seconds", 30),
+            )
+            _BALANCERS[key] = balancer
+    return balancer
+
+
+def log_balancer_stats(log: Optional[logging.Logger] = None) -> None:
+    with _BALANCERS_LOCK:
+        balancers = list(_BALANCERS.values())
+    for balancer in balancers:
+        balancer.log_stats(log)
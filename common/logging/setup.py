@@ -3,7 +3,6 @@ from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 LOG_DIR = Path("logs")
-LOG_DIR.mkdir(exist_ok=True)
 
 LOG_FORMAT = (
     "%(asctime)s | %(levelname)-8s | %(name)s | "
@@ -21,6 +20,7 @@ class RunIdFilter(logging.Filter):
 
 
 def setup_logging(run_id: str, level=logging.INFO):
+    LOG_DIR.mkdir(exist_ok=True)
     root = logging.getLogger()
     root.setLevel(level)
 
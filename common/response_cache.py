@@ -0,0 +1,228 @@
+"""
+Persistent on-disk LLM response cache.
+
+Runs at temperature 0.0 are deterministic for a given model, options, system
+context and prompt, so re-running a runner on the same dataset re-sends the
+exact same requests. CachedResponseClient wraps any LLMClientProtocol and
+serves those repeats from a SQLite file instead of the model.
+
+Configured in config/global.yaml:
+
+    response_cache:
+      enabled: true
+      path: cache/llm_responses.sqlite3
+      max_entries: 100000     # LRU eviction beyond this many rows
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from common.llm_client_protocol import LLMClientProtocol
+
+logger = logging.getLogger("marva.response_cache")
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+def request_key(client, prompt: str) -> str:
+    """
+    Deterministic key for a request sent through `client`.
+
+    Covers the client's model, options and cached system context (via its
+    cache_identity() method) plus the prompt text.
+    """
+    identity_fn = getattr(client, "cache_identity", None)
+    identity = identity_fn() if callable(identity_fn) else {"client": type(client).__name__}
+    raw = json.dumps({"identity": identity, "prompt": prompt}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed key/value store for successful LLM results with LRU eviction.
+
+    A single connection is shared by all threads and guarded by a lock;
+    last_access is refreshed on every hit so eviction drops the least
+    recently used rows first.
+    """
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        logger.debug("Response cache opened (%s, %d entries, max=%d)", self.path, self._size, self.max_entries)
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Dict) -> None:
+        now = time.time()
+        payload = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, result, created, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            if exists is None:
+                self._size += 1
+            overflow = self._size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self._size -= overflow
+                self.evictions += overflow
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": self._size,
+        }
+
+    def log_stats(self, log: Optional[logging.Logger] = None) -> None:
+        log = log or logger
+        s = self.stats()
+        lookups = s["hits"] + s["misses"]
+        ratio = (s["hits"] / lookups * 100) if lookups else 0.0
+        log.info(
+            "Response cache %s: %d hits, %d misses (%.1f%% hit rate), %d evictions, %d entries",
+            self.path, s["hits"], s["misses"], ratio, s["evictions"], s["entries"],
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedResponseClient:
+    """
+    LLMClientProtocol wrapper that consults a ResponseCache before the inner client.
+
+    Only SUCCESS results are stored, so timeouts and errors are retried on the
+    next run. Hits are returned with 'cache_hit': True and the lookup time as
+    'latency_ms'. They carry no 'usage': the stored counters belong to the call
+    that filled the cache, and reporting them again would count tokens the run
+    did not spend. Attributes not defined here are delegated to the inner client.
+    """
+
+    def __init__(self, inner: LLMClientProtocol, cache: ResponseCache):
+        self.inner = inner
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def _lookup(self, prompt: str) -> Tuple[str, Optional[Dict]]:
+        """Return the request key and the cached result (None on a miss)."""
+        start = time.perf_counter()
+        key = request_key(self.inner, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            cached["cache_hit"] = True
+            cached["latency_ms"] = int((time.perf_counter() - start) * 1000)
+            cached["queue_wait_ms"] = 0
+            cached.pop("usage", None)
+            logger.debug("Response cache hit (key=%s)", key[:12])
+        return key, cached
+
+    def _store(self, key: str, result: Dict) -> None:
+        if result.get("execution_status") == "SUCCESS":
+            self.cache.put(key, result)
+
+    def generate(self, prompt: str, **kwargs) -> Dict:
+        key, cached = self._lookup(prompt)
+        if cached is not None:
+            return cached
+        result = self.inner.generate(prompt, **kwargs)
+        self._store(key, result)
+        return result
+
+    async def agenerate(self, prompt: str, **kwargs) -> Dict:
+        # SQLite reads and writes stay off the event loop
+        key, cached = await asyncio.to_thread(self._lookup, prompt)
+        if cached is not None:
+            return cached
+        result = await self.inner.agenerate(prompt, **kwargs)
+        await asyncio.to_thread(self._store, key, result)
+        return result
+
+
+_CACHES: Dict[str, ResponseCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_response_cache(path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> ResponseCache:
+    """Return the process-wide ResponseCache for a file, opening it on first use."""
+    resolved = str(Path(path).resolve())
+    with _CACHES_LOCK:
+        cache = _CACHES.get(resolved)
+        if cache is None:
+            cache = ResponseCache(Path(path), max_entries=max_entries)
+            _CACHES[resolved] = cache
+    return cache
+
+
+def open_response_cache(global_cfg: dict, enabled: bool = True) -> Optional[ResponseCache]:
+    """
+    Open the cache described by the 'global' config section.
+
+    Args:
+        global_cfg: cfg["global"]
+        enabled: False to bypass the cache (e.g. --no-cache)
+
+    Returns:
+        ResponseCache, or None when caching is disabled
+    """
+    cache_cfg = global_cfg.get("response_cache") or {}
+    if not enabled or not cache_cfg.get("enabled", False):
+        return None
+    return get_response_cache(
+        cache_cfg.get("path", "cache/llm_responses.sqlite3"),
+        max_entries=cache_cfg.get("max_entries", DEFAULT_MAX_ENTRIES),
+    )
+
+
+def log_cache_stats(log: Optional[logging.Logger] = None) -> None:
+    with _CACHES_LOCK:
+        caches = list(_CACHES.values())
+    for cache in caches:
+        cache.log_stats(log)
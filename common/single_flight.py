@@ -0,0 +1,173 @@
+"""
+Single-flight deduplication of identical in-flight LLM requests.
+
+Datasets contain exact-duplicate requirement texts, so a concurrent runner can
+send the same prompt to the same agent while an identical request is still
+running. SingleFlightClient coalesces those calls: the first caller performs
+the upstream request and every concurrent caller with the same key waits for
+and receives a copy of that result.
+
+Enabled in config/global.yaml:
+
+    single_flight: true
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from common.llm_client_protocol import LLMClientProtocol
+from common.response_cache import request_key
+
+logger = logging.getLogger("marva.single_flight")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    Counters:
+        calls: total do() invocations
+        upstream: calls that actually executed fn
+        coalesced: calls that waited on another caller's execution
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Call] = {}
+        self.calls = 0
+        self.upstream = 0
+        self.coalesced = 0
+
+    def _join(self, key: str) -> Tuple[_Call, bool]:
+        """Return the in-flight call for key and whether the caller leads it."""
+        with self._lock:
+            self.calls += 1
+            call = self._inflight.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                return call, False
+            call = _Call()
+            self._inflight[key] = call
+            self.upstream += 1
+            return call, True
+
+    def _shared(self, call: _Call) -> Tuple[Dict, bool]:
+        if call.error is not None:
+            raise call.error
+        return dict(call.result), True
+
+    def _finish(self, key: str, call: _Call) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+        call.done.set()
+        if call.waiters:
+            logger.debug("Single-flight fanned out result to %d waiters (key=%s)", call.waiters, key[:12])
+
+    def do(self, key: str, fn: Callable[[], Dict]) -> Tuple[Dict, bool]:
+        """
+        Run fn once per key among concurrent callers.
+
+        Returns:
+            Tuple of (result, shared) where shared is True when the result was
+            produced by another caller's in-flight execution
+        """
+        call, leader = self._join(key)
+        if not leader:
+            call.done.wait()
+            return self._shared(call)
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result, False
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Dict]]) -> Tuple[Dict, bool]:
+        """Async do(): awaits fn(); coalesces with blocking callers of the same key too."""
+        call, leader = self._join(key)
+        if not leader:
+            # The leader may be a thread, so wait for its Event off the loop
+            await asyncio.to_thread(call.done.wait)
+            return self._shared(call)
+
+        try:
+            call.result = await fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "upstream": self.upstream, "coalesced": self.coalesced}
+
+    def log_stats(self, log: Optional[logging.Logger] = None) -> None:
+        log = log or logger
+        s = self.stats()
+        if not s["calls"]:
+            return
+        log.info(
+            "Single-flight: %d calls, %d upstream, %d coalesced (%.1f%%)",
+            s["calls"], s["upstream"], s["coalesced"], s["coalesced"] / s["calls"] * 100,
+        )
+
+
+_GROUP = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return _GROUP
+
+
+class SingleFlightClient:
+    """
+    LLMClientProtocol wrapper that coalesces identical concurrent generate() calls.
+
+    Keys come from request_key(), so only calls with the same model, options,
+    system context and prompt are merged. Waiters receive a copy of the result
+    with 'coalesced': True. Attributes not defined here are delegated to the
+    inner client.
+    """
+
+    def __init__(self, inner: LLMClientProtocol, group: Optional[SingleFlight] = None):
+        self.inner = inner
+        self.group = group or _GROUP
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def generate(self, prompt: str, **kwargs) -> Dict:
+        key = request_key(self.inner, prompt)
+        result, shared = self.group.do(key, lambda: self.inner.generate(prompt, **kwargs))
+        if shared:
+            result["coalesced"] = True
+        return result
+
+    async def agenerate(self, prompt: str, **kwargs) -> Dict:
+        key = request_key(self.inner, prompt)
+        result, shared = await self.group.ado(key, lambda: self.inner.agenerate(prompt, **kwargs))
+        if shared:
+            result["coalesced"] = True
+        return result
+
+
+def log_single_flight_stats(log: Optional[logging.Logger] = None) -> None:
+    _GROUP.log_stats(log)
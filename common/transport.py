@@ -0,0 +1,323 @@
+"""
+Record/replay transport for deterministic performance runs.
+
+Mounted beneath every pooled requests.Session (see http_pool), so LLMClient,
+CachedOllamaClient, the context store and the warm-up all go through it.
+
+- record: requests go to the server as usual; each request/response pair,
+  including failures and the observed latency, is appended to a gzip JSONL
+  archive. The body is copied while the caller reads it and the exchange is
+  written when the response is closed or read to the end, so a stream closed
+  early is recorded up to where it stopped (with "complete": false)
+- replay: no network traffic; responses are served from the archive, either
+  after the recorded latency ("original") or immediately ("fast")
+
+Requests are matched on method, path and canonical JSON body, not on host,
+so traffic recorded against several load-balanced hosts replays regardless of
+which host is picked. Identical requests are answered in recorded order; once
+the recordings for a request are used up, the last one is repeated.
+
+Configured in config/global.yaml:
+
+    transport:
+      mode: live                   # live | record | replay
+      archive: cache/traffic.jsonl.gz
+      replay_timing: fast          # original | fast
+
+The persistent response cache is bypassed in record and replay mode so that
+every call reaches the transport.
+"""
+
+import atexit
+import gzip
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+from urllib3.exceptions import ReadTimeoutError
+
+from common.http_pool import get_pool
+
+logger = logging.getLogger("marva.transport")
+
+MODES = ("live", "record", "replay")
+TIMINGS = ("original", "fast")
+
+
+class ReplayMissError(requests.ConnectionError):
+    """No recorded response matches the request."""
+
+
+def request_key(method: str, url: str, body) -> str:
+    """Match key for a request: method, path and canonical JSON body."""
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")) if body else ""
+    except (json.JSONDecodeError, TypeError):
+        pass
+    return hashlib.sha256(f"{method.upper()} {path}\n{body or ''}".encode("utf-8")).hexdigest()
+
+
+class TrafficArchive:
+    """Gzip JSONL file of request/response pairs."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+        self._entries: Dict[str, List[dict]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+    # -------------------------------------------------
+    # Record
+    # -------------------------------------------------
+    def append(self, entry: dict) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = gzip.open(self.path, "wt", encoding="utf-8")
+                logger.info("Recording LLM traffic to %s", self.path)
+            self._file.write(line)
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # -------------------------------------------------
+    # Replay
+    # -------------------------------------------------
+    def load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"Traffic archive not found: {self.path}")
+        count = 0
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._entries[entry["key"]].append(entry)
+                count += 1
+        logger.info("Loaded %d recorded exchanges (%d distinct requests) from %s", count, len(self._entries), self.path)
+
+    def next(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            idx = self._served[key]
+            self._served[key] += 1
+            self.replayed += 1
+            return entries[min(idx, len(entries) - 1)]
+
+    def log_stats(self, log: Optional[logging.Logger] = None, mode: str = "") -> None:
+        log = log or logger
+        if mode == "record":
+            log.info("Transport: recorded %d exchanges to %s", self.recorded, self.path)
+        elif mode == "replay":
+            log.info("Transport: replayed %d exchanges from %s (%d misses)", self.replayed, self.path, self.misses)
+
+
+class _RecordingBody:
+    """
+    Stand-in for a urllib3 response body that copies every chunk the caller reads.
+
+    The exchange is appended to the archive once, when the body is read to the
+    end, fails or is closed. Everything else is delegated to the real response.
+    """
+
+    def __init__(self, raw: HTTPResponse, archive: TrafficArchive, entry: dict, start: float):
+        self._raw = raw
+        self._archive = archive
+        self._entry = entry
+        self._start = start
+        self._chunks: List[bytes] = []
+        self._error: Optional[Exception] = None
+        self._complete = False
+        self._recorded = False
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        try:
+            for chunk in self._raw.stream(amt, decode_content=decode_content):
+                self._chunks.append(chunk)
+                yield chunk
+            self._complete = True
+        except Exception as e:
+            self._error = e
+            raise
+        finally:
+            self._record()
+
+    def read(self, amt=None, *args, **kwargs):
+        try:
+            data = self._raw.read(amt, *args, **kwargs)
+        except Exception as e:
+            self._error = e
+            self._record()
+            raise
+        self._chunks.append(data)
+        if amt is None or not data:
+            self._complete = True
+            self._record()
+        return data
+
+    def close(self):
+        try:
+            self._raw.close()
+        finally:
+            self._record()
+
+    def release_conn(self):
+        try:
+            self._raw.release_conn()
+        finally:
+            self._record()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def _record(self) -> None:
+        if self._recorded:
+            return
+        self._recorded = True
+        elapsed_ms = (time.perf_counter() - self._start) * 1000
+        if isinstance(self._error, ReadTimeoutError):
+            self._archive.append({**self._entry, "error": "timeout", "message": str(self._error), "elapsed_ms": elapsed_ms})
+            return
+        if self._error is not None:
+            self._archive.append({**self._entry, "error": "connection", "message": str(self._error), "elapsed_ms": elapsed_ms})
+            return
+        self._archive.append({
+            **self._entry,
+            "body": b"".join(self._chunks).decode("utf-8", errors="replace"),
+            "complete": self._complete,
+            "elapsed_ms": elapsed_ms,
+        })
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that appends every exchange to a TrafficArchive."""
+
+    def __init__(self, archive: TrafficArchive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        key = request_key(request.method, request.url, request.body)
+        entry = {"key": key, "method": request.method, "url": request.url}
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.Timeout as e:
+            self.archive.append({**entry, "error": "timeout", "message": str(e),
+                                 "elapsed_ms": (time.perf_counter() - start) * 1000})
+            raise
+        except requests.ConnectionError as e:
+            self.archive.append({**entry, "error": "connection", "message": str(e),
+                                 "elapsed_ms": (time.perf_counter() - start) * 1000})
+            raise
+        # Recorded when the caller is done with the body, which it reads at its own pace
+        response.raw = _RecordingBody(response.raw, self.archive, {
+            **entry,
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type", "application/json"),
+        }, start)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """HTTPAdapter that answers from a TrafficArchive without network access."""
+
+    def __init__(self, archive: TrafficArchive, timing: str = "fast", **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+        self.timing = timing
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry = self.archive.next(request_key(request.method, request.url, request.body))
+        if entry is None:
+            logger.warning("No recorded response for %s %s", request.method, request.url)
+            raise ReplayMissError(f"No recorded response for {request.method} {request.url}", request=request)
+
+        if self.timing == "original":
+            time.sleep(entry.get("elapsed_ms", 0) / 1000)
+
+        if entry.get("error") == "timeout":
+            raise requests.ReadTimeout(entry.get("message", "Recorded timeout"), request=request)
+        if entry.get("error"):
+            raise requests.ConnectionError(entry.get("message", "Recorded connection error"), request=request)
+
+        raw = HTTPResponse(
+            body=io.BytesIO(entry["body"].encode("utf-8")),
+            headers={"Content-Type": entry.get("content_type", "application/json")},
+            status=entry["status"],
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+
+_ARCHIVE: Optional[TrafficArchive] = None
+_MODE = "live"
+
+
+def transport_mode() -> str:
+    return _MODE
+
+
+def configure_transport(global_cfg: dict) -> None:
+    """Mount the transport described by the 'global' config section on new pooled sessions."""
+    global _ARCHIVE, _MODE
+    transport_cfg = global_cfg.get("transport") or {}
+    mode = transport_cfg.get("mode", "live")
+    if mode not in MODES:
+        raise ValueError(f"transport.mode: expected one of {MODES}, got '{mode}'")
+    timing = transport_cfg.get("replay_timing", "fast")
+    if timing not in TIMINGS:
+        raise ValueError(f"transport.replay_timing: expected one of {TIMINGS}, got '{timing}'")
+
+    archive_path = Path(transport_cfg.get("archive", "cache/traffic.jsonl.gz"))
+    if mode == _MODE and (mode == "live" or _ARCHIVE.path == archive_path):
+        return
+    if _ARCHIVE is not None:
+        _ARCHIVE.close()
+    _MODE = mode
+    pool = get_pool()
+    if mode == "live":
+        _ARCHIVE = None
+        pool.set_adapter_factory(None)
+        return
+
+    _ARCHIVE = TrafficArchive(archive_path)
+    archive = _ARCHIVE
+    if mode == "record":
+        atexit.register(archive.close)
+        pool.set_adapter_factory(lambda size: RecordingAdapter(archive, pool_connections=1, pool_maxsize=size))
+    else:
+        archive.load()
+        pool.set_adapter_factory(lambda size: ReplayAdapter(archive, timing, pool_connections=1, pool_maxsize=size))
+    logger.info("Transport mode '%s' (archive=%s%s)", mode, archive.path, f", timing={timing}" if mode == "replay" else "")
+
+
+def log_transport_stats(log: Optional[logging.Logger] = None) -> None:
+    if _ARCHIVE is not None:
+        _ARCHIVE.log_stats(log, _MODE)
@@ -0,0 +1,74 @@
+"""
+Model preloading before a run.
+
+Ollama loads a model on its first request and unloads it after `keep_alive`
+of inactivity. Without a warm-up, the first requirement of every run absorbs
+the load time and shows up as an outlier in the per-requirement durations.
+
+preload_models() sends an empty generate request for the configured model to
+every host, which loads it and pins it for `keep_alive`. Configured in
+config/model.yaml:
+
+    preload: true                  # warm up before the pipeline starts
+    keep_alive: 30m                # sent with every request; -1 = never unload
+    preload_timeout_seconds: 300
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from common.http_pool import get_session
+from common.load_balancer import hosts_from_config
+
+logger = logging.getLogger("marva.warmup")
+
+
+def keep_alive_field(model_cfg: dict) -> Dict:
+    """Request field pinning the model in memory, or {} when keep_alive is unset."""
+    keep_alive = model_cfg.get("keep_alive")
+    return {} if keep_alive is None else {"keep_alive": keep_alive}
+
+
+def _preload_host(host: str, model: str, keep_alive: Dict, timeout: float) -> Optional[float]:
+    start = time.perf_counter()
+    try:
+        response = get_session(host).post(
+            f"{host}/api/generate",
+            json={"model": model, **keep_alive},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        load_ms = response.json().get("load_duration", 0) / 1e6
+    except Exception as e:
+        logger.error("Preloading '%s' on %s failed after %.2fs: %s", model, host, time.perf_counter() - start, e)
+        return None
+    elapsed = time.perf_counter() - start
+    logger.info("Preloaded '%s' on %s in %.2fs (model load %.0fms)", model, host, elapsed, load_ms)
+    return elapsed
+
+
+def preload_models(cfg: dict) -> Dict[str, Optional[float]]:
+    """
+    Load the configured model on every host before the run starts.
+
+    Returns:
+        Seconds taken per host, or None for hosts that failed. A failed preload
+        is logged and the run continues; the first request then pays the load.
+    """
+    model_cfg = cfg["model"]
+    hosts = hosts_from_config(model_cfg)
+    model = model_cfg["model_name"]
+    keep_alive = keep_alive_field(model_cfg)
+    timeout = model_cfg.get("preload_timeout_seconds", 300)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+        times = dict(zip(hosts, executor.map(lambda h: _preload_host(h, model, keep_alive, timeout), hosts)))
+    logger.info(
+        "Warm-up finished in %.2fs (%d/%d hosts ready, keep_alive=%s)",
+        time.perf_counter() - start, sum(t is not None for t in times.values()), len(hosts),
+        keep_alive.get("keep_alive", "server default"),
+    )
+    return times
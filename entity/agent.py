@@ -1,16 +1,20 @@
 class AgentResult:
-    def __init__(self, agent, status, issues=None):
+    def __init__(self, agent, status, issues=None, usage=None):
         self.agent = agent
         self.status = status        # PASS | FLAG | FAIL (FAIL only for Atomicity) | TiMEOUT | ERROR.
         self.issues = issues or []
+        self.usage = usage          # Ollama token/timing counters of the LLM call, if reported
 
     def to_dict(self):
-        return{
+        result = {
             "agent" : self.agent,
             "status" : self.status,
             "issues" : self.issues
         }
+        if self.usage:
+            result["usage"] = self.usage
+        return result
 
     def __repr__(self) -> str:
-        return f"AgentResult(agent={self.agent!r}, status={self.status!r}, issues={self.issues!r})"
+        return f"AgentResult(agent={self.agent!r}, status={self.status!r}, issues={self.issues!r}, usage={self.usage!r})"
 
@@ -1,19 +1,18 @@
-from evaluation.evaluators import (
-    BaseEvaluator,
-    ScoreEvaluator,
-    ScoreMetrics,
-    ConfusionEvaluator,
-    ConfusionMetrics,
-    DurationAnalyzer,
-    CrossRunAnalyzer,
-)
+"""Evaluation of run results; the evaluators are imported on first access."""
 
-__all__ = [
-    "BaseEvaluator",
-    "ScoreEvaluator",
-    "ScoreMetrics",
-    "ConfusionEvaluator",
-    "ConfusionMetrics",
-    "DurationAnalyzer",
-    "CrossRunAnalyzer",
-]
+from evaluation.util.lazy import lazy_exports
+
+# Re-exported from evaluation.evaluators, which imports each one on first access in turn
+_EXPORTS = {
+    "BaseEvaluator": "evaluation.evaluators",
+    "ScoreEvaluator": "evaluation.evaluators",
+    "ScoreMetrics": "evaluation.evaluators",
+    "ConfusionEvaluator": "evaluation.evaluators",
+    "ConfusionMetrics": "evaluation.evaluators",
+    "DurationAnalyzer": "evaluation.evaluators",
+    "CrossRunAnalyzer": "evaluation.evaluators",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
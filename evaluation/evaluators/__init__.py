@@ -1,15 +1,20 @@
-from evaluation.evaluators.base import BaseEvaluator
-from evaluation.evaluators.score_evaluator import ScoreEvaluator, ScoreMetrics
-from evaluation.evaluators.confusion_evaluator import ConfusionEvaluator, ConfusionMetrics
-from evaluation.evaluators.duration import DurationAnalyzer
-from evaluation.evaluators.cross_run_analyzer import CrossRunAnalyzer
-
-__all__ = [
-    "BaseEvaluator",
-    "ScoreEvaluator",
-    "ScoreMetrics",
-    "ConfusionEvaluator",
-    "ConfusionMetrics",
-    "DurationAnalyzer",
-    "CrossRunAnalyzer",
-]
+"""
+Evaluators, imported on first access so that a caller needing one of them
+(e.g. DurationAnalyzer for plots) does not load sklearn and scipy as well.
+"""
+
+from evaluation.util.lazy import lazy_exports
+
+_EXPORTS = {
+    "BaseEvaluator": "evaluation.evaluators.base",
+    "ScoreEvaluator": "evaluation.evaluators.score_evaluator",
+    "ScoreMetrics": "evaluation.evaluators.score_evaluator",
+    "ConfusionEvaluator": "evaluation.evaluators.confusion_evaluator",
+    "ConfusionMetrics": "evaluation.evaluators.confusion_evaluator",
+    "DurationAnalyzer": "evaluation.evaluators.duration",
+    "CrossRunAnalyzer": "evaluation.evaluators.cross_run_analyzer",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
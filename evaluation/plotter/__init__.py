@@ -1,13 +1,15 @@
-from evaluation.plotter.base import BasePlotter
-from evaluation.plotter.scores_plotter import ScoresPlotter
-from evaluation.plotter.confusion_plotter import ConfusionPlotter
-from evaluation.plotter.duration_box_plotter import DurationBoxPlotter
-from evaluation.plotter.duration_summary_plotter import DurationSummaryPlotter
-
-__all__ = [
-    "BasePlotter",
-    "ScoresPlotter",
-    "ConfusionPlotter",
-    "DurationBoxPlotter",
-    "DurationSummaryPlotter",
-]
+"""Plotters, imported on first access (each one loads matplotlib)."""
+
+from evaluation.util.lazy import lazy_exports
+
+_EXPORTS = {
+    "BasePlotter": "evaluation.plotter.base",
+    "ScoresPlotter": "evaluation.plotter.scores_plotter",
+    "ConfusionPlotter": "evaluation.plotter.confusion_plotter",
+    "DurationBoxPlotter": "evaluation.plotter.duration_box_plotter",
+    "DurationSummaryPlotter": "evaluation.plotter.duration_summary_plotter",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -4,12 +4,6 @@ import argparse
 from pathlib import Path
 
 from evaluation.util.constants import DEFAULT_FIGURES_DIR
-from evaluation.util.io import make_fig_dir, parse_pairs
-from evaluation.plotter.scores_plotter import ScoresPlotter
-from evaluation.plotter.confusion_plotter import ConfusionPlotter
-from evaluation.plotter.duration_box_plotter import DurationBoxPlotter
-from evaluation.plotter.duration_summary_plotter import DurationSummaryPlotter
-from evaluation.evaluators.duration import DurationAnalyzer
 
 
 def main() -> None:
@@ -36,6 +30,14 @@ def main() -> None:
     if not args.metrics and not args.duration:
         parser.error("At least one of --metrics or --duration is required")
 
+    # matplotlib / pandas are imported once the arguments are valid
+    from evaluation.util.io import make_fig_dir, parse_pairs
+    from evaluation.plotter.scores_plotter import ScoresPlotter
+    from evaluation.plotter.confusion_plotter import ConfusionPlotter
+    from evaluation.plotter.duration_box_plotter import DurationBoxPlotter
+    from evaluation.plotter.duration_summary_plotter import DurationSummaryPlotter
+    from evaluation.evaluators.duration import DurationAnalyzer
+
     fig_dir = Path(args.fig_dir) if args.fig_dir else make_fig_dir()
 
     if args.metrics:
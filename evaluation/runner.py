@@ -3,16 +3,17 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from evaluation.evaluators.score_evaluator import ScoreEvaluator
-from evaluation.evaluators.confusion_evaluator import ConfusionEvaluator
-from evaluation.evaluators.duration import DurationAnalyzer
-from evaluation.evaluators.cross_run_analyzer import CrossRunAnalyzer
 from evaluation.util.constants import GROUND_TRUTH_MAP, DEFAULT_OUT_DIR, EVAL_MODES
-from evaluation.util.io import save_summary
 
 
 def main(results: str, mode: str, eval_mode: str, out_dir: str | None,
          duration: bool = False) -> None:
+    # pandas / sklearn are imported here so the CLI starts without them
+    from evaluation.evaluators.score_evaluator import ScoreEvaluator
+    from evaluation.evaluators.confusion_evaluator import ConfusionEvaluator
+    from evaluation.evaluators.duration import DurationAnalyzer
+    from evaluation.util.io import save_summary
+
     gt_path = GROUND_TRUTH_MAP.get(mode)
     if gt_path is None:
         raise ValueError(f"No ground truth configured for mode '{mode}'")
@@ -60,6 +61,9 @@ def run_stats(
     out_dir: str | None,
 ) -> None:
     """Run cross-run statistical analysis across architectures."""
+    from evaluation.evaluators.cross_run_analyzer import CrossRunAnalyzer
+    from evaluation.util.io import save_summary
+
     save_dir = DEFAULT_OUT_DIR / (out_dir or "")
 
     if arch_pairs:
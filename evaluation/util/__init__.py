@@ -11,8 +11,7 @@ from evaluation.util.constants import (
     GROUND_TRUTH_MAP,
     EVAL_MODES,
 )
-from evaluation.util.io import save_summary, make_fig_dir, parse_pairs
-from evaluation.util.stats import remove_outliers_iqr
+from evaluation.util.lazy import lazy_exports
 
 __all__ = [
     "EXCLUDE_COLUMNS",
@@ -31,3 +30,13 @@ __all__ = [
     "parse_pairs",
     "remove_outliers_iqr",
 ]
+
+# pandas-backed helpers, imported on first access
+_LAZY = {
+    "save_summary": "evaluation.util.io",
+    "make_fig_dir": "evaluation.util.io",
+    "parse_pairs": "evaluation.util.io",
+    "remove_outliers_iqr": "evaluation.util.stats",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY)
@@ -0,0 +1,32 @@
+"""Module-level `__getattr__`/`__dir__` for packages that import their exports on first access."""
+
+import importlib
+import sys
+from typing import Callable, Dict, Tuple
+
+
+def lazy_exports(module_name: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    Build `__getattr__` and `__dir__` for the package `module_name`.
+
+    Args:
+        module_name: `__name__` of the package
+        exports: Exported name -> module that defines it
+
+    Each name is imported from its module on first access and then stored on
+    the package, so later lookups do not go through `__getattr__` again.
+    """
+    package = sys.modules[module_name]
+
+    def __getattr__(name):
+        source = exports.get(name)
+        if source is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(source), name)
+        setattr(package, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(package)) | set(exports))
+
+    return __getattr__, __dir__
@@ -0,0 +1,42 @@
+"""
+Single command line entry point for MARVA:
+
+    python -m marva run s1|s2|s3 [runner options]
+    python -m marva eval [evaluation options]
+    python -m marva plot [plot options]
+    python -m marva bench endpoint_latency|serialization|mock_ollama|startup [options]
+
+Each subcommand runs an existing module entry point (e.g. `python -m s3.runner`)
+with the remaining arguments, so options and behaviour are the same as calling
+the module directly. Nothing of a subsystem is imported before its subcommand
+is chosen: `run s1` does not load langgraph, and `run` never loads pandas,
+sklearn, scipy or matplotlib.
+"""
+
+# command -> module, or command -> {target -> module}
+COMMANDS = {
+    "run": {
+        "s1": "s1.runner",
+        "s2": "s2.runner",
+        "s3": "s3.runner",
+    },
+    "eval": "evaluation.runner",
+    "plot": "evaluation.plotter",
+    "bench": {
+        "endpoint_latency": "bench.endpoint_latency",
+        "serialization": "bench.serialization",
+        "mock_ollama": "bench.mock_ollama",
+        "startup": "bench.startup",
+    },
+}
+
+
+def subcommands() -> list:
+    """Every runnable subcommand as an argument list, e.g. ["run", "s3"]."""
+    result = []
+    for command, target in COMMANDS.items():
+        if isinstance(target, dict):
+            result.extend([command, name] for name in target)
+        else:
+            result.append([command])
+    return result
@@ -0,0 +1,57 @@
+import runpy
+import sys
+
+from marva import COMMANDS
+
+PROG = "python -m marva"
+
+
+def _usage() -> str:
+    lines = [f"usage: {PROG} <command> [target] [options]", "", "commands:"]
+    for command, target in COMMANDS.items():
+        if isinstance(target, dict):
+            lines.append(f"  {command} {{{','.join(target)}}}")
+        else:
+            lines.append(f"  {command}")
+    lines.append("")
+    lines.append(f"'{PROG} <command> [target] --help' shows the options of a command.")
+    return "\n".join(lines)
+
+
+def _fail(message: str) -> None:
+    print(f"{_usage()}\n\n{PROG}: error: {message}", file=sys.stderr)
+    sys.exit(2)
+
+
+def resolve(argv: list) -> tuple:
+    """Map command line arguments to (module, prog, remaining arguments)."""
+    if not argv:
+        _fail("a command is required")
+    if argv[0] in ("-h", "--help"):
+        print(_usage())
+        sys.exit(0)
+
+    command, rest = argv[0], argv[1:]
+    target = COMMANDS.get(command)
+    if target is None:
+        _fail(f"unknown command '{command}' (choose from {', '.join(COMMANDS)})")
+    if isinstance(target, str):
+        return target, f"{PROG} {command}", rest
+
+    if not rest or rest[0].startswith("-"):
+        _fail(f"'{command}' needs one of: {', '.join(target)}")
+    name = rest[0].replace("-", "_")
+    if name not in target:
+        _fail(f"unknown {command} target '{rest[0]}' (choose from {', '.join(target)})")
+    return target[name], f"{PROG} {command} {rest[0]}", rest[1:]
+
+
+def main(argv: list | None = None) -> None:
+    module, prog, args = resolve(sys.argv[1:] if argv is None else argv)
+    # The module's own argparse reads sys.argv; prog shows up in its usage line
+    sys.argv = [prog, *args]
+    runpy.run_module(module, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
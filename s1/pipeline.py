@@ -2,6 +2,7 @@ from common.llm_client import LLMClient
 from common.prompt_loader import load_prompt
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from entity.requirement_set import RequirementSet
 from entity.agent import AgentResult
@@ -10,6 +11,15 @@ from utils.normalization import extract_json_block
 
 
 class S1Pipeline:
+    """
+    One LLM call per requirement (single) or per requirement set (group).
+
+    Each call's agent results are built from its own response and written only
+    to its requirement, so several requirements can be validated at once.
+    run() calls `on_requirement_done(requirement)` after each requirement in
+    single mode is complete, from worker threads when concurrency > 1.
+    """
+
     SINGLE_PROMPT_PATH = "s1/s1_single"
     GROUP_PROMPT_PATH = "s1/s1_group"
     LOGGER = "marva.s1.pipeline"
@@ -22,59 +32,78 @@ class S1Pipeline:
         self.single_prompt = load_prompt(self.SINGLE_PROMPT_PATH)
         self.group_prompt = load_prompt(self.GROUP_PROMPT_PATH)
         self.logger = logging.getLogger(self.LOGGER)
-        self.agents = []
 
-    def normalize_output(self, result:str):
+    def normalize_output(self, result:dict):
+        """Return (status, recommendations, agent results) for one LLM response."""
         self.logger.debug("Normalizing LLM output")
         if result["execution_status"] != "SUCCESS":
             self.logger.warning("LLM call failed: %s - %s", result['execution_status'], result.get('error'))
-            return "FLAG", []
-        json_result = extract_json_block(result["text"])
-        self.save_agent_result(json_result["agents"])
-        return json_result["status"], json_result["recommendations"]
+            return "FLAG", [], []
+        json_result = extract_json_block(result["text"], label="s1")
+        try:
+            agents = self.build_agent_results(json_result["agents"])
+            return json_result["status"], json_result.get("recommendations", []), agents
+        except (KeyError, TypeError) as e:
+            # Parse-failure fallback ({decision, issues}) or a response missing fields:
+            # flag this requirement instead of failing the run
+            self.logger.warning("Unexpected S1 response shape (%s: %s), returning FLAG", type(e).__name__, e)
+            return "FLAG", [], []
 
-    def run(self, requirement_set:RequirementSet, mode:str):
+    def run(self, requirement_set:RequirementSet, mode:str, concurrency:int = 1, on_requirement_done=None):
         if mode == "single":
             total = len(requirement_set.requirements)
-            for idx, requirement in enumerate(requirement_set.requirements, 1):
-                req_start = time.perf_counter()
-                self.logger.info("[%d/%d] Validating requirement '%s'", idx, total, requirement.id)
-                # prep prompt
-                prompt = self.single_prompt.replace("{{REQUIREMENT}}", requirement.text)
-                normalized_result = self.prompt_run(prompt)
-                # Save result.
-                requirement.final_decision,requirement.recommendation = normalized_result
-                age = AgentSet(self.agents)
-                requirement.single_validations = age.agents_list()
-                req_elapsed = time.perf_counter() - req_start
-                requirement.duration_seconds = round(req_elapsed, 3)
-                self.logger.info("[%d/%d] Requirement '%s' => %s (%.2fs)", idx, total, requirement.id, requirement.final_decision, req_elapsed)
+            if concurrency > 1:
+                self.logger.info("Validating %d requirements with concurrency=%d", total, concurrency)
+                with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="s1-req") as executor:
+                    futures = [
+                        executor.submit(self.validate_requirement, requirement, idx, total, on_requirement_done)
+                        for idx, requirement in enumerate(requirement_set.requirements, 1)
+                    ]
+                    for future in futures:
+                        future.result()
+            else:
+                for idx, requirement in enumerate(requirement_set.requirements, 1):
+                    self.validate_requirement(requirement, idx, total, on_requirement_done)
         elif mode == "group":
             self.logger.info("Running group validation for %d requirements", len(requirement_set.requirements))
             group_start = time.perf_counter()
             # prep prompt
             prompt = self.group_prompt.replace("{{REQUIREMENT}}", requirement_set.join_requirements())
-            normalized_result = self.prompt_run(prompt)
+            status, recommendations, agents = self.prompt_run(prompt, mode)
             # Save result
-            requirement_set.final_decision, requirement_set.recommendations = normalized_result
-            age = AgentSet(self.agents)
-            requirement_set.group_validations = age.agents_list()
+            requirement_set.final_decision, requirement_set.recommendations = status, recommendations
+            requirement_set.group_validations = AgentSet(agents).agents_list()
             group_elapsed = time.perf_counter() - group_start
             self.logger.info("Group validation => %s (%.2fs)", requirement_set.final_decision, group_elapsed)
 
+    def validate_requirement(self, requirement, idx:int, total:int, on_done=None):
+        req_start = time.perf_counter()
+        self.logger.info("[%d/%d] Validating requirement '%s'", idx, total, requirement.id)
+        # prep prompt
+        prompt = self.single_prompt.replace("{{REQUIREMENT}}", requirement.text)
+        status, recommendations, agents = self.prompt_run(prompt, "single")
+        # Save result.
+        requirement.final_decision, requirement.recommendation = status, recommendations
+        requirement.single_validations = AgentSet(agents).agents_list()
+        req_elapsed = time.perf_counter() - req_start
+        requirement.duration_seconds = round(req_elapsed, 3)
+        self.logger.info("[%d/%d] Requirement '%s' => %s (%.2fs)", idx, total, requirement.id, requirement.final_decision, req_elapsed)
+        if on_done is not None:
+            on_done(requirement)
 
-    def prompt_run(self, prompt):
-        t0 = time.perf_counter()
-        result = self.llm.generate(prompt)
+    def prompt_run(self, prompt, mode):
+        result = self.llm.generate(prompt, timeout_key=f"s1:{mode}")
         self.logger.debug("LLM call took %dms (status=%s)", result.get("latency_ms", 0), result.get("execution_status"))
         return self.normalize_output(result)
 
-    def save_agent_result(self, agents_json):
-        self.agents.clear()
-        for agent in agents_json:
-            self.agents.append( AgentResult(
+    def build_agent_results(self, agents_json):
+        agents = [
+            AgentResult(
                 agent= agent["dimension"],
                 status= agent["status"],
                 issues= agent["issues"]
-            ))
-        self.logger.debug("Saved %d agent results: %s", len(self.agents), [a.agent for a in self.agents])
+            )
+            for agent in agents_json
+        ]
+        self.logger.debug("Built %d agent results: %s", len(agents), [a.agent for a in agents])
+        return agents
@@ -4,16 +4,21 @@ import time
 import logging
 from pathlib import Path
 from utils.dataset_loader import load_dataset
-from utils.save_runner_decision import save_runner_decision
+from utils.save_runner_decision import new_run_dir, save_runner_decision, write_decision_json
+from utils.checkpoint import finish_checkpoint, open_checkpoint
+from utils.result_stream import ResultStream
 from utils.save_runner_csv import save_runner_csv
 
-from common.llm_client import LLMClient
+from common.client_factory import build_llm_client, configure_clients, log_client_stats
+from common.warmup import preload_models
+from utils.normalization import log_parse_stats
 from common.config import load_config
 from s1.pipeline import S1Pipeline
 from common.logging.setup import setup_logging
 from s1.logger import init_s1_logger
 
 from entity.decision import Decision
+from entity.requirement_set import RequirementSet
 
 DECISION_OUTPUT_PATH = Path("out/s1_decisions/")
 LOGGER = "marva.s1.runner"
@@ -21,25 +26,40 @@ FRAMEWORK = "S1 Validation Agent v1.0"
 
 
 
-def main(mode: str, scope: str, limit: int | None):
+def main(mode: str, scope: str, limit: int | None, use_cache: bool = True, warm_up: bool = True, concurrency: int = 1,
+         resume: str | None = None,
+         write_json: bool = True):
     setup_logging(run_id="s1_run_"+datetime.now().strftime('%Y%m%d'))
     init_s1_logger()
     logger = logging.getLogger(LOGGER)
-    logger.info("Starting S1 runner (mode=%s, scope=%s, limit=%s)", mode, scope, limit)
+    logger.info(
+        "Starting S1 runner (mode=%s, scope=%s, limit=%s, cache=%s, warmup=%s, concurrency=%d, resume=%s)",
+        mode, scope, limit, use_cache, warm_up, concurrency, resume,
+    )
 
     t0 = time.perf_counter()
     requirement_set = load_dataset(scope, limit)
     logger.info("Loaded %d requirements from '%s' in %.2fs", len(requirement_set.requirements), scope, time.perf_counter() - t0)
 
+    # Checkpoint journal (single mode): completed requirements survive a crash
+    output_dir, journal, stream = None, None, None
+    pending_set = requirement_set
+    if mode == "single":
+        output_dir = Path(resume) if resume else new_run_dir(DECISION_OUTPUT_PATH)
+        # Restored and newly completed requirements go to results.csv / results.jsonl as they come
+        stream = ResultStream(output_dir)
+        journal, pending = open_checkpoint(
+            output_dir, {"framework": FRAMEWORK, "mode": mode, "scope": scope}, requirement_set,
+            resume=resume is not None, log=logger, on_record=stream.emit,
+        )
+        pending_set = RequirementSet(pending)
+
     t0 = time.perf_counter()
     cfg = load_config()
-    llm = LLMClient(
-        host=cfg["model"]["host"],
-        model=cfg["model"]["model_name"],
-        temperature=cfg["model"]["temperature"],
-        timeout=cfg["global"]["timeout_seconds"],
-        max_retries=cfg["global"]["max_retries"],
-    )
+    configure_clients(cfg)
+    if warm_up and cfg["model"].get("preload", False):
+        preload_models(cfg)
+    llm = build_llm_client(cfg, use_cache=use_cache)
     logger.debug("LLM client initialized in %.2fs", time.perf_counter() - t0)
 
     pipeline = S1Pipeline(llm)
@@ -50,27 +70,28 @@ def main(mode: str, scope: str, limit: int | None):
 
     start_time = time.perf_counter()
     logger.info("Starting S1 pipeline execution")
-    pipeline.run(requirement_set, mode)
+    pipeline.run(pending_set, mode, concurrency=concurrency, on_requirement_done=journal.record if journal else None)
     pipeline_elapsed = time.perf_counter() - start_time
-    logger.info("S1 pipeline finished in %.2fs", pipeline_elapsed)
-
-    dec = (
-            [req.to_dict() for req in requirement_set.requirements]
-            if mode == "single"
-            else requirement_set.to_dict()
-        )
-
-    decision.duration = int((time.perf_counter() - start_time))
-    decision.decision = dec
+    if mode == "single":
+        throughput = len(pending_set.requirements) / pipeline_elapsed * 60 if pipeline_elapsed > 0 else 0.0
+        logger.info("S1 pipeline finished in %.2fs (%.1f requirements/min)", pipeline_elapsed, throughput)
+    else:
+        logger.info("S1 pipeline finished in %.2fs", pipeline_elapsed)
 
-    output_dir = save_runner_decision(decision.to_dict(), DECISION_OUTPUT_PATH)
-    csv_path = save_runner_csv(requirement_set, mode, decision.duration, output_dir)
-    summary_path = output_dir / "summary.json"
     if mode == "single":
-        detailed_path = output_dir / "detailed.json"
-        logger.info("S1 runner completed in %ds | output: %s, %s, %s", decision.duration, summary_path, detailed_path, csv_path)
+        decision.duration = int(finish_checkpoint(journal, time.perf_counter() - start_time, log=logger))
+        stream.close()
+        outputs = [stream.csv_path, stream.jsonl_path]
+        if write_json:
+            outputs += write_decision_json(output_dir, FRAMEWORK, mode, decision.duration)
     else:
-        logger.info("S1 runner completed in %ds | output: %s, %s", decision.duration, summary_path, csv_path)
+        decision.duration = int(time.perf_counter() - start_time)
+        decision.set_decision(requirement_set)
+        output_dir = save_runner_decision(decision.to_dict(), DECISION_OUTPUT_PATH)
+        outputs = [output_dir / "summary.json", save_runner_csv(requirement_set, mode, decision.duration, output_dir)]
+    logger.info("S1 runner completed in %ds | output: %s", decision.duration, ", ".join(str(p) for p in outputs))
+    log_client_stats(logger)
+    log_parse_stats(logger)
 
 
 if __name__ == "__main__":
@@ -92,7 +113,39 @@ if __name__ == "__main__":
         choices=["single", "group"],
         help="S1 execution scope",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the persistent LLM response cache",
+    )
+    parser.add_argument(
+        "--no-warmup",
+        action="store_true",
+        help="Skip preloading the model before the run",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Requirements validated at once in single mode",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_DIR",
+        default=None,
+        help="Single mode: continue an interrupted run, skipping requirements in its checkpoint journal",
+    )
+    parser.add_argument(
+        "--no-json",
+        action="store_true",
+        help="Single mode: skip summary.json/detailed.json (derive later with python -m utils.save_runner_decision RUN_DIR)",
+    )
 
     args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.resume and args.mode != "single":
+        parser.error("--resume only applies to --mode single")
 
-    main(args.mode, args.scope, args.limit)
+    main(args.mode, args.scope, args.limit, use_cache=not args.no_cache, warm_up=not args.no_warmup,
+         concurrency=args.concurrency, resume=args.resume, write_json=not args.no_json)
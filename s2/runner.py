@@ -4,27 +4,38 @@ import logging
 from pathlib import Path
 import time
 
-from common.llm_client import LLMClient
+from common.client_factory import build_llm_client, configure_clients, log_client_stats
+from common.warmup import preload_models
+from utils.normalization import log_parse_stats
 from common.config import load_config
 from s2.validation_agents import ValidatorAgent
 from utils.dataset_loader import load_dataset
 from common.logging.setup import setup_logging
 from s2.logger import init_s2_logger
-from utils.save_runner_decision import save_runner_decision
+from utils.checkpoint import finish_checkpoint, open_checkpoint
+from utils.result_stream import ResultStream
+from utils.save_runner_decision import new_run_dir, save_runner_decision, write_decision_json
 from utils.save_runner_csv import save_runner_csv
 from entity.decision import Decision
+from entity.requirement_set import RequirementSet
 
 
 DECISION_OUTPUT_PATH = Path("out/s2_decisions/")
+FRAMEWORK = "S2 Validation Agent v1.0"
 
 
 
-def main(mode: str, scope: str, limit: int | None):
+def main(mode: str, scope: str, limit: int | None, use_cache: bool = True, warm_up: bool = True, batch_size: int = 1,
+         parallel: bool = False, concurrency: int = 1, resume: str | None = None,
+         write_json: bool = True):
 
     setup_logging(run_id="s2_run_"+datetime.now().strftime('%Y%m%d'))
     init_s2_logger()
     logger = logging.getLogger("marva.s2.runner")
-    logger.info("Starting S2 runner (mode=%s, scope=%s, limit=%s)", mode, scope, limit)
+    logger.info(
+        "Starting S2 runner (mode=%s, scope=%s, limit=%s, cache=%s, warmup=%s, batch_size=%d, parallel=%s, concurrency=%d, resume=%s)",
+        mode, scope, limit, use_cache, warm_up, batch_size, parallel, concurrency, resume,
+    )
 
     # -----------------------------
     # Load dataset
@@ -33,24 +44,36 @@ def main(mode: str, scope: str, limit: int | None):
     requirement_set = load_dataset(scope, limit)
     logger.info("Loaded %d requirements from '%s' in %.2fs", len(requirement_set.requirements), scope, time.perf_counter() - t0)
 
+    # -----------------------------
+    # Checkpoint journal (single mode): completed requirements survive a crash
+    # -----------------------------
+    output_dir, journal, stream = None, None, None
+    pending_set = requirement_set
+    if mode == "single":
+        output_dir = Path(resume) if resume else new_run_dir(DECISION_OUTPUT_PATH)
+        # Restored and newly completed requirements go to results.csv / results.jsonl as they come
+        stream = ResultStream(output_dir)
+        journal, pending = open_checkpoint(
+            output_dir, {"framework": FRAMEWORK, "mode": mode, "scope": scope}, requirement_set,
+            resume=resume is not None, log=logger, on_record=stream.emit,
+        )
+        pending_set = RequirementSet(pending)
+
     # -----------------------------
     # Init LLM + agent
     # -----------------------------
     t0 = time.perf_counter()
     cfg = load_config()
-    llm = LLMClient(
-        host=cfg["model"]["host"],
-        model=cfg["model"]["model_name"],
-        temperature=cfg["model"]["temperature"],
-        timeout=cfg["global"]["timeout_seconds"],
-        max_retries=cfg["global"]["max_retries"],
-    )
+    configure_clients(cfg)
+    if warm_up and cfg["model"].get("preload", False):
+        preload_models(cfg)
+    llm = build_llm_client(cfg, use_cache=use_cache)
     logger.debug("LLM client initialized in %.2fs", time.perf_counter() - t0)
 
-    agents = ValidatorAgent(llm)
+    agents = ValidatorAgent(llm, batch_size=batch_size, parallel=parallel, concurrency=concurrency)
 
     decision = Decision(
-        framework= "S2 Validation Agent v1.0",
+        framework=FRAMEWORK,
         mode=mode
     )
 
@@ -61,22 +84,25 @@ def main(mode: str, scope: str, limit: int | None):
     start_time = time.perf_counter()
 
     logger.info("Starting S2 pipeline execution")
-    agents.run(mode=mode, requirement_set=requirement_set)
+    agents.run(mode=mode, requirement_set=pending_set, on_requirement_done=journal.record if journal else None)
 
     pipeline_elapsed = time.perf_counter() - start_time
-    decision.duration = int(pipeline_elapsed)
     logger.info("S2 pipeline finished in %.2fs", pipeline_elapsed)
 
-    decision.set_decision(requirement_set)
-
-    output_dir = save_runner_decision(decision.to_dict(), DECISION_OUTPUT_PATH)
-    csv_path = save_runner_csv(requirement_set, mode, decision.duration, output_dir)
-    summary_path = output_dir / "summary.json"
     if mode == "single":
-        detailed_path = output_dir / "detailed.json"
-        logger.info("S2 runner completed in %ds | output: %s, %s, %s", decision.duration, summary_path, detailed_path, csv_path)
+        decision.duration = int(finish_checkpoint(journal, time.perf_counter() - start_time, log=logger))
+        stream.close()
+        outputs = [stream.csv_path, stream.jsonl_path]
+        if write_json:
+            outputs += write_decision_json(output_dir, FRAMEWORK, mode, decision.duration)
     else:
-        logger.info("S2 runner completed in %ds | output: %s, %s", decision.duration, summary_path, csv_path)
+        decision.duration = int(pipeline_elapsed)
+        decision.set_decision(requirement_set)
+        output_dir = save_runner_decision(decision.to_dict(), DECISION_OUTPUT_PATH)
+        outputs = [output_dir / "summary.json", save_runner_csv(requirement_set, mode, decision.duration, output_dir)]
+    logger.info("S2 runner completed in %ds | output: %s", decision.duration, ", ".join(str(p) for p in outputs))
+    log_client_stats(logger)
+    log_parse_stats(logger)
 
 
 
@@ -85,6 +111,25 @@ if __name__ == "__main__":
     parser.add_argument("--scope", required=True)
     parser.add_argument("--mode", required=True, choices=["single", "group"])
     parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the persistent LLM response cache")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip preloading the model before the run")
+    parser.add_argument("--batch-size", type=int, default=1, help="Single mode: requirements validated per prompt")
+    parser.add_argument("--parallel-validators", action="store_true",
+                        help="Run the independent validator calls of a requirement (or group) concurrently")
+    parser.add_argument("--concurrency", type=int, default=1, help="Single mode: requirements validated at once")
+    parser.add_argument("--resume", metavar="RUN_DIR", default=None,
+                        help="Single mode: continue an interrupted run, skipping requirements in its checkpoint journal")
+    parser.add_argument("--no-json", action="store_true",
+                        help="Single mode: skip summary.json/detailed.json (derive later with python -m utils.save_runner_decision RUN_DIR)")
 
     args = parser.parse_args()
-    main(args.mode, args.scope, args.limit)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.batch_size > 1 and (args.parallel_validators or args.concurrency > 1):
+        parser.error("--batch-size cannot be combined with --parallel-validators or --concurrency")
+    if args.resume and args.mode != "single":
+        parser.error("--resume only applies to --mode single")
+    main(args.mode, args.scope, args.limit, use_cache=not args.no_cache, warm_up=not args.no_warmup, batch_size=args.batch_size,
+         parallel=args.parallel_validators, concurrency=args.concurrency, resume=args.resume, write_json=not args.no_json)
@@ -1,18 +1,49 @@
 import logging
 import time
-from utils.normalization import extract_json_block
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from utils.normalization import extract_json_array, extract_json_block
 from common.prompt_loader import load_prompt
 from entity.requirement_set import RequirementSet
 from entity.agent import AgentResult
 
 
 class ValidatorAgent:
-    """Handles validation operations for requirements at single and group scope."""
+    """
+    Handles validation operations for requirements at single and group scope.
 
-    def __init__(self, llm):
+    With batch_size > 1, single mode sends each prompt (validators and summary)
+    for up to batch_size requirements at once, tagged R1..RN, and expects a JSON
+    array keyed by those IDs. Items missing from the answer are validated with
+    a per-requirement fallback call.
+
+    With parallel=True the independent validator calls of a requirement (or of
+    the group) run at the same time; the summary still waits for all of them.
+    concurrency > 1 validates that many requirements at once in single mode.
+    Results are stored in prompt and dataset order either way, so the output
+    is the same as a sequential run.
+
+    run() calls `on_requirement_done(requirement)` after each requirement in
+    single mode is complete (e.g. to checkpoint it), from worker threads when
+    concurrency > 1.
+    """
+
+    def __init__(self, llm, batch_size: int = 1, parallel: bool = False, concurrency: int = 1):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        if batch_size > 1 and (parallel or concurrency > 1):
+            raise ValueError("batch_size > 1 cannot be combined with parallel validators or concurrency")
         self.llm = llm
+        self.batch_size = batch_size
+        self.parallel = parallel
+        self.concurrency = concurrency
         self.build_prompt()
         self.logger = logging.getLogger("marva.s2.pipeline")
+        self.batch_calls = 0
+        self.batch_items = 0
+        self.batch_fallbacks = 0
 
 
     def build_prompt(self):
@@ -27,71 +58,221 @@ class ValidatorAgent:
             "redundancy": load_prompt("s2/redundancy"),
         }
         self.summary_prompt = load_prompt("s2/s2_vdp")
+        self.batch_prompt = load_prompt("s2/batch_output")
+
 
+    def run(self, mode:str, requirement_set:RequirementSet, on_requirement_done=None):
+        if mode == "single" and self.batch_size > 1:
+            self.run_single_batched(requirement_set, on_requirement_done)
 
-    def run(self, mode:str, requirement_set:RequirementSet):
-        if mode == "single":
+        elif mode == "single":
             total = len(requirement_set.requirements)
-            for idx, requirement in enumerate(requirement_set.requirements, 1):
-                req_start = time.perf_counter()
-                self.logger.info("[%d/%d] Validating requirement '%s'", idx, total, requirement.id)
-                for validation in self.single_prompts.keys():
-                    val_start = time.perf_counter()
-                    prompt = self.single_prompts[validation].replace("{{REQUIREMENT}}", requirement.text)
-                    json_result = self.llm_run(prompt)
-                    self.save_agent_result(validation, json_result, requirement.single_validations)
-                    self.logger.debug("  Agent '%s' => %s (%.2fs)", validation, json_result.get("decision", "?"), time.perf_counter() - val_start)
-                self.logger.debug("All validations done for requirement '%s'", requirement.id)
-                summary_start = time.perf_counter()
-                summary = self.gen_summary(requirement, requirement.single_validations)
-                self.logger.debug("Summary generation took %.2fs", time.perf_counter() - summary_start)
-                requirement.final_decision = summary["final_status"]
-                requirement.recommendation = summary["recommendations"]
-                req_elapsed = time.perf_counter() - req_start
-                requirement.duration_seconds = round(req_elapsed, 3)
-                self.logger.info("[%d/%d] Requirement '%s' => %s (%.2fs)", idx, total, requirement.id, requirement.final_decision, req_elapsed)
+            with self._validator_pool(self.concurrency) as pool:
+                if self.concurrency > 1:
+                    self.logger.info("Validating %d requirements with concurrency=%d", total, self.concurrency)
+                    with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="s2-req") as requirement_pool:
+                        futures = [
+                            requirement_pool.submit(self.validate_requirement, requirement, idx, total, pool, on_requirement_done)
+                            for idx, requirement in enumerate(requirement_set.requirements, 1)
+                        ]
+                        for future in futures:
+                            future.result()
+                else:
+                    for idx, requirement in enumerate(requirement_set.requirements, 1):
+                        self.validate_requirement(requirement, idx, total, pool, on_requirement_done)
 
         elif mode == "group":
             self.logger.info("Running group validation for %d requirements", len(requirement_set.requirements))
             group_start = time.perf_counter()
-            for validation in self.group_prompts.keys():
-                val_start = time.perf_counter()
-                prompt = self.group_prompts[validation].replace("{{REQUIREMENT}}", requirement_set.join_requirements())
-                json_result = self.llm_run(prompt)
-                self.save_agent_result(validation, json_result, requirement_set.group_validations)
-                self.logger.debug("Agent '%s' => %s (%.2fs)", validation, json_result.get("decision", "?"), time.perf_counter() - val_start)
+            with self._validator_pool(1) as pool:
+                results = self.run_validations(self.group_prompts, requirement_set.join_requirements(), mode, pool)
+            for validation, json_result, usage in results:
+                self.save_agent_result(validation, json_result, requirement_set.group_validations, usage)
             summary_start = time.perf_counter()
-            summary = self.gen_summary(requirement_set.join_requirements(), requirement_set.group_validations)
+            summary = self.gen_summary(requirement_set.join_requirements(), requirement_set.group_validations, mode)
             self.logger.debug("Summary generation took %.2fs", time.perf_counter() - summary_start)
-            requirement_set.final_decision = summary["final_status"]
-            requirement_set.recommendations = summary["recommendations"]
+            requirement_set.final_decision = summary.get("final_status", "FLAG")
+            requirement_set.recommendations = summary.get("recommendations", [])
             group_elapsed = time.perf_counter() - group_start
             self.logger.info("Group validation => %s (%.2fs)", requirement_set.final_decision, group_elapsed)
 
         else:
             raise ValueError("Invalid mode or missing requirement/group data.")
 
-    def gen_summary(self,requirements:str, validations:dict):
+    def _validator_pool(self, requirements_in_flight: int):
+        """Executor context for the validator calls of `requirements_in_flight` requirements (yields None when sequential)."""
+        if not self.parallel:
+            return nullcontext()
+        workers = len(self.single_prompts) * requirements_in_flight
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s2-validator")
+
+    def validate_requirement(self, requirement, idx:int, total:int, pool=None, on_done=None):
+        req_start = time.perf_counter()
+        self.logger.info("[%d/%d] Validating requirement '%s'", idx, total, requirement.id)
+        for validation, json_result, usage in self.run_validations(self.single_prompts, requirement.text, "single", pool):
+            self.save_agent_result(validation, json_result, requirement.single_validations, usage)
+        self.logger.debug("All validations done for requirement '%s'", requirement.id)
+        summary_start = time.perf_counter()
+        summary = self.gen_summary(requirement.text, requirement.single_validations, "single")
+        self.logger.debug("Summary generation took %.2fs", time.perf_counter() - summary_start)
+        # A failed summary call yields the validator fallback, without these fields
+        requirement.final_decision = summary.get("final_status", "FLAG")
+        requirement.recommendation = summary.get("recommendations", [])
+        req_elapsed = time.perf_counter() - req_start
+        requirement.duration_seconds = round(req_elapsed, 3)
+        self.logger.info("[%d/%d] Requirement '%s' => %s (%.2fs)", idx, total, requirement.id, requirement.final_decision, req_elapsed)
+        if on_done is not None:
+            on_done(requirement)
+
+    def run_validations(self, prompts:dict, text:str, mode:str, pool=None):
+        """
+        Run every validation prompt on `text`.
+
+        Args:
+            prompts: Validation name -> prompt template
+            text: Value for {{REQUIREMENT}}
+            mode: "single" or "group" (timeout key)
+            pool: Executor to run the calls on concurrently; None runs them in turn
+
+        Returns:
+            (validation, parsed JSON, usage) tuples in the order of `prompts`
+        """
+        def timed_run(validation):
+            val_start = time.perf_counter()
+            prompt = prompts[validation].replace("{{REQUIREMENT}}", text)
+            json_result, usage = self.llm_run(prompt, validation, mode)
+            self.logger.debug("  Agent '%s' => %s (%.2fs)", validation, json_result.get("decision", "?"), time.perf_counter() - val_start)
+            return validation, json_result, usage
+
+        if pool is None:
+            return [timed_run(validation) for validation in prompts]
+        futures = [pool.submit(timed_run, validation) for validation in prompts]
+        return [future.result() for future in futures]
+
+    def run_single_batched(self, requirement_set:RequirementSet, on_requirement_done=None):
+        requirements = requirement_set.requirements
+        total = len(requirements)
+        for start in range(0, total, self.batch_size):
+            batch = requirements[start:start + self.batch_size]
+            batch_start = time.perf_counter()
+            self.logger.info("[%d-%d/%d] Validating batch of %d requirements", start + 1, start + len(batch), total, len(batch))
+            texts = [requirement.text for requirement in batch]
+            for validation, template in self.single_prompts.items():
+                val_start = time.perf_counter()
+                results = self.batch_run(template, validation, {"{{REQUIREMENT}}": texts}, ("decision", "issues"))
+                for requirement, (json_result, usage) in zip(batch, results):
+                    self.save_agent_result(validation, json_result, requirement.single_validations, usage)
+                self.logger.debug("  Agent '%s' on %d requirements (%.2fs)", validation, len(batch), time.perf_counter() - val_start)
+
+            summary_start = time.perf_counter()
+            summaries = self.batch_run(
+                self.summary_prompt, "summary",
+                {
+                    "{{REQUIREMENT}}": texts,
+                    "{{VALIDATION_RESULTS}}": [str(self.prompt_validations(r.single_validations)) for r in batch],
+                },
+                ("final_status", "recommendations"),
+            )
+            self.logger.debug("Summary generation took %.2fs", time.perf_counter() - summary_start)
+
+            # Requirements of a batch share its calls; each is credited an equal share of the time
+            batch_elapsed = time.perf_counter() - batch_start
+            for requirement, (summary, _) in zip(batch, summaries):
+                requirement.final_decision = summary.get("final_status", "FLAG")
+                requirement.recommendation = summary.get("recommendations", [])
+                requirement.duration_seconds = round(batch_elapsed / len(batch), 3)
+                self.logger.info("Requirement '%s' => %s", requirement.id, requirement.final_decision)
+                if on_requirement_done is not None:
+                    on_requirement_done(requirement)
+            self.logger.info("[%d-%d/%d] Batch done (%.2fs)", start + 1, start + len(batch), total, batch_elapsed)
+
+        self.logger.info(
+            "Batched validation: %d calls for %d items (batch size %d), %d per-item fallbacks",
+            self.batch_calls, self.batch_items, self.batch_size, self.batch_fallbacks,
+        )
+
+    def batch_run(self, template:str, name:str, values:dict, fields:tuple):
+        """
+        Run one prompt for several requirements and fan the answer back out.
+
+        Args:
+            template: Single-requirement prompt
+            name: Validation name (logs, parse stats, timeout key)
+            values: Placeholder -> one value per requirement; each placeholder is
+                    filled with the values tagged [R1]..[RN]
+            fields: Output fields an answer item must have to be accepted
+
+        Returns:
+            One (parsed JSON, usage) tuple per requirement, in order
+        """
+        count = len(next(iter(values.values())))
+        tags = [f"R{i}" for i in range(1, count + 1)]
+        prompt = template
+        for placeholder, items in values.items():
+            prompt = prompt.replace(placeholder, "\n" + "\n".join(f"[{tag}] {item}" for tag, item in zip(tags, items)))
+        prompt += "\n\n" + (
+            self.batch_prompt.replace("{{COUNT}}", str(count)).replace("{{IDS}}", ", ".join(tags)).replace("{{FIELDS}}", " and ".join(f'"{f}"' for f in fields))
+        )
+
+        t0 = time.perf_counter()
+        response = self.llm.generate(prompt, timeout_key=f"{name}:batch{count}")
+        elapsed = time.perf_counter() - t0
+        self.batch_calls += 1
+        self.batch_items += count
+        answers = {}
+        if response["execution_status"] == "SUCCESS":
+            for item in extract_json_array(response["text"], label=f"{name}:batch"):
+                if isinstance(item, dict) and all(f in item for f in fields):
+                    answers[str(item.get("id", "")).strip("[] ")] = item
+            self.logger.debug("Batch '%s' answered %d/%d items (%.2fs)", name, len(answers), count, elapsed)
+        else:
+            self.logger.warning("Batch '%s' call failed after %.2fs: %s - %s", name, elapsed, response["execution_status"], response.get("error"))
+
+        # Counters of the shared call, marked with the number of requirements it covered
+        usage = {**response["usage"], "batch_size": count} if response.get("usage") else None
+        results = []
+        for i, tag in enumerate(tags):
+            item = answers.get(tag)
+            if item is not None:
+                results.append(({k: v for k, v in item.items() if k != "id"}, usage))
+                continue
+            self.batch_fallbacks += 1
+            self.logger.warning("Batch '%s' has no answer for %s, validating it on its own", name, tag)
+            single_prompt = template
+            for placeholder, items in values.items():
+                single_prompt = single_prompt.replace(placeholder, items[i])
+            results.append(self.llm_run(single_prompt, name, "single"))
+        return results
+
+    def gen_summary(self,requirements:str, validations:dict, mode:str):
         prompt = self.summary_prompt.replace(
             "{{REQUIREMENT}}", str(requirements)
-        ).replace("{{VALIDATION_RESULTS}}", str(validations))
-        json_block = self.llm_run(prompt)
+        ).replace("{{VALIDATION_RESULTS}}", str(self.prompt_validations(validations)))
+        json_block, _ = self.llm_run(prompt, "summary", mode)
         return json_block
 
-    def llm_run(self,prompt:str):
+    @staticmethod
+    def prompt_validations(validations):
+        """Validation results as shown to the summary prompt (without usage counters)."""
+        return [{k: v for k, v in validation.items() if k != "usage"} for validation in validations]
+
+    def llm_run(self,prompt:str, name:str = None, mode:str = None):
+        """Run one prompt and return (parsed JSON, Ollama usage counters or None)."""
         t0 = time.perf_counter()
-        response = self.llm.generate(prompt)
+        response = self.llm.generate(prompt, timeout_key=f"{name}:{mode}" if name else None)
         elapsed = time.perf_counter() - t0
         if response["execution_status"] != "SUCCESS":
             self.logger.warning("LLM call failed after %.2fs: %s - %s", elapsed, response['execution_status'], response.get('error'))
-            return {"decision": "FLAG", "issues": []}
+            return {"decision": "FLAG", "issues": []}, None
         self.logger.debug("LLM call succeeded (%.2fs, %dms reported)", elapsed, response.get("latency_ms", 0))
-        return extract_json_block(response["text"])
+        return extract_json_block(response["text"], label=name), response.get("usage")
 
-    def save_agent_result(self, validation, json_result, validation_list):
+    def save_agent_result(self, validation, json_result, validation_list, usage=None):
         agent_result = AgentResult(
                         agent= validation,
                         status=json_result["decision"],
-                        issues= json_result["issues"]
+                        issues= json_result["issues"],
+                        usage= usage
                     )
         validation_list.append(agent_result.to_dict())
+
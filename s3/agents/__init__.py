@@ -2,7 +2,8 @@
 
 import logging
 import time
-from common.cached_ollama_client import CachedOllamaClient
+from concurrent.futures import ThreadPoolExecutor
+from common.client_factory import build_cached_ollama_client, configure_clients
 from common.config import load_config
 from common.prompt_loader import load_prompt
 from s3.agents.atomicity_agent import AtomicityAgent
@@ -11,6 +12,7 @@ from s3.agents.completion_agent import CompletionAgent
 from s3.agents.consistency_agent import ConsistencyAgent
 from s3.agents.decision_agent import DecisionAgent
 from s3.agents.redundancy_agent import RedundancyAgent
+from s3.agents.schemas import OUTPUT_SCHEMAS
 
 logger = logging.getLogger("marva.s3.agents")
 
@@ -56,12 +58,13 @@ def _build_mode_agents(mode, llm_clients, task_prompt):
     return agents
 
 
-def build_agents(mode: str):
+def build_agents(mode: str, use_cache: bool = True):
     overall_start = time.perf_counter()
     logger.info("Building S3 agents for mode='%s'", mode)
 
     cfg = load_config()
     agents_config = cfg.get("agents", {})
+    configure_clients(cfg)
 
     # -------------------------------------------------
     # Only init LLM clients needed for this mode
@@ -78,22 +81,43 @@ def build_agents(mode: str):
     if disabled:
         logger.info("Disabled agents (skipping LLM init): %s", disabled)
 
-    llm_clients = {}
+    # -------------------------------------------------
+    # Init LLM clients concurrently (each blocks on its system prompt
+    # prefill) or lazily on first use
+    # -------------------------------------------------
+    init_cfg = cfg["global"].get("client_init") or {}
+    lazy = init_cfg.get("lazy", False)
+    workers = max(1, min(init_cfg.get("workers", len(client_names)), len(client_names)))
+    structured = cfg["model"].get("structured_output", False)
 
-    for name in client_names:
+    def init_client(name):
         t0 = time.perf_counter()
         logger.info("Initializing cached LLM client for '%s'", name)
-        llm_clients[name] = CachedOllamaClient(
-            model=cfg["model"]["model_name"],
-            base_url=cfg["model"]["host"],
+        client = build_cached_ollama_client(
+            cfg,
             system_prompt=load_prompt(name, category="s3/system_prompts"),
-            temperature=cfg["model"]["temperature"],
-            num_predict=cfg["model"].get("max_tokens", 1024),
-            timeout=cfg["global"]["timeout_seconds"],
-            max_retries=cfg["global"]["max_retries"],
-            disable_think=cfg["model"].get("disable_think", True),
+            name=name,
+            use_cache=use_cache,
+            lazy_context=lazy,
+            timeout_key=f"{name}:{mode}",
+            output_schema=OUTPUT_SCHEMAS[name] if structured else None,
         )
-        logger.info("Cached LLM client '%s' ready in %.2fs", name, time.perf_counter() - t0)
+        elapsed = time.perf_counter() - t0
+        logger.info("Cached LLM client '%s' ready in %.2fs", name, elapsed)
+        return name, client, elapsed
+
+    init_start = time.perf_counter()
+    llm_clients = {}
+    client_times = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for name, client, elapsed in executor.map(init_client, client_names):
+            llm_clients[name] = client
+            client_times[name] = elapsed
+    init_elapsed = time.perf_counter() - init_start
+    logger.info(
+        "Initialized %d LLM clients in %.2fs (sum of per-client %.2fs, workers=%d, lazy=%s, structured=%s)",
+        len(llm_clients), init_elapsed, sum(client_times.values()), workers, lazy, structured,
+    )
 
     # -------------------------------------------------
     # Build mode-specific agents
@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
 from typing import Any
 import logging
+import time
 
 from common.llm_client_protocol import LLMClientProtocol
+from entity.agent import AgentResult
+from utils.normalization import extract_json_block
 
 
 class BaseValidationAgent(ABC):
@@ -12,6 +15,71 @@ class BaseValidationAgent(ABC):
         self.role = self.__class__.__name__
         self.logger = logging.getLogger(f"marva.s3.agent.{self.role}")
 
+    def parse_json(self, text: str, label: str) -> dict:
+        """Parse the LLM response; structured-output clients get no block recovery."""
+        structured = getattr(self.llm, "output_schema", None) is not None
+        return extract_json_block(text, label=label, strict=structured)
+
     @abstractmethod
     def run(self, input_data: dict) -> dict[str, Any]:
         raise NotImplementedError
+
+
+class TaskValidationAgent(BaseValidationAgent):
+    """
+    Validator that sends one task prompt and maps the verdict to an AgentResult.
+
+    Subclasses only build the prompt. run() calls llm.generate(); arun() awaits
+    llm.agenerate() (AsyncLLMClientProtocol) so a fan-out can run on an event
+    loop. Both build the result the same way.
+    """
+
+    @abstractmethod
+    def build_task(self, input_data: dict) -> tuple[str, str]:
+        """
+        Build the task prompt for the input.
+
+        Returns:
+            Tuple of (task_prompt, output_key)
+        """
+        raise NotImplementedError
+
+    def run(self, input_data: dict) -> dict:
+        task_prompt, output_key = self.build_task(input_data)
+        # Call LLM with ONLY task prompt (system context cached)
+        t0 = time.perf_counter()
+        response = self.llm.generate(task_prompt)
+        return self._result(response, output_key, time.perf_counter() - t0)
+
+    async def arun(self, input_data: dict) -> dict:
+        task_prompt, output_key = self.build_task(input_data)
+        t0 = time.perf_counter()
+        response = await self.llm.agenerate(task_prompt)
+        return self._result(response, output_key, time.perf_counter() - t0)
+
+    def _result(self, response: dict, output_key: str, llm_elapsed: float) -> dict:
+        # Handle execution status
+        if response["execution_status"] != "SUCCESS":
+            self.logger.warning("%s LLM call failed after %.2fs: %s", output_key, llm_elapsed, response.get("error"))
+            return {
+                output_key: AgentResult(
+                    agent=output_key,
+                    status="FLAG",
+                    issues=[]
+                )
+            }
+
+        # Extract and parse response
+        result = self.parse_json(response["text"], output_key)
+        status = result.get("decision", "FLAG")
+
+        self.logger.debug("%s result: %s (LLM %.2fs, %dms reported)", output_key, status, llm_elapsed, response.get("latency_ms", 0))
+
+        return {
+            output_key: AgentResult(
+                agent=output_key,
+                status=status,
+                issues=result.get("issues", []),
+                usage=response.get("usage")
+            )
+        }
@@ -1,10 +1,7 @@
-import time
-from s3.agents.base import BaseValidationAgent
-from utils.normalization import extract_json_block
-from entity.agent import AgentResult
+from s3.agents.base import TaskValidationAgent
 
 
-class ClarityAgent(BaseValidationAgent):
+class ClarityAgent(TaskValidationAgent):
     """
     Clarity validation agent with true system prompt caching.
 
@@ -29,9 +26,9 @@ class ClarityAgent(BaseValidationAgent):
         super().__init__(llm)
         self.prompts = prompts
 
-    def run(self, input_data: dict) -> dict:
+    def build_task(self, input_data: dict) -> tuple[str, str]:
         """
-        Validate a requirement for clarity.
+        Build the clarity task prompt for a requirement.
 
         Sends only the task prompt (with requirement). System prompt context
         is cached in the LLM client and reused automatically.
@@ -40,41 +37,11 @@ class ClarityAgent(BaseValidationAgent):
             input_data: Dict containing 'requirement' object with .text attribute
 
         Returns:
-            Dict with 'clarity' key mapping to AgentResult
+            Tuple of (task_prompt, 'clarity')
         """
         requirement_text = input_data["requirement"].text
         self.logger.debug("Running clarity validation")
 
         # Build task prompt with the specific requirement
         task_prompt = self.prompts["task"].replace("{{REQUIREMENT}}", requirement_text)
-
-        # Call LLM with ONLY task prompt (system context cached)
-        t0 = time.perf_counter()
-        response = self.llm.generate(task_prompt)
-        llm_elapsed = time.perf_counter() - t0
-
-        # Handle execution status
-        if response["execution_status"] != "SUCCESS":
-            self.logger.warning("Clarity LLM call failed after %.2fs: %s", llm_elapsed, response.get("error"))
-            return {
-                "clarity": AgentResult(
-                    agent="clarity",
-                    status="FLAG",
-                    issues=[]
-                )
-            }
-
-        # Extract and parse response
-        response_text = response["text"]
-        result = extract_json_block(response_text)
-        status = result.get("decision", "FLAG")
-
-        self.logger.debug("Clarity result: %s (LLM %.2fs, %dms reported)", status, llm_elapsed, response.get("latency_ms", 0))
-
-        return {
-            "clarity": AgentResult(
-                agent="clarity",
-                status=status,
-                issues=result.get("issues", [])
-            )
-        }
+        return task_prompt, "clarity"
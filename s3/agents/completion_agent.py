@@ -1,10 +1,7 @@
-import time
-from s3.agents.base import BaseValidationAgent
-from utils.normalization import extract_json_block
-from entity.agent import AgentResult
+from s3.agents.base import TaskValidationAgent
 
 
-class CompletionAgent(BaseValidationAgent):
+class CompletionAgent(TaskValidationAgent):
     """
     Completion validation agent with true system prompt caching.
 
@@ -32,9 +29,9 @@ class CompletionAgent(BaseValidationAgent):
         super().__init__(llm)
         self.prompts = prompts
 
-    def run(self, input_data: dict) -> dict:
+    def build_task(self, input_data: dict) -> tuple[str, str]:
         """
-        Validate requirement(s) for completion.
+        Build the completion task prompt for requirement(s).
 
         Sends only the task prompt (with requirement data). System prompt context
         is cached in the LLM client and reused automatically.
@@ -43,44 +40,12 @@ class CompletionAgent(BaseValidationAgent):
             input_data: Dict containing 'mode' and requirement data
 
         Returns:
-            Dict with agent key (e.g., 'completion_single') mapping to AgentResult
+            Tuple of (task_prompt, agent key, e.g. 'completion_single')
         """
         mode = input_data["mode"]
-
-        # Build task prompt and determine output key based on mode
         task_prompt, output_key = self._build_prompt(input_data, mode)
         self.logger.debug("Running completion validation (mode=%s, key=%s)", mode, output_key)
-
-        # Call LLM with ONLY task prompt (system context cached)
-        t0 = time.perf_counter()
-        response = self.llm.generate(task_prompt)
-        llm_elapsed = time.perf_counter() - t0
-
-        # Handle execution status
-        if response["execution_status"] != "SUCCESS":
-            self.logger.warning("Completion LLM call failed after %.2fs: %s", llm_elapsed, response.get("error"))
-            return {
-                output_key: AgentResult(
-                    agent=output_key,
-                    status="FLAG",
-                    issues=[]
-                )
-            }
-
-        # Extract and parse response
-        response_text = response["text"]
-        result = extract_json_block(response_text)
-        status = result.get("decision", "FLAG")
-
-        self.logger.debug("Completion result (%s): %s (LLM %.2fs, %dms reported)", output_key, status, llm_elapsed, response.get("latency_ms", 0))
-
-        return {
-            output_key: AgentResult(
-                agent=output_key,
-                status=status,
-                issues=result.get("issues", [])
-            )
-        }
+        return task_prompt, output_key
 
     # -------------------------------------------------
     # Prompt construction only (no logic)
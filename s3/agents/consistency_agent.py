@@ -1,10 +1,7 @@
-import time
-from s3.agents.base import BaseValidationAgent
-from utils.normalization import extract_json_block
-from entity.agent import AgentResult
+from s3.agents.base import TaskValidationAgent
 
 
-class ConsistencyAgent(BaseValidationAgent):
+class ConsistencyAgent(TaskValidationAgent):
     """
     Consistency validation agent with true system prompt caching.
 
@@ -31,9 +28,9 @@ class ConsistencyAgent(BaseValidationAgent):
         super().__init__(llm)
         self.prompts = prompts
 
-    def run(self, input_data: dict) -> dict:
+    def build_task(self, input_data: dict) -> tuple[str, str]:
         """
-        Validate a requirement set for consistency.
+        Build the consistency task prompt for a requirement set.
 
         Sends only the task prompt (with requirement set). System prompt context
         is cached in the LLM client and reused automatically.
@@ -42,44 +39,12 @@ class ConsistencyAgent(BaseValidationAgent):
             input_data: Dict containing 'mode' and 'requirement_set'
 
         Returns:
-            Dict with agent key (e.g., 'consistency_group') mapping to AgentResult
+            Tuple of (task_prompt, agent key, e.g. 'consistency_group')
         """
         mode = input_data["mode"]
-
-        # Build task prompt and determine output key based on mode
         task_prompt, output_key = self._build_prompt(input_data, mode)
         self.logger.debug("Running consistency validation (mode=%s)", mode)
-
-        # Call LLM with ONLY task prompt (system context cached)
-        t0 = time.perf_counter()
-        response = self.llm.generate(task_prompt)
-        llm_elapsed = time.perf_counter() - t0
-
-        # Handle execution status
-        if response["execution_status"] != "SUCCESS":
-            self.logger.warning("Consistency LLM call failed after %.2fs: %s", llm_elapsed, response.get("error"))
-            return {
-                output_key: AgentResult(
-                    agent=output_key,
-                    status="FLAG",
-                    issues=[]
-                )
-            }
-
-        # Extract and parse response
-        response_text = response["text"]
-        result = extract_json_block(response_text)
-        status = result.get("decision", "FLAG")
-
-        self.logger.debug("Consistency result: %s (LLM %.2fs, %dms reported)", status, llm_elapsed, response.get("latency_ms", 0))
-
-        return {
-            output_key: AgentResult(
-                agent=output_key,
-                status=status,
-                issues=result.get("issues", [])
-            )
-        }
+        return task_prompt, output_key
 
     # -------------------------------------------------
     # Prompt construction only
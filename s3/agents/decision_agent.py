@@ -1,6 +1,5 @@
 import time
 from s3.agents.base import BaseValidationAgent
-from utils.normalization import extract_json_block
 from entity.agent import AgentResult
 
 
@@ -45,12 +44,13 @@ class DecisionAgent(BaseValidationAgent):
         final_decision = self._final_decision(validations)
         self.logger.info("Final decision: %s", final_decision)
 
+        usage = None
         if final_decision == "PASS":
             self.logger.debug("Final decision is PASS — skipping recommendation generation")
             recommendations = []
         else:
             t0 = time.perf_counter()
-            recommendations = self._recommendations(state, validations, mode)
+            recommendations, usage = self._recommendations(state, validations, mode)
             rec_elapsed = time.perf_counter() - t0
             self.logger.debug("Recommendations generated in %.2fs (%d items)", rec_elapsed, len(recommendations))
 
@@ -72,7 +72,8 @@ class DecisionAgent(BaseValidationAgent):
         return {
             "decision": AgentResult(
                 agent="Decision Agent",
-                status=final_decision
+                status=final_decision,
+                usage=usage
             )
         }
 
@@ -115,7 +116,7 @@ class DecisionAgent(BaseValidationAgent):
     # -------------------------------------------------
     # Task 3 — Recommendations (LLM-based)
     # -------------------------------------------------
-    def _recommendations(self, state: dict, validations: list[dict], mode: str) -> list[str]:
+    def _recommendations(self, state: dict, validations: list[dict], mode: str) -> tuple[list[str], dict | None]:
         """
         Generate recommendations using LLM with cached system prompt.
 
@@ -128,12 +129,12 @@ class DecisionAgent(BaseValidationAgent):
             mode: Validation mode ('single' or 'group')
 
         Returns:
-            List of recommendation strings
+            Tuple of (recommendation strings, usage counters of the LLM call or None)
         """
         issues = self._collect_issues(validations)
         if not issues:
             self.logger.debug("No issues found — skipping recommendation generation")
-            return []
+            return [], None
 
         requirements_text = self._format_requirements(state, mode)
 
@@ -152,13 +153,13 @@ class DecisionAgent(BaseValidationAgent):
 
         if response["execution_status"] != "SUCCESS":
             self.logger.warning("Recommendation LLM call failed after %.2fs: %s", llm_elapsed, response.get("error"))
-            return []
+            return [], None
 
         # Extract and parse response
-        parsed = extract_json_block(response["text"])
+        parsed = self.parse_json(response["text"], "decision")
         recs = parsed.get("recommendations", [])
         self.logger.debug("Generated %d recommendations (LLM %.2fs)", len(recs), llm_elapsed)
-        return recs
+        return recs, response.get("usage")
 
     # -------------------------------------------------
     # Helpers
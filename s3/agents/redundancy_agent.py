@@ -1,10 +1,7 @@
-import time
-from s3.agents.base import BaseValidationAgent
-from utils.normalization import extract_json_block
-from entity.agent import AgentResult
+from s3.agents.base import TaskValidationAgent
 
 
-class RedundancyAgent(BaseValidationAgent):
+class RedundancyAgent(TaskValidationAgent):
     """
     Redundancy validation agent with true system prompt caching.
 
@@ -29,9 +26,9 @@ class RedundancyAgent(BaseValidationAgent):
         super().__init__(llm)
         self.prompts = prompts
 
-    def run(self, input_data: dict) -> dict:
+    def build_task(self, input_data: dict) -> tuple[str, str]:
         """
-        Validate a requirement set for redundancy.
+        Build the redundancy task prompt for a requirement set.
 
         Sends only the task prompt (with requirement set). System prompt context
         is cached in the LLM client and reused automatically.
@@ -40,7 +37,7 @@ class RedundancyAgent(BaseValidationAgent):
             input_data: Dict containing 'requirement_set' object
 
         Returns:
-            Dict with 'redundancy' key mapping to AgentResult
+            Tuple of (task_prompt, 'redundancy')
         """
         requirement_set = input_data["requirement_set"]
         self.logger.debug("Running redundancy validation")
@@ -49,34 +46,4 @@ class RedundancyAgent(BaseValidationAgent):
         task_prompt = self.prompts["task"].replace(
             "{{REQUIREMENT}}", requirement_set.join_requirements()
         )
-
-        # Call LLM with ONLY task prompt (system context cached)
-        t0 = time.perf_counter()
-        response = self.llm.generate(task_prompt)
-        llm_elapsed = time.perf_counter() - t0
-
-        # Handle execution status
-        if response["execution_status"] != "SUCCESS":
-            self.logger.warning("Redundancy LLM call failed after %.2fs: %s", llm_elapsed, response.get("error"))
-            return {
-                "redundancy": AgentResult(
-                    agent="redundancy",
-                    status="FLAG",
-                    issues=[]
-                )
-            }
-
-        # Extract and parse response
-        response_text = response["text"]
-        result = extract_json_block(response_text)
-        status = result.get("decision", "FLAG")
-
-        self.logger.debug("Redundancy result: %s (LLM %.2fs, %dms reported)", status, llm_elapsed, response.get("latency_ms", 0))
-
-        return {
-            "redundancy": AgentResult(
-                agent="redundancy",
-                status=status,
-                issues=result.get("issues", [])
-            )
-        }
+        return task_prompt, "redundancy"
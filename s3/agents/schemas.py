@@ -0,0 +1,40 @@
+# s3/agents/schemas.py
+
+"""
+JSON schemas for the S3 agent outputs.
+
+With `structured_output: true` in config/model.yaml, each cached LLM client
+sends its schema as the Ollama `format` field. Decoding is then constrained to
+a valid object of this shape, so agents parse the response directly instead of
+recovering a JSON block from free text.
+
+Keys are the LLM client names used in build_agents().
+"""
+
+
+def _verdict_schema(decisions: list[str]) -> dict:
+    return {
+        "type": "object",
+        "properties": {
+            "decision": {"type": "string", "enum": decisions},
+            "issues": {"type": "string"},
+        },
+        "required": ["decision", "issues"],
+    }
+
+
+OUTPUT_SCHEMAS = {
+    "atomicity": _verdict_schema(["PASS", "FAIL"]),
+    "clarity": _verdict_schema(["PASS", "FLAG"]),
+    "completion_single": _verdict_schema(["PASS", "FLAG"]),
+    "completion_group": _verdict_schema(["PASS", "FLAG"]),
+    "consistency": _verdict_schema(["PASS", "FLAG"]),
+    "redundancy": _verdict_schema(["PASS", "FLAG"]),
+    "decision": {
+        "type": "object",
+        "properties": {
+            "recommendations": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["recommendations"],
+    },
+}
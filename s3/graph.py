@@ -1,6 +1,9 @@
 from langgraph.graph import StateGraph, END
 from s3.state import MARVAState
+from common.event_loop import run_coroutine
+from common.llm_client_protocol import supports_async
 from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import time
 import logging
 
@@ -49,14 +52,23 @@ def join_node(state: MARVAState):
     return None
 
 
+def _supports_async(agent) -> bool:
+    """True if the agent has arun() and its client an awaitable agenerate()."""
+    return hasattr(agent, "arun") and supports_async(agent.llm)
+
+
 def execute_parallel_agents(state: MARVAState, agent_list: list, max_workers: int = None):
     """
-    Execute multiple agents in parallel using ThreadPoolExecutor.
+    Execute multiple agents in parallel.
+
+    When every agent's client is async (model.async_agents), the agents are
+    awaited together on the shared event loop (common/event_loop.py);
+    otherwise each runs in a ThreadPoolExecutor thread.
 
     Args:
         state: Current state to pass to agents
         agent_list: List of (agent, name) tuples to execute
-        max_workers: Number of threads (defaults to len(agent_list))
+        max_workers: Number of threads (defaults to len(agent_list); unused on the event loop)
 
     Returns:
         Merged results from all agents
@@ -77,6 +89,30 @@ def execute_parallel_agents(state: MARVAState, agent_list: list, max_workers: in
         logger.info("[%s] Completed in %.2fs", name, elapsed)
         return result
 
+    if all(_supports_async(agent) for agent, _ in agent_list):
+        async def timed_agent_arun(agent, name):
+            start = time.perf_counter()
+            logger.debug("[%s] Started execution", name)
+            try:
+                result = await agent.arun(state)
+            except Exception as e:
+                logger.error("[%s] failed: %s", name, e)
+                raise
+            elapsed = time.perf_counter() - start
+            logger.info("[%s] Completed in %.2fs", name, elapsed)
+            return result
+
+        async def run_all():
+            return await asyncio.gather(*(timed_agent_arun(agent, name) for agent, name in agent_list))
+
+        merged_results = {}
+        for result in run_coroutine(run_all()):
+            merged_results.update(result)
+
+        overall_elapsed = time.perf_counter() - overall_start
+        logger.info("Parallel execution completed in %.2fs on the event loop (agents: %s)", overall_elapsed, agent_names)
+        return merged_results
+
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all agents for parallel execution
         futures = {
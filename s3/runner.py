@@ -1,15 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import argparse
 import logging
 from pathlib import Path
 import time
 
+from common.client_factory import configure_clients, log_client_stats
+from common.config import load_config
+from common.warmup import preload_models
+from utils.normalization import log_parse_stats
 from common.logging.setup import setup_logging
 from s3.graph import build_marva_s3_graph
 from s3.agents import build_agents
 from s3.logger import init_s3_logger
 from utils.dataset_loader import load_dataset
-from utils.save_runner_decision import save_runner_decision
+from utils.checkpoint import finish_checkpoint, open_checkpoint
+from utils.result_stream import ResultStream
+from utils.save_runner_decision import new_run_dir, save_runner_decision, write_decision_json
 from utils.save_runner_csv import save_runner_csv
 from entity.decision import Decision
 
@@ -19,12 +26,29 @@ FRAMEWORK = "MARVA v1.0"
 LOGGER = "marva.s3.runner"
 
 
-def main(mode: str, scope: str, limit: int | None):
+def _run_requirement(app, req) -> float:
+    """Run the single-mode graph for one requirement and record its wall time on it."""
+    req_start = time.perf_counter()
+    app.invoke({
+        "mode": "single",
+        "requirement": req,
+    })
+    req_elapsed = time.perf_counter() - req_start
+    req.duration_seconds = round(req_elapsed, 3)
+    return req_elapsed
+
+
+def main(mode: str, scope: str, limit: int | None, use_cache: bool = True, warm_up: bool = True, concurrency: int = 1,
+         resume: str | None = None,
+         write_json: bool = True):
 
     setup_logging(run_id="s3_run_" + datetime.now().strftime('%Y%m%d'))
     init_s3_logger()
     logger = logging.getLogger(LOGGER)
-    logger.info("Starting S3 runner (mode=%s, scope=%s, limit=%s)", mode, scope, limit)
+    logger.info(
+        "Starting S3 runner (mode=%s, scope=%s, limit=%s, cache=%s, warmup=%s, concurrency=%d, resume=%s)",
+        mode, scope, limit, use_cache, warm_up, concurrency, resume,
+    )
 
     # -----------------------------
     # Load dataset
@@ -33,11 +57,34 @@ def main(mode: str, scope: str, limit: int | None):
     requirement_set = load_dataset(scope, limit)
     logger.info("Loaded %d requirements from '%s' in %.2fs", len(requirement_set.requirements), scope, time.perf_counter() - t0)
 
+    # -----------------------------
+    # Checkpoint journal (single mode): completed requirements survive a crash
+    # -----------------------------
+    output_dir, journal, stream = None, None, None
+    pending = requirement_set.requirements
+    if mode == "single":
+        output_dir = Path(resume) if resume else new_run_dir(DECISION_OUTPUT_PATH)
+        # Restored and newly completed requirements go to results.csv / results.jsonl as they come
+        stream = ResultStream(output_dir)
+        journal, pending = open_checkpoint(
+            output_dir, {"framework": FRAMEWORK, "mode": mode, "scope": scope}, requirement_set,
+            resume=resume is not None, log=logger, on_record=stream.emit,
+        )
+
+    # -----------------------------
+    # Warm up the model so the first requirement does not pay the load
+    # -----------------------------
+    if warm_up:
+        cfg = load_config()
+        if cfg["model"].get("preload", False):
+            configure_clients(cfg)
+            preload_models(cfg)
+
     # -----------------------------
     # Init agents + graph
     # -----------------------------
     t0 = time.perf_counter()
-    agents, agents_config = build_agents(mode)
+    agents, agents_config = build_agents(mode, use_cache=use_cache)
     agents_elapsed = time.perf_counter() - t0
     logger.info("Agents for mode='%s' built in %.2fs (%d agents)", mode, agents_elapsed, len(agents))
 
@@ -57,18 +104,28 @@ def main(mode: str, scope: str, limit: int | None):
     start_time = time.perf_counter()
     logger.info("Starting S3 pipeline execution")
 
-    if mode == "single":
-        total = len(requirement_set.requirements)
-        for idx, req in enumerate(requirement_set.requirements, 1):
-            req_start = time.perf_counter()
-            logger.info("[%d/%d] Processing requirement '%s'", idx, total, req.id)
-            state = {
-                "mode": "single",
-                "requirement": req,
+    if mode == "single" and concurrency > 1:
+        # Several requirement graphs in flight; results are written onto each
+        # Requirement, so the output keeps the dataset order
+        total = len(pending)
+        logger.info("Running %d requirements with concurrency=%d", total, concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="s3-req") as executor:
+            futures = {
+                executor.submit(_run_requirement, app, req): (idx, req)
+                for idx, req in enumerate(pending, 1)
             }
-            app.invoke(state)
-            req_elapsed = time.perf_counter() - req_start
-            req.duration_seconds = round(req_elapsed, 3)
+            for done, future in enumerate(as_completed(futures), 1):
+                idx, req = futures[future]
+                req_elapsed = future.result()
+                journal.record(req)
+                logger.info("[%d/%d] Requirement #%d '%s' => %s (%.2fs)", done, total, idx, req.id, req.final_decision, req_elapsed)
+
+    elif mode == "single":
+        total = len(pending)
+        for idx, req in enumerate(pending, 1):
+            logger.info("[%d/%d] Processing requirement '%s'", idx, total, req.id)
+            req_elapsed = _run_requirement(app, req)
+            journal.record(req)
             logger.info("[%d/%d] Requirement '%s' => %s (%.2fs)", idx, total, req.id, req.final_decision, req_elapsed)
 
     elif mode == "group":
@@ -86,17 +143,20 @@ def main(mode: str, scope: str, limit: int | None):
     # -----------------------------
     # Save results
     # -----------------------------
-    decision.duration = int(time.perf_counter() - start_time)
-    decision.set_decision(requirement_set)
-
-    output_dir = save_runner_decision(decision.to_dict(), DECISION_OUTPUT_PATH)
-    csv_path = save_runner_csv(requirement_set, mode, decision.duration, output_dir)
-    summary_path = output_dir / "summary.json"
     if mode == "single":
-        detailed_path = output_dir / "detailed.json"
-        logger.info("S3 runner completed in %ds | output: %s, %s, %s", decision.duration, summary_path, detailed_path, csv_path)
+        decision.duration = int(finish_checkpoint(journal, time.perf_counter() - start_time, log=logger))
+        stream.close()
+        outputs = [stream.csv_path, stream.jsonl_path]
+        if write_json:
+            outputs += write_decision_json(output_dir, FRAMEWORK, mode, decision.duration)
     else:
-        logger.info("S3 runner completed in %ds | output: %s, %s", decision.duration, summary_path, csv_path)
+        decision.duration = int(time.perf_counter() - start_time)
+        decision.set_decision(requirement_set)
+        output_dir = save_runner_decision(decision.to_dict(), DECISION_OUTPUT_PATH)
+        outputs = [output_dir / "summary.json", save_runner_csv(requirement_set, mode, decision.duration, output_dir)]
+    logger.info("S3 runner completed in %ds | output: %s", decision.duration, ", ".join(str(p) for p in outputs))
+    log_client_stats(logger)
+    log_parse_stats(logger)
 
 
 if __name__ == "__main__":
@@ -104,6 +164,19 @@ if __name__ == "__main__":
     parser.add_argument("--scope", required=True)
     parser.add_argument("--mode", required=True, choices=["single", "group"])
     parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the persistent LLM response cache")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip preloading the model before the run")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Requirements validated at once in single mode (LLM calls stay bounded by max_inflight_per_host)")
+    parser.add_argument("--resume", metavar="RUN_DIR", default=None,
+                        help="Single mode: continue an interrupted run, skipping requirements in its checkpoint journal")
+    parser.add_argument("--no-json", action="store_true",
+                        help="Single mode: skip summary.json/detailed.json (derive later with python -m utils.save_runner_decision RUN_DIR)")
 
     args = parser.parse_args()
-    main(args.mode, args.scope, args.limit)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.resume and args.mode != "single":
+        parser.error("--resume only applies to --mode single")
+    main(args.mode, args.scope, args.limit, use_cache=not args.no_cache, warm_up=not args.no_warmup,
+         concurrency=args.concurrency, resume=args.resume, write_json=not args.no_json)
@@ -0,0 +1,218 @@
+"""
+Append-only checkpoint journal for single-mode runs.
+
+Every completed requirement is appended to `journal.jsonl` in the run
+directory as soon as it is done (one JSON line, flushed and fsynced), so a
+crash or an Ollama outage only loses the requirements in flight. The first
+line identifies the run:
+
+    {"journal": 1, "framework": "MARVA v1.0", "mode": "single", "scope": "raw/QuRE_raw.csv"}
+    {"index": 0, "requirement": {"id": "...", "final_decision": "PASS", ...}}
+    {"session_seconds": 5400.2}
+
+A session record is appended whenever a run (or a resumed part of it) ends;
+their sum is the run duration (a session that crashed is not counted).
+
+`--resume <run_dir>` reopens the journal, restores the completed requirements
+and skips them. Records are keyed by dataset position (ids are not unique in
+every dataset) and checked against the requirement id. `on_record` receives
+every restored and newly recorded requirement with its position, which is
+how the result stream (utils/result_stream.py) is fed from the journal.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from entity.requirement_set import RequirementSet
+
+logger = logging.getLogger("marva.checkpoint")
+
+JOURNAL_FILE = "journal.jsonl"
+JOURNAL_VERSION = 1
+
+# Header fields that must match for a run to be resumed
+_IDENTITY_FIELDS = ("framework", "mode", "scope")
+
+
+class CheckpointJournal:
+    """Thread-safe journal of completed requirements (see module docstring)."""
+
+    def __init__(self, path: Path, header: dict, on_record: Optional[Callable[[int, object], None]] = None):
+        self.path = path
+        self.header = header
+        self.on_record = on_record
+        self._lock = threading.Lock()
+        self._file = None
+        self._positions: Dict[int, int] = {}
+        self._done: set = set()
+
+    @classmethod
+    def open(
+        cls, run_dir: Path, header: dict, resume: bool = False,
+        on_record: Optional[Callable[[int, object], None]] = None,
+    ) -> "CheckpointJournal":
+        """
+        Open the journal of `run_dir` for appending.
+
+        Args:
+            run_dir: Run output directory
+            header: Run identity (framework, mode, scope)
+            resume: The journal must already exist and belong to the same run
+            on_record: Called with (dataset position, requirement) for every
+                       restored or recorded requirement
+        """
+        path = Path(run_dir) / JOURNAL_FILE
+        journal = cls(path, {"journal": JOURNAL_VERSION, **header}, on_record)
+        if resume:
+            if not path.exists():
+                raise FileNotFoundError(f"No checkpoint journal to resume in {run_dir}")
+            journal._check_header()
+            journal._drop_partial_line()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        journal._file = open(path, "a", encoding="utf-8")
+        if not resume:
+            journal._append(journal.header)
+        logger.debug("Checkpoint journal %s opened (resume=%s)", path, resume)
+        return journal
+
+    def _check_header(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            first = f.readline()
+        try:
+            header = json.loads(first)
+        except json.JSONDecodeError:
+            raise ValueError(f"{self.path} does not start with a journal header")
+        mismatched = [k for k in _IDENTITY_FIELDS if header.get(k) != self.header.get(k)]
+        if mismatched:
+            raise ValueError(
+                f"Cannot resume {self.path.parent}: "
+                + ", ".join(f"{k}={header.get(k)!r} (now {self.header.get(k)!r})" for k in mismatched)
+            )
+
+    def _drop_partial_line(self) -> None:
+        """Cut a record left half-written by a crash so new records start on a fresh line."""
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+                logger.warning("Dropped a partially written record at the end of %s", self.path)
+
+    def _append(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _records(self) -> Dict[int, dict]:
+        return _read_records(self.path)[1]
+
+    def restore(self, requirement_set: RequirementSet) -> List:
+        """
+        Copy journaled results onto the matching requirements.
+
+        Returns:
+            The requirements without a journal record, in dataset order
+        """
+        self._positions = {id(req): i for i, req in enumerate(requirement_set.requirements)}
+        records = self._records()
+        self._done = set()
+        pending = []
+        for i, req in enumerate(requirement_set.requirements):
+            record = records.get(i)
+            if record is None:
+                pending.append(req)
+                continue
+            if record.get("id") != req.id:
+                raise ValueError(
+                    f"Journal record {i} is for requirement '{record.get('id')}', dataset has '{req.id}'"
+                )
+            req.metadata = record.get("metadata", {})
+            req.single_validations = record.get("single_validations", [])
+            req.final_decision = record.get("final_decision")
+            req.recommendation = record.get("recommendation", {})
+            req.duration_seconds = record.get("duration_seconds", 0.0)
+            self._done.add(i)
+            if self.on_record is not None:
+                self.on_record(i, req)
+        return pending
+
+    def record(self, requirement) -> None:
+        """Journal a completed requirement (one passed to restore())."""
+        index = self._positions[id(requirement)]
+        self._append({"index": index, "requirement": requirement.to_dict()})
+        with self._lock:
+            self._done.add(index)
+        if self.on_record is not None:
+            self.on_record(index, requirement)
+
+    def missing(self) -> List[int]:
+        """Dataset positions passed to restore() that have no record yet."""
+        with self._lock:
+            return sorted(set(self._positions.values()) - self._done)
+
+    def finish(self, session_seconds: float) -> float:
+        """Record the duration of this session and return the total over all sessions."""
+        self._append({"session_seconds": round(session_seconds, 3)})
+        return read_journal(self.path.parent)[1]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _read_records(path: Path) -> Tuple[dict, Dict[int, dict], float]:
+    """(header, position -> requirement record, total session seconds) of a journal file."""
+    header, records, seconds = {}, {}, 0.0
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping unreadable journal line %d in %s", line_no, path)
+                continue
+            if line_no == 1:
+                header = record
+            elif "index" in record:
+                records[record["index"]] = record["requirement"]
+            elif "session_seconds" in record:
+                seconds += record["session_seconds"]
+    return header, records, seconds
+
+
+def read_journal(run_dir: Path) -> Tuple[dict, float]:
+    """Header and total duration in seconds of the journal in `run_dir`."""
+    header, _, seconds = _read_records(Path(run_dir) / JOURNAL_FILE)
+    return header, seconds
+
+
+def open_checkpoint(
+    run_dir: Path, header: dict, requirement_set: RequirementSet, resume: bool = False,
+    log: Optional[logging.Logger] = None, on_record: Optional[Callable[[int, object], None]] = None,
+):
+    """Open the run's journal and restore completed requirements; returns (journal, pending requirements)."""
+    log = log or logger
+    journal = CheckpointJournal.open(run_dir, header, resume=resume, on_record=on_record)
+    pending = journal.restore(requirement_set)
+    total = len(requirement_set.requirements)
+    if resume:
+        log.info("Resuming %s: %d/%d requirements already completed", run_dir, total - len(pending), total)
+    return journal, pending
+
+
+def finish_checkpoint(journal: CheckpointJournal, session_seconds: float,
+                      log: Optional[logging.Logger] = None) -> float:
+    """Record this session, close the journal and return the run duration over all sessions."""
+    log = log or logger
+    missing = journal.missing()
+    if missing:
+        log.warning("%d requirements have no journal record (dataset positions %s)", len(missing), missing)
+    total = journal.finish(session_seconds)
+    journal.close()
+    return total
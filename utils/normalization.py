@@ -1,37 +1,123 @@
 import json
 import logging
-import re
+import threading
+from collections import Counter, defaultdict
+
+from common.json_scanner import IncrementalJSONScanner
 
 logger = logging.getLogger(__name__)
 
+# Parse outcomes per label: "direct", "recovered" (JSON block found in
+# surrounding text) or "failed" (fell back to FLAG)
+_PARSE_COUNTS = defaultdict(Counter)
+_PARSE_LOCK = threading.Lock()
+
+
+def _fallback() -> dict:
+    return {
+        "decision": "FLAG",
+        "issues": []
+    }
+
+
+def _count(label: str, outcome: str) -> None:
+    with _PARSE_LOCK:
+        _PARSE_COUNTS[label or "unlabeled"][outcome] += 1
 
-def extract_json_block(text: str) -> dict:
+
+def extract_json_block(text: str, label: str = None, strict: bool = False) -> dict:
     """
     Extract the first valid JSON object from a string.
     Falls back safely if parsing fails.
+
+    Args:
+        text: LLM response text
+        label: Agent name the outcome is counted under (see parse_stats)
+        strict: Only accept a direct parse. Used for structured-output
+                responses, which must already be a single JSON object.
     """
 
     # Try direct parse first
     try:
-        return json.loads(text)
+        result = json.loads(text)
+        if isinstance(result, dict):
+            _count(label, "direct")
+            return result
     except (json.JSONDecodeError, TypeError):
-        logger.debug("Direct JSON parse failed, trying regex extraction.")
+        logger.debug("Direct JSON parse failed%s.", "" if strict else ", scanning for a JSON block")
 
-    # Regex to extract JSON object
-    match = re.search(r"(?:```json\s*)?(\{.*?\})(?:\s*```)?", text, re.DOTALL)
+    if strict:
+        logger.warning("Structured response for '%s' is not a JSON object, returning FLAG.", label)
+        _count(label, "failed")
+        return _fallback()
 
-    if not match:
+    # Brace-aware scan for the first complete top-level object (handles
+    # nested objects and ```json fences)
+    scanner = IncrementalJSONScanner()
+    if not scanner.feed(text or ""):
         logger.warning("No JSON block found in LLM response.")
-        return {
-            "decision": "FLAG",
-            "issues": []
-        }
+        _count(label, "failed")
+        return _fallback()
 
     try:
-        return json.loads(match.group(0))
+        result = json.loads(scanner.object_text)
+        _count(label, "recovered")
+        return result
     except (json.JSONDecodeError, TypeError):
         logger.warning("Failed to parse extracted JSON block, returning FLAG.")
-        return {
-            "decision": "FLAG",
-            "issues": []
-        }
+        _count(label, "failed")
+        return _fallback()
+
+
+def extract_json_array(text: str, label: str = None) -> list:
+    """
+    Extract the first JSON array from a string (batched responses).
+
+    An object wrapping a single list (e.g. {"results": [...]}) is unwrapped.
+    Returns an empty list if no array can be parsed.
+    """
+    try:
+        result = json.loads(text)
+        if isinstance(result, dict):
+            lists = [v for v in result.values() if isinstance(v, list)]
+            result = lists[0] if len(lists) == 1 else None
+        if isinstance(result, list):
+            _count(label, "direct")
+            return result
+    except (json.JSONDecodeError, TypeError):
+        logger.debug("Direct JSON array parse failed, scanning for an array")
+
+    decoder = json.JSONDecoder()
+    text = text or ""
+    start = text.find("[")
+    while start != -1:
+        try:
+            result, _ = decoder.raw_decode(text, start)
+            if isinstance(result, list):
+                _count(label, "recovered")
+                return result
+        except json.JSONDecodeError:
+            pass
+        start = text.find("[", start + 1)
+
+    logger.warning("No JSON array found in LLM response.")
+    _count(label, "failed")
+    return []
+
+
+def parse_stats() -> dict:
+    """Parse outcome counts per label since process start."""
+    with _PARSE_LOCK:
+        return {label: dict(counts) for label, counts in _PARSE_COUNTS.items()}
+
+
+def log_parse_stats(log: logging.Logger = None) -> None:
+    log = log or logger
+    for label, counts in sorted(parse_stats().items()):
+        total = sum(counts.values())
+        failed = counts.get("failed", 0)
+        log.info(
+            "JSON parse [%s]: %d responses, %d direct, %d recovered, %d failed (%.1f%%)",
+            label, total, counts.get("direct", 0), counts.get("recovered", 0), failed,
+            100.0 * failed / total if total else 0.0,
+        )
@@ -0,0 +1,105 @@
+"""
+Incremental single-mode result writers.
+
+ResultStream writes `results.csv` and `results.jsonl` (one requirement
+record per line) in the run directory while the run progresses, instead of
+materializing every row at the end. Requirements may complete out of order
+when several run at once. They are held back until all earlier ones are
+written, so both files are always in dataset order. Buffers are flushed
+every `flush_every` rows or `flush_seconds`, whichever comes first.
+
+summary.json and detailed.json are derived from results.jsonl afterwards
+(see utils/save_runner_decision.py).
+"""
+
+import csv
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+from utils.save_runner_csv import SINGLE_HEADERS, single_row
+
+logger = logging.getLogger("marva.result_stream")
+
+CSV_FILE = "results.csv"
+JSONL_FILE = "results.jsonl"
+
+FLUSH_EVERY = 20
+FLUSH_SECONDS = 5.0
+
+
+class ResultStream:
+    """In-order CSV and JSONL writer for single-mode results (see module docstring)."""
+
+    def __init__(self, run_dir: Path, flush_every: int = FLUSH_EVERY, flush_seconds: float = FLUSH_SECONDS):
+        self.run_dir = Path(run_dir)
+        self.csv_path = self.run_dir / CSV_FILE
+        self.jsonl_path = self.run_dir / JSONL_FILE
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        # Files are created on first use, so a run that fails to start leaves existing ones alone
+        self._csv_file = None
+        self._jsonl_file = None
+        self._csv = None
+        self._closed = False
+        # Completed requirements waiting for an earlier index, as (csv row, jsonl line)
+        self._waiting: Dict[int, tuple] = {}
+        self._next = 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self.written = 0
+
+    def _open(self) -> None:
+        if self._csv_file is None:
+            self._csv_file = open(self.csv_path, "w", newline="", encoding="utf-8")
+            self._jsonl_file = open(self.jsonl_path, "w", encoding="utf-8")
+            self._csv = csv.DictWriter(self._csv_file, fieldnames=SINGLE_HEADERS)
+            self._csv.writeheader()
+
+    def emit(self, index: int, requirement) -> None:
+        """Queue the requirement at dataset position `index` and write everything now in order."""
+        # Serialize outside the lock; only the writes are ordered
+        entry = (single_row(requirement), json.dumps(requirement.to_dict(), ensure_ascii=False) + "\n")
+        with self._lock:
+            self._open()
+            self._waiting[index] = entry
+            while self._next in self._waiting:
+                row, line = self._waiting.pop(self._next)
+                self._csv.writerow(row)
+                self._jsonl_file.write(line)
+                self._next += 1
+                self._unflushed += 1
+                self.written += 1
+            if self._unflushed >= self.flush_every or (
+                self._unflushed and time.monotonic() - self._last_flush >= self.flush_seconds
+            ):
+                self._flush()
+
+    def _flush(self) -> None:
+        self._csv_file.flush()
+        self._jsonl_file.flush()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._open()
+            if self._waiting:
+                # A gap in the sequence (a requirement that never completed): keep the rest in order
+                logger.warning("%d results were waiting for an earlier requirement; writing them now", len(self._waiting))
+                for index in sorted(self._waiting):
+                    row, line = self._waiting.pop(index)
+                    self._csv.writerow(row)
+                    self._jsonl_file.write(line)
+                    self.written += 1
+            self._flush()
+            self._csv_file.close()
+            self._jsonl_file.close()
+        logger.debug("Result stream closed: %d requirements written to %s", self.written, self.run_dir)
@@ -30,35 +30,39 @@ def _validation_status_map(validations) -> dict:
     return mapping
 
 
+SINGLE_HEADERS = [
+    "id",
+    "requirement",
+    "atomicity",
+    "clarity",
+    "completion",
+    "final_decision",
+    "recommendations",
+    "duration",
+]
+
+
+def single_row(req) -> dict:
+    """CSV row of one single-mode requirement."""
+    validation_map = _validation_status_map(req.single_validations)
+    return {
+        "id": req.id,
+        "requirement": req.text,
+        "atomicity": validation_map.get("atomicity", ""),
+        "clarity": validation_map.get("clarity", ""),
+        "completion": validation_map.get("completion", ""),
+        "final_decision": req.final_decision,
+        "recommendations": _format_recommendations(req.recommendation),
+        "duration": req.duration_seconds,
+    }
+
+
 def save_runner_csv(requirement_set, mode: str, duration_seconds: float, output_dir: Path) -> Path:
     output_file = output_dir / "results.csv"
 
     if mode == "single":
-        headers = [
-            "id",
-            "requirement",
-            "atomicity",
-            "clarity",
-            "completion",
-            "final_decision",
-            "recommendations",
-            "duration",
-        ]
-        rows = []
-        for req in requirement_set.requirements:
-            validation_map = _validation_status_map(req.single_validations)
-            rows.append(
-                {
-                    "id": req.id,
-                    "requirement": req.text,
-                    "atomicity": validation_map.get("atomicity", ""),
-                    "clarity": validation_map.get("clarity", ""),
-                    "completion": validation_map.get("completion", ""),
-                    "final_decision": req.final_decision,
-                    "recommendations": _format_recommendations(req.recommendation),
-                    "duration": req.duration_seconds,
-                }
-            )
+        headers = SINGLE_HEADERS
+        rows = [single_row(req) for req in requirement_set.requirements]
     else:
         headers = [
             "id",
@@ -1,37 +1,50 @@
+import argparse
 import json
 import logging
+import textwrap
 from pathlib import Path
 from datetime import datetime
 
 logger = logging.getLogger("marva.save_decision")
 
+RESULTS_JSONL = "results.jsonl"
 
-def save_runner_decision(decision_summary: dict, path: Path) -> Path:
-    decision_out_dir = Path(path / f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-    decision_out_dir.mkdir(parents=True, exist_ok=True)
+
+def _summary_record(req: dict) -> dict:
+    return {
+        "id": req.get("id"),
+        "text": req.get("text"),
+        "final_decision": req.get("final_decision"),
+        "recommendation": req.get("recommendation"),
+    }
+
+
+def _detailed_record(req: dict) -> dict:
+    return {k: v for k, v in req.items() if k != "final_decision"}
+
+
+def new_run_dir(path: Path) -> Path:
+    """Create a timestamped run directory under `path`."""
+    run_dir = Path(path / f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    run_dir.mkdir(parents=True, exist_ok=True)
+    return run_dir
+
+
+def save_runner_decision(decision_summary: dict, path: Path, output_dir: Path | None = None) -> Path:
+    """Write summary.json (and detailed.json in single mode) to `output_dir`, or a new run directory under `path`."""
+    decision_out_dir = Path(output_dir) if output_dir is not None else new_run_dir(path)
     mode = str(decision_summary.get("Mode", "")).lower()
 
     if mode == "single":
         validation_list = decision_summary.get("Validation", [])
-        summary_validation = [
-            {
-                "id": req.get("id"),
-                "text": req.get("text"),
-                "final_decision": req.get("final_decision"),
-                "recommendation": req.get("recommendation"),
-            }
-            for req in validation_list
-        ]
+        summary_validation = [_summary_record(req) for req in validation_list]
         summary_payload = {
             "Framework": decision_summary.get("Framework"),
             "Mode": decision_summary.get("Mode"),
             "Duration": decision_summary.get("Duration"),
             "Validation": summary_validation,
         }
-        detailed_validation = [
-            {k: v for k, v in req.items() if k != "final_decision"}
-            for req in validation_list
-        ]
+        detailed_validation = [_detailed_record(req) for req in validation_list]
         detailed_payload = {
             "Framework": decision_summary.get("Framework"),
             "Mode": decision_summary.get("Mode"),
@@ -53,3 +66,55 @@ def save_runner_decision(decision_summary: dict, path: Path) -> Path:
             json.dump(detailed_payload, f, indent=2, ensure_ascii=False)
         logger.debug("Decision details saved to %s", detailed_file)
     return decision_out_dir
+
+
+def _iter_results(run_dir: Path):
+    with open(run_dir / RESULTS_JSONL, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _write_json_stream(path: Path, head: dict, records) -> None:
+    """Write {**head, "Validation": [...]} laid out like json.dump(indent=2), one record at a time."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        for key, value in head.items():
+            f.write(f"  {json.dumps(key)}: {json.dumps(value, ensure_ascii=False)},\n")
+        f.write('  "Validation": [')
+        empty = True
+        for record in records:
+            f.write("\n" if empty else ",\n")
+            f.write(textwrap.indent(json.dumps(record, indent=2, ensure_ascii=False), "    "))
+            empty = False
+        f.write("]\n}" if empty else "\n  ]\n}")
+
+
+def write_decision_json(run_dir: Path, framework: str, mode: str, duration: int) -> tuple:
+    """
+    Derive summary.json and detailed.json of a single-mode run from its
+    results.jsonl without loading all records at once.
+
+    Returns:
+        (summary path, detailed path)
+    """
+    run_dir = Path(run_dir)
+    head = {"Framework": framework, "Mode": mode, "Duration": duration}
+    summary_file = run_dir / "summary.json"
+    detailed_file = run_dir / "detailed.json"
+    _write_json_stream(summary_file, head, (_summary_record(r) for r in _iter_results(run_dir)))
+    _write_json_stream(detailed_file, head, (_detailed_record(r) for r in _iter_results(run_dir)))
+    logger.debug("Decision summary and details derived from %s", run_dir / RESULTS_JSONL)
+    return summary_file, detailed_file
+
+
+if __name__ == "__main__":
+    from utils.checkpoint import read_journal
+
+    parser = argparse.ArgumentParser(description="Derive summary.json and detailed.json of a single-mode run")
+    parser.add_argument("run_dir", help="Run directory containing results.jsonl and journal.jsonl")
+    args = parser.parse_args()
+
+    header, seconds = read_journal(Path(args.run_dir))
+    for written in write_decision_json(Path(args.run_dir), header.get("framework"), header.get("mode"), int(seconds)):
+        print(written)